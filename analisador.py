@@ -1,11 +1,27 @@
 import re
-import tkinter as tk
-from tkinter import ttk, scrolledtext, filedialog, messagebox, font
+from array import array
+from bisect import bisect_left
+from collections import Counter, deque
 from enum import Enum
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO, Tuple
+import argparse
+import contextlib
+import csv
+import glob
+import hashlib
+import heapq
+import io
+import json
+import marshal
+import mmap
 import os
+import queue
+import struct
 import sys
+import threading
+import time
 
 class TokenType(Enum):
     # Palavras reservadas
@@ -66,6 +82,9 @@ class TokenType(Enum):
     ERRO_INPUT_SINTAXE_INCORRETA = "erro_input_sintaxe_incorreta"
     ERRO = "erro"
 
+# Todos os tipos de erro (léxicos e de validação)
+TIPOS_ERRO = frozenset(tipo for tipo in TokenType if tipo.value.startswith('erro'))
+
 @dataclass
 class Token:
     tipo: TokenType
@@ -81,793 +100,3446 @@ class Token:
         else:
             return f"Linha: {self.linha} - Coluna: {self.coluna} - Token: <{self.tipo.value}, {self.lexema}>"
 
-class AnalisadorLexico:
+class PerfilAnalise:
+    """
+    Tempos e contadores coletados por um AnalisadorLexico com ativar_perfil().
+
+    tempos: segundos por etapa ('verificacoes_erro', 'padroes' e 'validacao_<regra>');
+    tentativas_por_token: quantos tokens custaram cada número de tentativas de regex;
+    acertos_verificacoes: quantas verificações de erro encontraram cada tipo de erro;
+    caracteres_reexaminados: caracteres de tokens que uma verificação de erro
+    examinou sem encontrar erro e que os padrões examinaram de novo.
+
+    Os tempos incluem o custo da própria medição, que é relevante nas etapas com
+    muitas chamadas curtas; servem para comparar etapas, não como valor absoluto.
+    """
+    
     def __init__(self):
-        # Constantes para limites
-        self.MAX_IDENTIFICADOR_LENGTH = 30
-        self.MAX_NUMERO_LENGTH = 15
-        
-        # Definindo os padrões de tokens com base na tabela fornecida
-        self.token_patterns = [
-            # Comentários (deve vir primeiro para evitar conflitos)
-            (TokenType.COMENTARIO, r'--.*', "Comentário"),
-            
-            # Palavras reservadas (ordem específica para evitar conflitos)
-            (TokenType.INICIO, r'\bals\b', "Palavra reservada para início"),
-            (TokenType.COND_SENAOSE, r'!cdt\+', "Palavra reservada para senãose"),
-            (TokenType.COND_SENAO, r'!cdt(?!\+)', "Palavra reservada para senão"),
-            (TokenType.COND_SE, r'\bcdt\b', "Palavra reservada para se"),
-            (TokenType.REP_PARA, r'\bcycle\b', "Palavra reservada para estrutura de repetição para"),
-            (TokenType.REP_ENQUANTO, r'\bduring\b', "Palavra reservada para estrutura de repetição enquanto"),
-            (TokenType.REP_RANGE, r'\brepeat\b', "Palavra reservada para repetição com contador fixo"),
-            (TokenType.WRT, r'\bwrt\b', "Palavra reservada para saída"),
-            (TokenType.INPUT, r'\binput\b', "Palavra reservada para entrada de dados"),
-            (TokenType.FUNCTION, r'\bfunc\b', "Palavra reservada para criação de funções"),
-            (TokenType.PULAR_LINHA, r'\bbrkln\b', "Palavra reservada para quebra de linha"),
-            
-            # Tipos de variáveis
-            (TokenType.TIPO_VAR, r'\b(intn|den|txt|bln|crt)\b', "Tipos de variáveis"),
-            
-            # Valores lógicos
-            (TokenType.VALOR_LOGICO, r'\b(valid|invalid)\b', "Valor booleano"),
-            
-            # Operadores relacionais
-            (TokenType.OP_REL, r'\b(gt|eq|ne|lt|ge|le)\b', "Operadores relacionais"),
-            
-            # Operadores lógicos
-            (TokenType.OPER_LOGICO, r'\b(and|or)\b', "Operadores lógicos"),
-            
-            # Operador de atribuição
-            (TokenType.OPER_ATRIB, r'<=', "Operador de atribuição"),
-            
-            # Operadores matemáticos
-            (TokenType.OPER_MATEMATICO, r'[+\-*/]', "Operadores matemáticos"),
-            
-            # Valores numéricos (reais devem vir antes dos inteiros)
-            (TokenType.VALOR_REAL, r'\b\d+\.\d+\b', "Valor real"),
-            (TokenType.VALOR_INTEIRO, r'\b\d+\b', "Valor inteiro"),
-            
-            # Strings (valores de texto)
-            (TokenType.VALOR_TEXTO, r'"[^"]*"', "Valor de texto"),
-            
-            # Delimitadores
-            (TokenType.ABRE_PARENT, r'\(', "Abertura de parênteses"),
-            (TokenType.FECHA_PARENT, r'\)', "Fechamento de parênteses"),
-            (TokenType.ABRE_COLCHETES, r'\[', "Abertura de colchetes"),
-            (TokenType.FECHA_COLCHETES, r'\]', "Fechamento de colchetes"),
-            (TokenType.VIRGULA, r',', "Vírgula"),
-            
-            # Identificadores (nomes de funções e variáveis)
-            (TokenType.IDENTIFICADOR, r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', "Identificador"),
-            
-            # Whitespace e quebras de linha
-            (TokenType.NEWLINE, r'\n', "Quebra de linha"),
-            (TokenType.WHITESPACE, r'[ \t]+', "Espaço em branco"),
-        ]
+        self.tempos = Counter()
+        self.chamadas = Counter()
+        self.tentativas_por_token = Counter()
+        self.verificacoes = Counter()
+        self.acertos_verificacoes = Counter()
+        self.linhas = 0
+        self.caracteres_varridos = 0
+        self.caracteres_reexaminados = 0
+    
+    def medir(self, etapa: str, funcao, *argumentos):
+        """Chama funcao(*argumentos) e soma o tempo gasto à etapa."""
+        inicio = time.perf_counter()
+        try:
+            return funcao(*argumentos)
+        finally:
+            self.tempos[etapa] += time.perf_counter() - inicio
+            self.chamadas[etapa] += 1
+    
+    def acumular(self, outro: 'PerfilAnalise') -> None:
+        """Soma ao perfil os tempos e contadores de outro (por exemplo, de outro processo)."""
+        for nome in ('tempos', 'chamadas', 'tentativas_por_token', 'verificacoes', 'acertos_verificacoes'):
+            getattr(self, nome).update(getattr(outro, nome))
+        self.linhas += outro.linhas
+        self.caracteres_varridos += outro.caracteres_varridos
+        self.caracteres_reexaminados += outro.caracteres_reexaminados
+    
+    @property
+    def tentativas_regex(self) -> int:
+        return sum(tentativas * tokens for tentativas, tokens in self.tentativas_por_token.items())
+    
+    def como_dicionario(self) -> dict:
+        tokens_casados = sum(self.tentativas_por_token.values())
+        return {
+            'tempos': dict(self.tempos),
+            'chamadas': dict(self.chamadas),
+            'linhas': self.linhas,
+            'caracteres_varridos': self.caracteres_varridos,
+            'caracteres_reexaminados': self.caracteres_reexaminados,
+            'tentativas_regex': self.tentativas_regex,
+            'tentativas_por_token': self.tentativas_regex / tokens_casados if tokens_casados else 0.0,
+            'distribuicao_tentativas': {str(chave): valor for chave, valor in sorted(self.tentativas_por_token.items())},
+            'verificacoes': dict(self.verificacoes),
+            'acertos_verificacoes': {tipo.value: total for tipo, total in self.acertos_verificacoes.items()},
+        }
+    
+    def relatorio(self) -> str:
+        """Retorna o perfil como texto, no formato usado por --profile."""
+        dados = self.como_dicionario()
+        resultado = "PERFIL DA ANÁLISE:\n"
+        resultado += f"{'Etapa':<28} {'Segundos':>10} {'Chamadas':>10}\n" + "-" * 50 + "\n"
+        for etapa, segundos in sorted(self.tempos.items(), key=lambda item: -item[1]):
+            resultado += f"{etapa:<28} {segundos:>10.4f} {self.chamadas[etapa]:>10}\n"
         
-        # Compilar os padrões regex
-        self.compiled_patterns = [
-            (token_type, re.compile(pattern), desc) 
-            for token_type, pattern, desc in self.token_patterns
-        ]
+        resultado += f"\nLinhas varridas: {dados['linhas']}\n"
+        resultado += f"Caracteres varridos: {dados['caracteres_varridos']}\n"
+        resultado += f"Caracteres examinados mais de uma vez: {dados['caracteres_reexaminados']}\n"
+        resultado += (f"Tentativas de regex: {dados['tentativas_regex']} "
+                      f"({dados['tentativas_por_token']:.2f} por token)\n")
+        for tentativas, tokens in sorted(self.tentativas_por_token.items()):
+            resultado += f"  {tentativas:>3} tentativa(s): {tokens} tokens\n"
+        
+        resultado += "\nVerificações de erro:\n"
+        for verificacao, total in sorted(self.verificacoes.items()):
+            resultado += f"  {verificacao}: {total}\n"
+        for tipo, total in sorted(self.acertos_verificacoes.items(), key=lambda item: -item[1]):
+            resultado += f"  acertos {tipo.value}: {total}\n"
+        return resultado
+
+
+@dataclass(frozen=True)
+class LimitesAnalise:
+    """
+    Limites de custo de uma análise (analisar, analisar_arquivo e --lote).
+
+    max_erros: a análise para no erro de número max_erros (1 = parar no primeiro erro);
+    max_caracteres: apenas os primeiros max_caracteres caracteres do código são
+    analisados (as quebras de linha contam);
+    tempo_maximo: segundos de análise.
+
+    O tempo é verificado entre uma linha e a seguinte, então uma linha é sempre
+    analisada por inteiro. max_caracteres também corta a última linha e é o único
+    limite que garante o custo de qualquer entrada, mesmo sem quebras de linha.
+    """
+    max_erros: Optional[int] = None
+    max_caracteres: Optional[int] = None
+    tempo_maximo: Optional[float] = None
     
-    def _verificar_string_nao_fechada(self, linha: str, posicao: int) -> Optional[Token]:
-        if linha[posicao] == '"':
-            # Procura pelo fechamento da string
-            pos_atual = posicao + 1
-            while pos_atual < len(linha) and linha[pos_atual] != '"':
-                pos_atual += 1
-            
-            if pos_atual >= len(linha):
-                # String não fechada
-                lexema = linha[posicao:]
-                return Token(
-                    tipo=TokenType.ERRO_STRING_NAO_FECHADA,
-                    lexema=lexema,
-                    linha=0,  # Será definido pelo chamador
-                    coluna=posicao + 1,
-                    descricao=f"String não fechada: '{lexema}'",
-                    eh_erro=True
-                )
-        return None
+    def __post_init__(self):
+        if self.max_erros is not None and self.max_erros < 1:
+            raise ValueError(f"max_erros deve ser ao menos 1 (recebido: {self.max_erros})")
+        if self.max_caracteres is not None and self.max_caracteres < 0:
+            raise ValueError(f"max_caracteres não pode ser negativo (recebido: {self.max_caracteres})")
+        if self.tempo_maximo is not None and self.tempo_maximo < 0:
+            raise ValueError(f"tempo_maximo não pode ser negativo (recebido: {self.tempo_maximo})")
+
+
+class ResultadoAnalise(list):
+    """
+    Tokens de uma análise com LimitesAnalise: a mesma lista de analisar(), com a
+    indicação de que um limite interrompeu a análise.
+
+    motivo: o limite atingido ('max_erros', 'max_caracteres' ou 'tempo_maximo'),
+    ou None se o código foi analisado por inteiro. Um resultado truncado não tem
+    o token EOF, e os erros que só podem ser decididos no fim do programa (como
+    um input cuja variável nunca foi declarada) não são informados.
+    """
     
-    def _verificar_numero_malformado(self, linha: str, posicao: int) -> Optional[Token]:
-        if linha[posicao].isdigit():
-            pos_atual = posicao
-            tem_ponto = False
-            lexema = ""
-            
-            while pos_atual < len(linha):
-                char = linha[pos_atual]
-                if char.isdigit():
-                    lexema += char
-                elif char == '.' and not tem_ponto:
-                    lexema += char
-                    tem_ponto = True
-                elif char.isalpha():
-                    # Número seguido de letra - erro
-                    lexema += char
-                    pos_atual += 1
-                    # Continua coletando até encontrar um delimitador
-                    while pos_atual < len(linha) and (linha[pos_atual].isalnum() or linha[pos_atual] == '.'):
-                        lexema += linha[pos_atual]
-                        pos_atual += 1
-                    
-                    return Token(
-                        tipo=TokenType.ERRO_NUMERO_MALFORMADO,
-                        lexema=lexema,
-                        linha=0,  # Será definido pelo chamador
-                        coluna=posicao + 1,
-                        descricao=f"Número mal formado: '{lexema}'",
-                        eh_erro=True
-                    )
-                else:
-                    break
-                pos_atual += 1
-            
-            # Verifica se o número é muito longo
-            if len(lexema) > self.MAX_NUMERO_LENGTH:
-                return Token(
-                    tipo=TokenType.ERRO_NUMERO_MUITO_LONGO,
-                    lexema=lexema,
-                    linha=0,  # Será definido pelo chamador
-                    coluna=posicao + 1,
-                    descricao=f"Número muito longo (máximo {self.MAX_NUMERO_LENGTH} caracteres): '{lexema}'",
-                    eh_erro=True
-                )
+    def __init__(self, tokens: Iterable[Token] = (), motivo: Optional[str] = None):
+        super().__init__(tokens)
+        self.motivo = motivo
+    
+    @property
+    def truncado(self) -> bool:
+        return self.motivo is not None
+
+class ValidadorIncremental:
+    """
+    Executa as validações semânticas de AnalisadorLexico em uma única passagem.
+
+    Cada token é despachado apenas para as regras que podem ser afetadas por ele
+    (início do programa, tipos de variáveis, expressões condicionais e comando
+    input), e as regras compartilham uma única tabela de símbolos. Só é guardado o
+    estado necessário para decidir cada regra (janelas de poucos tokens, a tabela de
+    símbolos e os comandos input cuja variável ainda não foi declarada), e não a
+    lista inteira de tokens.
+
+    processar(token) recebe cada token léxico (inclusive o EOF) e retorna os erros
+    que já podem ser determinados; finalizar() retorna os erros restantes.
+    intercalar(tokens) faz as duas coisas e devolve tokens e erros em ordem de
+    posição, como analisar().
+
+    Com acumular=True nada é retornado: os erros ficam em erros_inicio,
+    erros_tipo, erros_condicionais e erros_input, cada lista na ordem em que a
+    regra os produz.
+    """
+    
+    # Tokens ignorados na busca pelo primeiro token significativo
+    TIPOS_NAO_SIGNIFICATIVOS = {TokenType.COMENTARIO, TokenType.WHITESPACE, TokenType.NEWLINE, TokenType.EOF}
+    # Tokens que não podem aparecer consecutivos em uma expressão condicional
+    TIPOS_VALOR = {TokenType.IDENTIFICADOR, TokenType.VALOR_INTEIRO, TokenType.VALOR_REAL}
+    # Tokens que podem iniciar uma declaração ou uma atribuição
+    TIPOS_INICIO_TIPOS = {TokenType.TIPO_VAR, TokenType.IDENTIFICADOR}
+    # Ordem dos erros de validação que ficam na mesma posição (todos vêm antes do
+    # token léxico dessa posição)
+    PRIORIDADE_ERROS = {
+        TokenType.ERRO_PROGRAMA_SEM_INICIO: 0,
+        TokenType.ERRO_TIPO_INCOMPATIVEL: 1,
+        TokenType.ERRO_OPERADOR_RELACIONAL_AUSENTE: 2,
+        TokenType.ERRO_INPUT_VARIAVEL_NAO_DECLARADA: 3,
+        TokenType.ERRO_INPUT_SEM_VARIAVEL: 4,
+        TokenType.ERRO_INPUT_SINTAXE_INCORRETA: 4,
+    }
+    
+    def __init__(self, acumular: bool = False, perfil: Optional[PerfilAnalise] = None,
+                 indice: Optional['IndiceSimbolos'] = None):
+        self.acumular = acumular
+        self.perfil = perfil
+        # Índice de símbolos opcional, alimentado com cada token léxico
+        self.indice = indice
+        self.erros_inicio = []
+        self.erros_tipo = []
+        self.erros_condicionais = []
+        self.erros_input = []
         
-        return None
+        # Início do programa
+        self.inicio_resolvido = False
+        
+        # Tabela de símbolos compartilhada: toda variável que aparece em um par
+        # "tipo identificador", com o tipo declarado segundo a regra de tipos (ou
+        # None, se a regra de tipos não considerou o par como declaração)
+        self.simbolos = {}
+        self.tipo_anterior = None
+        
+        # Tipos de variáveis: tokens aguardando decisão
+        self.janela_tipos = []
+        self.total_erros_tipo = 0
+        
+        # Expressões condicionais: estado do colchete aberto
+        self.dentro_de_colchetes = False
+        self.total_elementos = 0
+        self.penultimo_elemento = None
+        self.ultimo_elemento = None
+        self.operadores_iniciais = []   # (indice, token) com indice < 3
+        self.operadores_recentes = []   # (indice, token) entre os três últimos elementos
+        
+        # Comando input
+        self.estado_input = None
+        self.token_input = None
+        self.nome_input = None
+        self.inputs_pendentes = deque() # (nome, token_input) ainda não declarados
+        
+        # Erros de validação já produzidos por intercalar, inclusive os ainda retidos
+        self.total_erros_intercalados = 0
+        
+        # Quando for uma lista, recebe cada uso da tabela de símbolos: ('par', nome)
+        # para cada par "tipo identificador", e ('tipo', nome, tipo_var) e
+        # ('consulta', nome) pela regra de tipos
+        self.registro_variaveis = None
     
-    def _verificar_identificador_malformado(self, linha: str, posicao: int) -> Optional[Token]:
-        """Verifica se há um identificador mal formado."""
-        char = linha[posicao]
+    def exportar_estado(self, linha_fronteira: int) -> tuple:
+        """
+        Retorna o estado local das regras (janelas e colchete aberto), sem a tabela
+        de símbolos nem os erros acumulados.
+
+        As posições dos tokens guardados são relativas a linha_fronteira, de modo que
+        dois estados iguais a menos de um deslocamento de linhas são iguais.
+        """
+        def relativo(token):
+            if token is None:
+                return None
+            return (token.tipo, token.lexema, linha_fronteira - token.linha, token.coluna)
         
-        # Identificador começando com número
-        if char.isdigit():
-            pos_atual = posicao
-            lexema = ""
-            
-            # Coleta o identificador mal formado
-            while pos_atual < len(linha) and (linha[pos_atual].isalnum() or linha[pos_atual] in '_@'):
-                lexema += linha[pos_atual]
-                pos_atual += 1
-            
-            if any(c.isalpha() or c in '_@' for c in lexema):
-                return Token(
-                    tipo=TokenType.ERRO_IDENTIFICADOR_MALFORMADO,
-                    lexema=lexema,
-                    linha=0,  # Será definido pelo chamador
-                    coluna=posicao + 1,
-                    descricao=f"Identificador mal formado (não pode começar com número): '{lexema}'",
-                    eh_erro=True
-                )
+        return (
+            self.inicio_resolvido,
+            tuple(relativo(token) for token in self.janela_tipos),
+            self.dentro_de_colchetes,
+            self.total_elementos,
+            relativo(self.penultimo_elemento),
+            relativo(self.ultimo_elemento),
+            tuple((indice, relativo(token)) for indice, token in self.operadores_iniciais),
+            tuple((indice, relativo(token)) for indice, token in self.operadores_recentes),
+            self.tipo_anterior,
+            self.estado_input,
+            relativo(self.token_input),
+            self.nome_input,
+        )
+    
+    def importar_estado(self, estado: tuple, linha_fronteira: int) -> None:
+        """Restaura um estado de exportar_estado, posicionado em linha_fronteira."""
+        def absoluto(relativo):
+            if relativo is None:
+                return None
+            tipo, lexema, distancia, coluna = relativo
+            return Token(tipo, lexema, linha_fronteira - distancia, coluna)
         
-        # Identificador com caracteres inválidos
-        if char.isalpha() or char == '_':
-            pos_atual = posicao
-            lexema = ""
-            tem_caracter_invalido = False
-            
-            while pos_atual < len(linha) and (linha[pos_atual].isalnum() or linha[pos_atual] in '_@'):
-                lexema += linha[pos_atual]
-                if linha[pos_atual] == '@':
-                    tem_caracter_invalido = True
-                pos_atual += 1
-            
-            if tem_caracter_invalido:
-                return Token(
-                    tipo=TokenType.ERRO_IDENTIFICADOR_MALFORMADO,
-                    lexema=lexema,
-                    linha=0,  # Será definido pelo chamador
-                    coluna=posicao + 1,
-                    descricao=f"Identificador mal formado (contém caracteres inválidos): '{lexema}'",
-                    eh_erro=True
-                )
-            
-            # Verifica se o identificador é muito longo
-            if len(lexema) > self.MAX_IDENTIFICADOR_LENGTH:
-                return Token(
-                    tipo=TokenType.ERRO_IDENTIFICADOR_MUITO_LONGO,
-                    lexema=lexema,
-                    linha=0,  # Será definido pelo chamador
-                    coluna=posicao + 1,
-                    descricao=f"Identificador muito longo (máximo {self.MAX_IDENTIFICADOR_LENGTH} caracteres): '{lexema}'",
-                    eh_erro=True
-                )
+        (self.inicio_resolvido, janela_tipos, self.dentro_de_colchetes, self.total_elementos,
+         penultimo, ultimo, operadores_iniciais, operadores_recentes,
+         self.tipo_anterior, self.estado_input, token_input, self.nome_input) = estado
         
-        return None
+        self.janela_tipos = [absoluto(token) for token in janela_tipos]
+        self.penultimo_elemento = absoluto(penultimo)
+        self.ultimo_elemento = absoluto(ultimo)
+        self.operadores_iniciais = [(indice, absoluto(token)) for indice, token in operadores_iniciais]
+        self.operadores_recentes = [(indice, absoluto(token)) for indice, token in operadores_recentes]
+        self.token_input = absoluto(token_input)
     
-    def _verificar_operador_relacional_malformado(self, linha: str, posicao: int) -> Optional[Token]:
-        # Lista de operadores relacionais válidos
-        operadores_validos = {'gt', 'eq', 'ne', 'lt', 'ge', 'le'}
-        
-        # Lista de possíveis erros comuns de operadores relacionais
-        operadores_malformados = {
-            'e': 'eq',      # "e" em vez de "eq" (igual)
-            'g': 'gt',      # "g" em vez de "gt" (maior que)
-            'l': 'lt',      # "l" em vez de "lt" (menor que)
-            'n': 'ne',      # "n" em vez de "ne" (não igual)
-            'ge': 'ge',     # parcialmente correto
-            'le': 'le',     # parcialmente correto
-            'igual': 'eq',  # palavra em português
-            'maior': 'gt',  # palavra em português
-            'menor': 'lt',  # palavra em português
-        }
+    def processar(self, token: Token) -> List[Token]:
+        """Processa o próximo token léxico e retorna os erros já determinados."""
+        if self.acumular:
+            erros = []
+            erros_inicio, erros_tipo = self.erros_inicio, self.erros_tipo
+            erros_condicionais, erros_input = self.erros_condicionais, self.erros_input
+        else:
+            erros = erros_inicio = erros_tipo = erros_condicionais = erros_input = []
+        tipo = token.tipo
         
-        # Extrai a próxima palavra
-        match = re.match(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', linha[posicao:])
-        if match:
-            lexema = match.group(0)
-            
-            # Verifica se está dentro de colchetes (contexto de condição)
-            inicio_colchete = linha.rfind('[', 0, posicao)
-            fim_colchete = linha.find(']', posicao)
-            
-            if inicio_colchete != -1 and fim_colchete != -1:
-                # Está dentro de uma condição, verifica se é um operador malformado
-                if lexema in operadores_malformados and lexema not in operadores_validos:
-                    sugestao = operadores_malformados[lexema]
-                    return Token(
-                        tipo=TokenType.ERRO_OPERADOR_RELACIONAL_MALFORMADO,
-                        lexema=lexema,
-                        linha=0,  # Será definido pelo chamador
-                        coluna=posicao + 1,
-                        descricao=f"Operador relacional mal formado: '{lexema}'. Sugestão: use '{sugestao}'",
-                        eh_erro=True
-                    )
+        # Tabela de símbolos: todo par "tipo identificador" declara a variável
+        if tipo == TokenType.IDENTIFICADOR and self.tipo_anterior == TokenType.TIPO_VAR:
+            self.simbolos.setdefault(token.lexema, None)
+            if self.registro_variaveis is not None:
+                self.registro_variaveis.append(('par', token.lexema))
+        self.tipo_anterior = tipo
+        if self.indice is not None:
+            self.indice.registrar(token)
         
-        return None
+        # Cada regra só recebe o token se ele puder mudar seu estado
+        perfil = self.perfil
+        if not self.inicio_resolvido:
+            if perfil is None:
+                self._processar_inicio(token, erros_inicio)
+            else:
+                perfil.medir('validacao_inicio', self._processar_inicio, token, erros_inicio)
+        if self.janela_tipos or tipo in self.TIPOS_INICIO_TIPOS:
+            if perfil is None:
+                self._processar_tipos(token, erros_tipo)
+            else:
+                perfil.medir('validacao_tipos', self._processar_tipos, token, erros_tipo)
+        if self.dentro_de_colchetes or tipo == TokenType.ABRE_COLCHETES:
+            if perfil is None:
+                self._processar_condicional(token, erros_condicionais)
+            else:
+                perfil.medir('validacao_condicionais', self._processar_condicional, token, erros_condicionais)
+        if self.estado_input is not None or tipo == TokenType.INPUT:
+            if perfil is None:
+                self._processar_input(token, erros_input)
+            else:
+                perfil.medir('validacao_input', self._processar_input, token, erros_input)
+        return erros
     
-    def _verificar_palavra_reservada_malformada(self, linha: str, posicao: int) -> Optional[Token]:
-        # Lista de palavras reservadas válidas
-        palavras_validas = {
-            'als', 'cdt', '!cdt', '!cdt+', 'cycle', 'during', 'repeat', 
-            'wrt', 'input', 'func', 'brkln', 'intn', 'den', 'txt', 'bln', 'crt'
-        }
+    def finalizar(self) -> List[Token]:
+        """Retorna os erros que só podem ser determinados ao fim do programa."""
+        erros = []
         
-        # Lista de possíveis erros comuns de palavras reservadas
-        palavras_malformadas = {
-            'wr': 'wrt',        # "wr" em vez de "wrt"
-            'wt': 'wrt',        # "wt" em vez de "wrt"
-            'write': 'wrt',     # palavra em inglês
-            'inp': 'input',     # "inp" em vez de "input"
-            'in': 'input',      # "in" em vez de "input"
-            'read': 'input',    # palavra em inglês
-            'scanf': 'input',   # referência C
-            'int': 'intn',      # "int" em vez de "intn"
-            'cd': 'cdt',        # "cd" em vez de "cdt"
-            'if': 'cdt',        # palavra em inglês
-            'else': '!cdt',     # palavra em inglês
-            'elseif': '!cdt+',  # palavra em inglês
-            'al': 'als',        # "al" em vez de "als"
-            'start': 'als',     # palavra em inglês
-            'function': 'func', # "function" em vez de "func"
-            'fn': 'func',       # "fn" em vez de "func"
-        }
+        if not self.inicio_resolvido:
+            # Não há tokens significativos
+            self.inicio_resolvido = True
+            (self.erros_inicio if self.acumular else erros).append(Token(
+                tipo=TokenType.ERRO_PROGRAMA_SEM_INICIO,
+                lexema="",
+                linha=1,
+                coluna=1,
+                descricao="Programa deve começar com a palavra reservada 'als'",
+                eh_erro=True
+            ))
         
-        # Extrai a próxima palavra
-        match = re.match(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', linha[posicao:])
-        if match:
-            lexema = match.group(0)
-            
-            # Verifica se é uma palavra reservada malformada
-            if lexema in palavras_malformadas and lexema not in palavras_validas:
-                sugestao = palavras_malformadas[lexema]
-                return Token(
-                    tipo=TokenType.ERRO_PALAVRA_RESERVADA_MALFORMADA,
-                    lexema=lexema,
-                    linha=0,  # Será definido pelo chamador
-                    coluna=posicao + 1,
-                    descricao=f"Palavra reservada mal formada: '{lexema}'. Sugestão: use '{sugestao}'",
-                    eh_erro=True
-                )
+        # Colchete nunca fechado: a expressão se estende até o fim da lista de
+        # tokens, que inclui os erros de tipo acrescentados após o EOF
+        if self.dentro_de_colchetes:
+            self._fechar_colchete(self.total_elementos + self.total_erros_tipo,
+                                  self.erros_condicionais if self.acumular else erros)
         
-        return None
+        if self.acumular:
+            # Resolve, na ordem original, os comandos input marcados como pendentes
+            self.erros_input = [
+                erro if isinstance(erro, Token) else self._erro_input_nao_declarada(*erro)
+                for erro in self.erros_input
+                if isinstance(erro, Token) or erro[0] not in self.simbolos
+            ]
+        
+        for nome, token_input in self.inputs_pendentes:
+            if nome not in self.simbolos:
+                erros.append(self._erro_input_nao_declarada(nome, token_input))
+        self.inputs_pendentes = deque()
+        
+        return erros
+    
+    def posicao_pendente(self) -> Optional[Tuple[int, int]]:
+        """
+        Retorna a menor posição (linha, coluna) em que um erro ainda não determinado
+        pode aparecer, ou None. Nenhum erro produzido depois ficará antes dela.
+        """
+        if not self.inicio_resolvido:
+            # Se não houver nenhum token significativo, o erro fica na linha 1, coluna 1
+            return (1, 1)
+        
+        candidatos = []
+        if self.janela_tipos:
+            # Um erro de atribuição é anotado no primeiro token da janela
+            candidatos.append(self.janela_tipos[0])
+        if self.dentro_de_colchetes:
+            # Erros anotados no último elemento ou nos operadores lógicos guardados
+            if self.ultimo_elemento is not None:
+                candidatos.append(self.ultimo_elemento)
+            if self.operadores_iniciais:
+                candidatos.append(self.operadores_iniciais[0][1])
+            if self.operadores_recentes:
+                candidatos.append(self.operadores_recentes[0][1])
+        if self.estado_input is not None:
+            candidatos.append(self.token_input)
+        
+        # Comandos input cuja variável foi declarada depois deixam de estar pendentes
+        pendentes = self.inputs_pendentes
+        while pendentes and pendentes[0][0] in self.simbolos:
+            pendentes.popleft()
+        if pendentes:
+            candidatos.append(pendentes[0][1])
+        
+        if not candidatos:
+            return None
+        return min((token.linha, token.coluna) for token in candidatos)
+    
+    def intercalar(self, tokens: Iterable[Token], max_retidos: Optional[int] = None) -> Iterator[Token]:
+        """
+        Valida os tokens léxicos (terminados pelo EOF) e gera esses tokens
+        intercalados com os erros de validação, em ordem de (linha, coluna).
+
+        Em uma mesma posição, os erros vêm antes do token léxico. Um token só fica
+        retido enquanto um erro anterior a ele ainda pode ser produzido: por
+        exemplo, um input cuja variável ainda não foi declarada retém os tokens
+        seguintes até a declaração ou até o fim dos tokens.
 
-    def _validar_inicio_programa(self, tokens: List[Token]) -> Optional[Token]:
+        Com max_retidos, quando mais tokens que isso estão retidos, a metade mais
+        antiga é liberada mesmo assim. A memória fica limitada, mas um erro
+        produzido depois sai após os tokens já liberados, fora da ordem de
+        posição. Sem max_retidos a ordem é sempre a de analisar().
+
+        Se os tokens terminarem antes do EOF (uma análise interrompida por
+        LimitesAnalise), as regras não são finalizadas: saem os tokens retidos e
+        apenas os erros já determinados.
+        """
+        retidos = deque()
+        erros = []          # heap de (linha, coluna, prioridade, chegada, erro)
+        chegada = 0
+        prioridades = self.PRIORIDADE_ERROS
+        token = None
+        
         for token in tokens:
-            # Ignora tokens que não são significativos para a estrutura
-            if token.tipo in [TokenType.COMENTARIO, TokenType.WHITESPACE, TokenType.NEWLINE, TokenType.EOF]:
-                continue
+            novos_erros = self.processar(token)
             
-            # O primeiro token significativo deve ser 'als'
-            if token.tipo == TokenType.INICIO:
-                return None  # Programa válido
+            # Caso comum: nada retido e nenhum erro pendente antes do token
+            if not novos_erros and not retidos and not erros:
+                limite = self.posicao_pendente()
+                if limite is None or (token.linha, token.coluna) < limite:
+                    yield token
+                    continue
+            
+            for erro in novos_erros:
+                heapq.heappush(erros, (erro.linha, erro.coluna, prioridades[erro.tipo], chegada, erro))
+                chegada += 1
+            self.total_erros_intercalados += len(novos_erros)
+            retidos.append(token)
+            yield from self._liberar(retidos, erros, self.posicao_pendente())
+            if max_retidos is not None and len(retidos) > max_retidos:
+                token_limite = retidos[len(retidos) // 2]
+                yield from self._liberar(retidos, erros, (token_limite.linha, token_limite.coluna))
+        
+        if token is not None and token.tipo == TokenType.EOF:
+            for erro in self.finalizar():
+                heapq.heappush(erros, (erro.linha, erro.coluna, prioridades[erro.tipo], chegada, erro))
+                chegada += 1
+        yield from self._liberar(retidos, erros, None)
+    
+    @staticmethod
+    def _liberar(retidos: deque, erros: list, limite: Optional[Tuple[int, int]]) -> Iterator[Token]:
+        """Gera, em ordem de posição, os tokens retidos e erros anteriores ao limite."""
+        while retidos or erros:
+            if erros and (not retidos or (erros[0][0], erros[0][1]) <= (retidos[0].linha, retidos[0].coluna)):
+                if limite is not None and (erros[0][0], erros[0][1]) >= limite:
+                    return
+                yield heapq.heappop(erros)[4]
             else:
-                # Programa não começa com 'als'
-                return Token(
-                    tipo=TokenType.ERRO_PROGRAMA_SEM_INICIO,
-                    lexema="",
-                    linha=token.linha,
-                    coluna=token.coluna,
-                    descricao="Programa deve começar com a palavra reservada 'als'",
-                    eh_erro=True
-                )
+                if limite is not None and (retidos[0].linha, retidos[0].coluna) >= limite:
+                    return
+                yield retidos.popleft()
+    
+    def _processar_inicio(self, token: Token, erros: List[Token]) -> None:
+        # Ignora tokens que não são significativos para a estrutura
+        if token.tipo in self.TIPOS_NAO_SIGNIFICATIVOS:
+            return
         
-        # Se chegou aqui, não há tokens significativos
-        return Token(
-            tipo=TokenType.ERRO_PROGRAMA_SEM_INICIO,
-            lexema="",
-            linha=1,
-            coluna=1,
-            descricao="Programa deve começar com a palavra reservada 'als'",
-            eh_erro=True
-        )
+        # O primeiro token significativo deve ser 'als'
+        self.inicio_resolvido = True
+        if token.tipo != TokenType.INICIO:
+            erros.append(Token(
+                tipo=TokenType.ERRO_PROGRAMA_SEM_INICIO,
+                lexema="",
+                linha=token.linha,
+                coluna=token.coluna,
+                descricao="Programa deve começar com a palavra reservada 'als'",
+                eh_erro=True
+            ))
     
-    def _validar_tipos_variaveis(self, tokens: List[Token]) -> List[Token]:
-        erros_tipo = []
-        variaveis = {}  # {nome_variavel: tipo}
+    def _processar_tipos(self, token: Token, erros: List[Token]) -> None:
+        janela = self.janela_tipos
+        janela.append(token)
         
-        i = 0
-        while i < len(tokens):
-            token_atual = tokens[i]
+        while janela:
+            token_atual = janela[0]
             
-            # Identifica declaração de variável: tipo identificador
-            if (token_atual.tipo == TokenType.TIPO_VAR and 
-                i + 1 < len(tokens) and 
-                tokens[i + 1].tipo == TokenType.IDENTIFICADOR):
-                
-                tipo_var = token_atual.lexema
-                nome_var = tokens[i + 1].lexema
-                variaveis[nome_var] = tipo_var
-                i += 2
-                continue
+            # Declaração de variável: tipo identificador
+            if token_atual.tipo == TokenType.TIPO_VAR:
+                if len(janela) < 2:
+                    return
+                if janela[1].tipo == TokenType.IDENTIFICADOR:
+                    self.simbolos[janela[1].lexema] = token_atual.lexema
+                    if self.registro_variaveis is not None:
+                        self.registro_variaveis.append(('tipo', janela[1].lexema, token_atual.lexema))
+                    del janela[:2]
+                    continue
             
-            # Identifica atribuição: identificador <= valor
-            if (token_atual.tipo == TokenType.IDENTIFICADOR and
-                i + 2 < len(tokens) and
-                tokens[i + 1].tipo == TokenType.OPER_ATRIB):
-                
-                nome_var = token_atual.lexema
-                valor_token = tokens[i + 2]
-                
-                # Verifica se a variável foi declarada
-                if nome_var in variaveis:
-                    tipo_var = variaveis[nome_var]
-                    
-                    # Validação de tipos
-                    erro = None
-                    if tipo_var == "intn" and valor_token.tipo == TokenType.VALOR_REAL:
-                        erro = Token(
-                            tipo=TokenType.ERRO_TIPO_INCOMPATIVEL,
-                            lexema=f"{nome_var} <= {valor_token.lexema}",
-                            linha=token_atual.linha,
-                            coluna=token_atual.coluna,
-                            descricao=f"Variável '{nome_var}' do tipo 'intn' não pode receber valor decimal '{valor_token.lexema}'. Use tipo 'den' para valores decimais.",
-                            eh_erro=True
-                        )
-                    elif tipo_var == "bln" and valor_token.tipo not in [TokenType.VALOR_LOGICO]:
-                        erro = Token(
-                            tipo=TokenType.ERRO_TIPO_INCOMPATIVEL,
-                            lexema=f"{nome_var} <= {valor_token.lexema}",
-                            linha=token_atual.linha,
-                            coluna=token_atual.coluna,
-                            descricao=f"Variável '{nome_var}' do tipo 'bln' só pode receber valores lógicos (valid/invalid).",
-                            eh_erro=True
-                        )
-                    elif tipo_var == "txt" and valor_token.tipo != TokenType.VALOR_TEXTO:
-                        erro = Token(
-                            tipo=TokenType.ERRO_TIPO_INCOMPATIVEL,
-                            lexema=f"{nome_var} <= {valor_token.lexema}",
-                            linha=token_atual.linha,
-                            coluna=token_atual.coluna,
-                            descricao=f"Variável '{nome_var}' do tipo 'txt' só pode receber valores de texto entre aspas.",
-                            eh_erro=True
-                        )
-                    
+            # Atribuição: identificador <= valor
+            elif token_atual.tipo == TokenType.IDENTIFICADOR:
+                if len(janela) < 2:
+                    return
+                if janela[1].tipo == TokenType.OPER_ATRIB:
+                    if len(janela) < 3:
+                        return
+                    erro = self._erro_atribuicao(token_atual, janela[2])
                     if erro:
-                        erros_tipo.append(erro)
-                
-                i += 3
-                continue
+                        self.total_erros_tipo += 1
+                        erros.append(erro)
+                    del janela[:3]
+                    continue
             
-            i += 1
+            del janela[0]
+    
+    def _erro_atribuicao(self, token_atual: Token, valor_token: Token) -> Optional[Token]:
+        nome_var = token_atual.lexema
+        if self.registro_variaveis is not None:
+            self.registro_variaveis.append(('consulta', nome_var))
         
-        return erros_tipo
-
-    def _validar_expressoes_condicionais(self, tokens: List[Token]) -> List[Token]:
-        erros = []
-        i = 0
+        # Verifica se a variável foi declarada
+        tipo_var = self.simbolos.get(nome_var)
+        if tipo_var is None:
+            return None
         
-        while i < len(tokens):
-            token = tokens[i]
-            
-            # Procura por abertura de colchetes
+        if tipo_var == "intn" and valor_token.tipo == TokenType.VALOR_REAL:
+            descricao = f"Variável '{nome_var}' do tipo 'intn' não pode receber valor decimal '{valor_token.lexema}'. Use tipo 'den' para valores decimais."
+        elif tipo_var == "bln" and valor_token.tipo != TokenType.VALOR_LOGICO:
+            descricao = f"Variável '{nome_var}' do tipo 'bln' só pode receber valores lógicos (valid/invalid)."
+        elif tipo_var == "txt" and valor_token.tipo != TokenType.VALOR_TEXTO:
+            descricao = f"Variável '{nome_var}' do tipo 'txt' só pode receber valores de texto entre aspas."
+        else:
+            return None
+        
+        return Token(
+            tipo=TokenType.ERRO_TIPO_INCOMPATIVEL,
+            lexema=f"{nome_var} <= {valor_token.lexema}",
+            linha=token_atual.linha,
+            coluna=token_atual.coluna,
+            descricao=descricao,
+            eh_erro=True
+        )
+    
+    def _processar_condicional(self, token: Token, erros: List[Token]) -> None:
+        if not self.dentro_de_colchetes:
             if token.tipo == TokenType.ABRE_COLCHETES:
-                j = i + 1
-                elementos_significativos = []
-                
-                # Coleta tokens até o fechamento dos colchetes
-                while j < len(tokens) and tokens[j].tipo != TokenType.FECHA_COLCHETES:
-                    token_atual = tokens[j]
-                    # Ignora whitespace e newlines
-                    if token_atual.tipo not in [TokenType.WHITESPACE, TokenType.NEWLINE]:
-                        elementos_significativos.append(token_atual)
-                    j += 1
-                
-                # Valida a estrutura da expressão condicional
-                if len(elementos_significativos) >= 2:
-                    # Verifica se há dois valores consecutivos sem operador relacional
-                    # mas ignora se há operadores lógicos entre eles
-                    for k in range(len(elementos_significativos) - 1):
-                        token_atual = elementos_significativos[k]
-                        token_proximo = elementos_significativos[k + 1]
-                        
-                        # Verifica se são dois valores/identificadores consecutivos
-                        # sem operador relacional ou lógico entre eles
-                        if (token_atual.tipo in [TokenType.IDENTIFICADOR, TokenType.VALOR_INTEIRO, TokenType.VALOR_REAL] and
-                            token_proximo.tipo in [TokenType.IDENTIFICADOR, TokenType.VALOR_INTEIRO, TokenType.VALOR_REAL]):
-                            
-                            # Verifica se não há operador lógico anterior que justifique
-                            tem_operador_logico = False
-                            if k > 0 and elementos_significativos[k - 1].tipo == TokenType.OPER_LOGICO:
-                                tem_operador_logico = True
-                            
-                            if not tem_operador_logico:
-                                erro = Token(
-                                    tipo=TokenType.ERRO_OPERADOR_RELACIONAL_AUSENTE,
-                                    lexema=f"{token_atual.lexema} {token_proximo.lexema}",
-                                    linha=token_atual.linha,
-                                    coluna=token_atual.coluna,
-                                    descricao=f"Operador relacional ausente entre '{token_atual.lexema}' e '{token_proximo.lexema}'. Use: gt, eq, ne, lt, ge, le",
-                                    eh_erro=True
-                                )
-                                erros.append(erro)
-                
-                # Valida a estrutura de expressões com operadores lógicos
-                self._validar_expressao_logica(elementos_significativos, erros)
-                
-                i = j  # Pula para depois dos colchetes
-            else:
-                i += 1
+                self.dentro_de_colchetes = True
+                self.total_elementos = 0
+                self.penultimo_elemento = None
+                self.ultimo_elemento = None
+                self.operadores_iniciais = []
+                self.operadores_recentes = []
+            return
         
-        return erros
+        if token.tipo == TokenType.FECHA_COLCHETES:
+            self._fechar_colchete(self.total_elementos, erros)
+            return
+        
+        # Ignora whitespace e newlines
+        if token.tipo in (TokenType.WHITESPACE, TokenType.NEWLINE):
+            return
+        
+        # Dois valores/identificadores consecutivos sem operador relacional,
+        # a menos que haja um operador lógico antes deles
+        anterior = self.ultimo_elemento
+        if (anterior is not None and
+            anterior.tipo in self.TIPOS_VALOR and token.tipo in self.TIPOS_VALOR and
+            not (self.penultimo_elemento is not None and self.penultimo_elemento.tipo == TokenType.OPER_LOGICO)):
+            erros.append(Token(
+                tipo=TokenType.ERRO_OPERADOR_RELACIONAL_AUSENTE,
+                lexema=f"{anterior.lexema} {token.lexema}",
+                linha=anterior.linha,
+                coluna=anterior.coluna,
+                descricao=f"Operador relacional ausente entre '{anterior.lexema}' e '{token.lexema}'. Use: gt, eq, ne, lt, ge, le",
+                eh_erro=True
+            ))
+        
+        indice = self.total_elementos
+        self.total_elementos += 1
+        self.penultimo_elemento = anterior
+        self.ultimo_elemento = token
+        
+        # Operadores lógicos só geram erro se estiverem entre os três primeiros
+        # ou entre os três últimos elementos da expressão
+        if token.tipo == TokenType.OPER_LOGICO:
+            if indice < 3:
+                self.operadores_iniciais.append((indice, token))
+            self.operadores_recentes.append((indice, token))
+        while self.operadores_recentes and self.operadores_recentes[0][0] + 3 < self.total_elementos:
+            del self.operadores_recentes[0]
     
-    def _validar_expressao_logica(self, elementos: List[Token], erros: List[Token]) -> None:
-        """Valida a estrutura de expressões lógicas compostas."""
-        i = 0
-        while i < len(elementos):
-            token = elementos[i]
-            
-            # Se encontrou um operador lógico (AND/OR)
-            if token.tipo == TokenType.OPER_LOGICO:
-                # Verifica se há elementos suficientes antes e depois
-                if i < 3:  # Precisa de pelo menos: valor op_rel valor AND
-                    erro = Token(
-                        tipo=TokenType.ERRO_OPERADOR_RELACIONAL_AUSENTE,
-                        lexema=token.lexema,
-                        linha=token.linha,
-                        coluna=token.coluna,
-                        descricao=f"Operador lógico '{token.lexema}' sem expressão relacional completa anterior",
-                        eh_erro=True
-                    )
-                    erros.append(erro)
-                
-                if i + 3 >= len(elementos):  # Precisa de pelo menos: AND valor op_rel valor
-                    erro = Token(
-                        tipo=TokenType.ERRO_OPERADOR_RELACIONAL_AUSENTE,
-                        lexema=token.lexema,
-                        linha=token.linha,
-                        coluna=token.coluna,
-                        descricao=f"Operador lógico '{token.lexema}' sem expressão relacional completa posterior",
-                        eh_erro=True
-                    )
-                    erros.append(erro)
+    def _fechar_colchete(self, total_elementos: int, erros: List[Token]) -> None:
+        """Valida a estrutura das expressões lógicas do colchete que se encerra."""
+        operadores = dict(self.operadores_iniciais)
+        operadores.update(self.operadores_recentes)
+        
+        for indice in sorted(operadores):
+            token = operadores[indice]
+            if indice < 3:  # Precisa de pelo menos: valor op_rel valor AND
+                erros.append(Token(
+                    tipo=TokenType.ERRO_OPERADOR_RELACIONAL_AUSENTE,
+                    lexema=token.lexema,
+                    linha=token.linha,
+                    coluna=token.coluna,
+                    descricao=f"Operador lógico '{token.lexema}' sem expressão relacional completa anterior",
+                    eh_erro=True
+                ))
+            if indice + 3 >= total_elementos:  # Precisa de pelo menos: AND valor op_rel valor
+                erros.append(Token(
+                    tipo=TokenType.ERRO_OPERADOR_RELACIONAL_AUSENTE,
+                    lexema=token.lexema,
+                    linha=token.linha,
+                    coluna=token.coluna,
+                    descricao=f"Operador lógico '{token.lexema}' sem expressão relacional completa posterior",
+                    eh_erro=True
+                ))
+        
+        self.dentro_de_colchetes = False
+    
+    def _processar_input(self, token: Token, erros: List[Token]) -> None:
+        if token.tipo == TokenType.WHITESPACE:
+            return
+        
+        estado = self.estado_input
+        self.estado_input = None
+        
+        if estado == 'abre':
+            # Verifica se há parênteses após input
+            if token.tipo == TokenType.ABRE_PARENT:
+                self.estado_input = 'variavel'
+                return
+            erros.append(Token(
+                tipo=TokenType.ERRO_INPUT_SINTAXE_INCORRETA,
+                lexema="input",
+                linha=self.token_input.linha,
+                coluna=self.token_input.coluna,
+                descricao="Comando 'input' deve ser seguido por parênteses: input(variavel)",
+                eh_erro=True
+            ))
+            # O token atual ainda pode iniciar outro comando input
+        
+        elif estado == 'variavel':
+            # Deve ter um identificador
+            if token.tipo != TokenType.IDENTIFICADOR:
+                erros.append(Token(
+                    tipo=TokenType.ERRO_INPUT_SEM_VARIAVEL,
+                    lexema=f"input({token.lexema}",
+                    linha=self.token_input.linha,
+                    coluna=self.token_input.coluna,
+                    descricao="Comando 'input' deve conter uma variável válida entre parênteses",
+                    eh_erro=True
+                ))
+                return
             
-            i += 1
+            # A variável pode ser declarada depois do comando: decide no fim
+            self.nome_input = token.lexema
+            if self.acumular:
+                # Marca a posição do possível erro na ordem dos erros de input
+                erros.append((token.lexema, self.token_input))
+            elif token.lexema not in self.simbolos:
+                self.inputs_pendentes.append((token.lexema, self.token_input))
+            self.estado_input = 'fecha'
+            return
+        
+        elif estado == 'fecha':
+            # Deve ter parêntese de fechamento
+            if token.tipo != TokenType.FECHA_PARENT:
+                erros.append(Token(
+                    tipo=TokenType.ERRO_INPUT_SINTAXE_INCORRETA,
+                    lexema=f"input({self.nome_input}",
+                    linha=self.token_input.linha,
+                    coluna=self.token_input.coluna,
+                    descricao="Comando 'input' deve ser fechado com parênteses: input(variavel)",
+                    eh_erro=True
+                ))
+            return
+        
+        if token.tipo == TokenType.INPUT:
+            self.estado_input = 'abre'
+            self.token_input = token
+    
+    def _erro_input_nao_declarada(self, nome_variavel: str, token_input: Token) -> Token:
+        return Token(
+            tipo=TokenType.ERRO_INPUT_VARIAVEL_NAO_DECLARADA,
+            lexema=f"input({nome_variavel})",
+            linha=token_input.linha,
+            coluna=token_input.coluna,
+            descricao=f"Variável '{nome_variavel}' não foi declarada antes do comando input",
+            eh_erro=True
+        )
 
-    def _validar_comando_input(self, tokens: List[Token]) -> List[Token]:
-        """Valida a sintaxe do comando input."""
-        erros = []
-        variaveis_declaradas = set()
-        
-        # Primeiro, coleta todas as variáveis declaradas
-        i = 0
-        while i < len(tokens):
-            token = tokens[i]
-            if (token.tipo == TokenType.TIPO_VAR and 
-                i + 1 < len(tokens) and 
-                tokens[i + 1].tipo == TokenType.IDENTIFICADOR):
-                variaveis_declaradas.add(tokens[i + 1].lexema)
-                i += 2
+
+@dataclass
+class Simbolo:
+    """Um nome do programa: como e onde foi declarado e onde é usado."""
+    nome: str
+    categoria: Optional[str] = None     # 'variavel', 'funcao' ou 'parametro'; None se nunca foi declarado
+    tipo: Optional[str] = None          # Tipo da primeira declaração de uma variável (intn, den, ...)
+    declaracoes: List[Tuple[int, int]] = field(default_factory=list)   # (linha, coluna) de cada declaração
+    referencias: List[Tuple[int, int]] = field(default_factory=list)   # (linha, coluna) de cada uso
+    
+    @property
+    def declaracao(self) -> Optional[Tuple[int, int]]:
+        """Posição da primeira declaração, ou None."""
+        return self.declaracoes[0] if self.declaracoes else None
+
+
+class IndiceSimbolos:
+    """
+    Índice dos nomes de um programa, montado token a token durante a análise.
+
+    Cada nome é mapeado para um Simbolo com a categoria, o tipo declarado, as
+    posições das declarações e as de todos os usos. São declarações o
+    identificador de um par "tipo identificador" (o mesmo critério da tabela de
+    símbolos de ValidadorIncremental), o nome após 'func' e os parâmetros entre
+    os parênteses que o seguem; qualquer outro identificador, inclusive o alvo
+    de uma atribuição ou a variável de input, é um uso.
+
+    Os nomes usados sem declaração e os declarados sem uso são mantidos à medida
+    que os tokens chegam, então consultar um nome custa um acesso a dicionário e
+    as consultas de conjunto custam apenas o tamanho da resposta.
+
+        indice = IndiceSimbolos()
+        tokens = analisador.analisar(codigo, indice)
+        indice.referencias('idade')
+        indice.usos_nao_declarados()
+    """
+    
+    def __init__(self):
+        self.simbolos = {}
+        # Conjuntos ordenados (chaves de dicionário), na ordem em que os nomes aparecem
+        self._nao_declarados = {}
+        self._nao_usados = {}
+        self._tipo_anterior = None
+        self._lexema_anterior = None
+        # Cabeçalho de função: 'nome' logo após o nome, 'parametros' dentro dos parênteses
+        self._estado_funcao = None
+        self._linha_funcao = 0
+    
+    @classmethod
+    def de_tokens(cls, tokens: Iterable[Token]) -> 'IndiceSimbolos':
+        """Monta o índice a partir de uma lista de tokens já analisada."""
+        indice = cls()
+        indice.acrescentar(tokens)
+        return indice
+    
+    def acrescentar(self, tokens: Iterable[Token]) -> None:
+        """Registra uma sequência de tokens, ignorando os erros de validação."""
+        validacao = ValidadorIncremental.PRIORIDADE_ERROS
+        registrar = self.registrar
+        for token in tokens:
+            if token.tipo not in validacao:
+                registrar(token)
+    
+    def registrar(self, token: Token) -> None:
+        """Registra o próximo token léxico do programa."""
+        tipo = token.tipo
+        estado = self._estado_funcao
+        if estado is not None and token.linha != self._linha_funcao:
+            estado = self._estado_funcao = None
+        
+        if tipo == TokenType.IDENTIFICADOR:
+            anterior = self._tipo_anterior
+            if anterior == TokenType.TIPO_VAR:
+                self._declarar(token, 'variavel', self._lexema_anterior)
+            elif anterior == TokenType.FUNCTION:
+                self._declarar(token, 'funcao', None)
+                self._estado_funcao = 'nome'
+                self._linha_funcao = token.linha
+            elif estado == 'parametros':
+                self._declarar(token, 'parametro', None)
             else:
-                i += 1
+                self._usar(token)
+                if estado == 'nome':
+                    self._estado_funcao = None
+        elif estado == 'nome':
+            self._estado_funcao = 'parametros' if tipo == TokenType.ABRE_PARENT else None
+        elif estado == 'parametros' and tipo == TokenType.FECHA_PARENT:
+            self._estado_funcao = None
         
-        # Agora valida os comandos input
-        i = 0
-        while i < len(tokens):
-            token = tokens[i]
-            
-            if token.tipo == TokenType.INPUT:
-                # Verifica se há parênteses após input
-                j = i + 1
-                # Pula whitespace
-                while j < len(tokens) and tokens[j].tipo == TokenType.WHITESPACE:
-                    j += 1
-                
-                if j >= len(tokens) or tokens[j].tipo != TokenType.ABRE_PARENT:
-                    erro = Token(
-                        tipo=TokenType.ERRO_INPUT_SINTAXE_INCORRETA,
-                        lexema="input",
-                        linha=token.linha,
-                        coluna=token.coluna,
-                        descricao="Comando 'input' deve ser seguido por parênteses: input(variavel)",
-                        eh_erro=True
-                    )
-                    erros.append(erro)
-                    i += 1
-                    continue
-                
-                j += 1  # Pula o (
-                # Pula whitespace
-                while j < len(tokens) and tokens[j].tipo == TokenType.WHITESPACE:
-                    j += 1
-                
-                if j >= len(tokens):
-                    erro = Token(
-                        tipo=TokenType.ERRO_INPUT_SEM_VARIAVEL,
-                        lexema="input(",
-                        linha=token.linha,
-                        coluna=token.coluna,
-                        descricao="Comando 'input' sem variável especificada",
-                        eh_erro=True
-                    )
-                    erros.append(erro)
-                    i = j
-                    continue
-                
-                # Deve ter um identificador
-                if tokens[j].tipo != TokenType.IDENTIFICADOR:
-                    erro = Token(
-                        tipo=TokenType.ERRO_INPUT_SEM_VARIAVEL,
-                        lexema=f"input({tokens[j].lexema}",
-                        linha=token.linha,
-                        coluna=token.coluna,
-                        descricao="Comando 'input' deve conter uma variável válida entre parênteses",
-                        eh_erro=True
-                    )
-                    erros.append(erro)
-                    i = j + 1
-                    continue
-                
-                # Verifica se a variável foi declarada
-                nome_variavel = tokens[j].lexema
-                if nome_variavel not in variaveis_declaradas:
-                    erro = Token(
-                        tipo=TokenType.ERRO_INPUT_VARIAVEL_NAO_DECLARADA,
-                        lexema=f"input({nome_variavel})",
-                        linha=token.linha,
-                        coluna=token.coluna,
-                        descricao=f"Variável '{nome_variavel}' não foi declarada antes do comando input",
-                        eh_erro=True
-                    )
-                    erros.append(erro)
-                
-                j += 1  # Pula o identificador
-                # Pula whitespace
-                while j < len(tokens) and tokens[j].tipo == TokenType.WHITESPACE:
-                    j += 1
-                
-                # Deve ter parêntese de fechamento
-                if j >= len(tokens) or tokens[j].tipo != TokenType.FECHA_PARENT:
-                    erro = Token(
-                        tipo=TokenType.ERRO_INPUT_SINTAXE_INCORRETA,
-                        lexema=f"input({nome_variavel}",
-                        linha=token.linha,
-                        coluna=token.coluna,
-                        descricao="Comando 'input' deve ser fechado com parênteses: input(variavel)",
-                        eh_erro=True
-                    )
-                    erros.append(erro)
-                
-                i = j + 1 if j < len(tokens) else len(tokens)
+        self._tipo_anterior = tipo
+        self._lexema_anterior = token.lexema
+    
+    def _simbolo(self, nome: str) -> Simbolo:
+        simbolo = self.simbolos.get(nome)
+        if simbolo is None:
+            simbolo = self.simbolos[nome] = Simbolo(nome)
+        return simbolo
+    
+    def _declarar(self, token: Token, categoria: str, tipo: Optional[str]) -> None:
+        simbolo = self._simbolo(token.lexema)
+        if not simbolo.declaracoes:
+            simbolo.categoria = categoria
+            simbolo.tipo = tipo
+            self._nao_declarados.pop(simbolo.nome, None)
+            if not simbolo.referencias:
+                self._nao_usados[simbolo.nome] = None
+        simbolo.declaracoes.append((token.linha, token.coluna))
+    
+    def _usar(self, token: Token) -> None:
+        simbolo = self._simbolo(token.lexema)
+        if not simbolo.referencias:
+            if simbolo.declaracoes:
+                self._nao_usados.pop(simbolo.nome, None)
             else:
-                i += 1
+                self._nao_declarados[simbolo.nome] = None
+        simbolo.referencias.append((token.linha, token.coluna))
+    
+    def __len__(self) -> int:
+        return len(self.simbolos)
+    
+    def __contains__(self, nome: str) -> bool:
+        return nome in self.simbolos
+    
+    def __getitem__(self, nome: str) -> Simbolo:
+        return self.simbolos[nome]
+    
+    def __iter__(self) -> Iterator[Simbolo]:
+        return iter(self.simbolos.values())
+    
+    def obter(self, nome: str) -> Optional[Simbolo]:
+        return self.simbolos.get(nome)
+    
+    def referencias(self, nome: str, incluir_declaracoes: bool = False) -> List[Tuple[int, int]]:
+        """Posições (linha, coluna) dos usos do nome e, opcionalmente, das declarações."""
+        simbolo = self.simbolos.get(nome)
+        if simbolo is None:
+            return []
+        if incluir_declaracoes:
+            return sorted(simbolo.declaracoes + simbolo.referencias)
+        return list(simbolo.referencias)
+    
+    def usos_nao_declarados(self) -> List[Simbolo]:
+        """Nomes usados que não são declarados em nenhum lugar do programa."""
+        return [self.simbolos[nome] for nome in self._nao_declarados]
+    
+    def declaracoes_nao_usadas(self) -> List[Simbolo]:
+        """Nomes declarados que nunca são usados."""
+        return [self.simbolos[nome] for nome in self._nao_usados]
+    
+    def relatorio(self) -> str:
+        """Retorna o índice como texto, no formato usado por --simbolos."""
+        resultado = "SÍMBOLOS:\n"
+        resultado += f"{'Nome':<32} {'Categoria':<10} {'Tipo':<6} {'Declaração':<12} {'Usos':>6}\n" + "-" * 70 + "\n"
+        for simbolo in self.simbolos.values():
+            declaracao = simbolo.declaracao
+            posicao = f"{declaracao[0]}:{declaracao[1]}" if declaracao else "-"
+            resultado += (f"{simbolo.nome:<32} {simbolo.categoria or '-':<10} {simbolo.tipo or '-':<6} "
+                          f"{posicao:<12} {len(simbolo.referencias):>6}\n")
         
-        return erros
+        for titulo, simbolos, posicoes in (("Usos sem declaração", self.usos_nao_declarados(), 'referencias'),
+                                           ("Declarações sem uso", self.declaracoes_nao_usadas(), 'declaracoes')):
+            if simbolos:
+                resultado += f"\n{titulo}:\n"
+                for simbolo in simbolos:
+                    linhas = ', '.join(str(linha) for linha, _ in getattr(simbolo, posicoes))
+                    resultado += f"  {simbolo.nome} (linha {linhas})\n"
+        return resultado
 
-    def analisar(self, codigo: str) -> List[Token]:
-        tokens = []
-        linhas = codigo.split('\n')
+
+class TokenArray:
+    """
+    Resultado compacto de uma análise, armazenado em colunas (array).
+
+    Cada token ocupa o ordinal do tipo, a linha, a coluna e o trecho (início e
+    tamanho) no código fonte, cerca de 21 bytes; o lexema e a descrição são
+    montados apenas quando pedidos. Os erros de validação, cujo lexema não é um
+    trecho do código, ficam guardados como Token em um dicionário à parte.
+
+    Indexar ou iterar produz objetos Token, então o resultado pode ser usado
+    onde uma lista de tokens é esperada (imprimir_tokens, obter_estatisticas e
+    a interface gráfica).
+    """
+    
+    TIPOS = list(TokenType)
+    ORDINAIS = {tipo: ordinal for ordinal, tipo in enumerate(TIPOS)}
+    
+    def __init__(self, fonte: str, analisador: 'AnalisadorLexico'):
+        self.fonte = fonte
+        self._descrever = analisador.descrever
+        self.tipos = array('B')
+        self.linhas = array('I')
+        self.colunas = array('I')
+        self.inicios = array('q')
+        self.tamanhos = array('I')
+        self.extras = {}  # {indice: Token} para os erros de validação
+    
+    def acrescentar(self, tipo: TokenType, linha: int, coluna: int, inicio: int, tamanho: int) -> None:
+        """Acrescenta um token cujo lexema é o trecho fonte[inicio:inicio + tamanho]."""
+        self.tipos.append(self.ORDINAIS[tipo])
+        self.linhas.append(linha)
+        self.colunas.append(coluna)
+        self.inicios.append(inicio)
+        self.tamanhos.append(tamanho)
+    
+    def acrescentar_token(self, token: Token) -> None:
+        """Acrescenta um token que não corresponde a um trecho do código fonte."""
+        self.extras[len(self.tipos)] = token
+        self.acrescentar(token.tipo, token.linha, token.coluna, -1, 0)
+    
+    def __len__(self) -> int:
+        return len(self.tipos)
+    
+    def tipo(self, indice: int) -> TokenType:
+        return self.TIPOS[self.tipos[indice]]
+    
+    def lexema(self, indice: int) -> str:
+        if indice < 0:
+            indice += len(self)
+        extra = self.extras.get(indice)
+        if extra is not None:
+            return extra.lexema
+        inicio = self.inicios[indice]
+        return self.fonte[inicio:inicio + self.tamanhos[indice]]
+    
+    def descricao(self, indice: int) -> str:
+        if indice < 0:
+            indice += len(self)
+        extra = self.extras.get(indice)
+        if extra is not None:
+            return extra.descricao
+        return self._descrever(self.tipo(indice), self.lexema(indice))
+    
+    def eh_erro(self, indice: int) -> bool:
+        return self.tipo(indice) in TIPOS_ERRO
+    
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice de token fora do intervalo")
         
-        for num_linha, linha in enumerate(linhas, 1):
-            coluna = 0
-            
-            while coluna < len(linha):
-                token_encontrado = False
-                
-                # Verifica erros específicos primeiro
-                erro_string = self._verificar_string_nao_fechada(linha, coluna)
-                if erro_string:
-                    erro_string.linha = num_linha
-                    tokens.append(erro_string)
-                    coluna = len(linha)  # Pula para o final da linha
-                    continue
-                
-                erro_numero = self._verificar_numero_malformado(linha, coluna)
-                if erro_numero:
-                    erro_numero.linha = num_linha
-                    tokens.append(erro_numero)
-                    # Pula o número mal formado
-                    coluna += len(erro_numero.lexema)
-                    continue
-                
-                erro_identificador = self._verificar_identificador_malformado(linha, coluna)
-                if erro_identificador:
-                    erro_identificador.linha = num_linha
-                    tokens.append(erro_identificador)
-                    # Pula o identificador mal formado
-                    coluna += len(erro_identificador.lexema)
+        extra = self.extras.get(indice)
+        if extra is not None:
+            return extra
+        tipo = self.TIPOS[self.tipos[indice]]
+        inicio = self.inicios[indice]
+        lexema = self.fonte[inicio:inicio + self.tamanhos[indice]]
+        return Token(
+            tipo=tipo,
+            lexema=lexema,
+            linha=self.linhas[indice],
+            coluna=self.colunas[indice],
+            descricao=self._descrever(tipo, lexema),
+            eh_erro=tipo in TIPOS_ERRO
+        )
+    
+    def __iter__(self) -> Iterator[Token]:
+        for indice in range(len(self)):
+            yield self[indice]
+    
+    def contar_tipos(self) -> dict:
+        """Retorna {TokenType: quantidade} na ordem em que cada tipo aparece pela primeira vez."""
+        return {self.TIPOS[ordinal]: quantidade for ordinal, quantidade in Counter(self.tipos).items()}
+
+
+class CacheResultados:
+    """
+    Cache em disco dos resultados de análise, para não analisar de novo arquivos
+    que não mudaram entre execuções.
+
+    A chave de cada entrada é o hash SHA-256 do conteúdo do arquivo combinado com
+    uma impressão digital das regras do analisador (token_patterns, limites MAX_*,
+    tabelas de palavras mal formadas e distância das sugestões), de modo que mudar as regras invalida o cache.
+    Quando o diretório passa de limite_bytes, as entradas usadas há mais tempo são
+    removidas (LRU, pela data de modificação, atualizada a cada leitura).
+
+    Vários processos podem usar o mesmo diretório (--lote -p N). Cada um só conhece
+    as próprias gravações, então o tamanho é medido de novo na listagem do diretório
+    a cada FRACAO_REMEDICAO do limite gravada: o cache passa do limite no máximo
+    por N vezes essa fração.
+    """
+    
+    # Incrementar quando o formato das entradas ou a lógica de validação mudar
+    VERSAO_FORMATO = 2
+    # Ao remover entradas, o cache é reduzido até esta fração do limite
+    FRACAO_APOS_REMOCAO = 0.9
+    # Gravações acumuladas (em fração do limite) que disparam uma nova medição
+    FRACAO_REMEDICAO = 1 / 64
+    
+    def __init__(self, diretorio: str, limite_bytes: int = 256 * 1024 * 1024):
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        self.tamanho_total = None   # calculado na primeira gravação
+        self.gravados_desde_medicao = 0
+        self.acertos = 0
+        self.falhas = 0
+        os.makedirs(diretorio, exist_ok=True)
+    
+    @classmethod
+    def impressao_digital(cls, analisador: 'AnalisadorLexico') -> str:
+        """Hash das regras que determinam o resultado da análise."""
+        regras = (
+            cls.VERSAO_FORMATO,
+            marshal.version,
+            [(tipo.value, padrao, descricao) for tipo, padrao, descricao in analisador.token_patterns],
+            analisador.MAX_IDENTIFICADOR_LENGTH,
+            analisador.MAX_NUMERO_LENGTH,
+            sorted(analisador.OPERADORES_RELACIONAIS_MALFORMADOS.items()),
+            sorted(analisador.PALAVRAS_RESERVADAS_MALFORMADAS.items()),
+            analisador.distancia_sugestoes,
+        )
+        return hashlib.sha256(repr(regras).encode('utf-8')).hexdigest()
+    
+    def chave(self, analisador: 'AnalisadorLexico', conteudo: bytes) -> str:
+        hash_conteudo = hashlib.sha256(conteudo).digest()
+        return hashlib.sha256(self.impressao_digital(analisador).encode('ascii') + hash_conteudo).hexdigest()
+    
+    def _caminho(self, chave: str) -> str:
+        return os.path.join(self.diretorio, chave[:2], chave)
+    
+    def obter(self, chave: str) -> Optional[List[Token]]:
+        """Retorna os tokens guardados para a chave, ou None se não houver entrada."""
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'rb') as arquivo:
+                dados = arquivo.read()
+            tokens = self.desserializar(dados)
+        except (OSError, ValueError, EOFError, TypeError):
+            # Entrada ausente, removida por outro processo ou corrompida
+            self.falhas += 1
+            return None
+        
+        try:
+            os.utime(caminho)   # marca a entrada como usada recentemente
+        except OSError:
+            pass
+        self.acertos += 1
+        return tokens
+    
+    def guardar(self, chave: str, tokens: List[Token]) -> None:
+        caminho = self._caminho(chave)
+        dados = self.serializar(tokens)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        
+        # Grava em um arquivo temporário e renomeia, para que outros processos
+        # nunca leiam uma entrada incompleta
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'wb') as arquivo:
+            arquivo.write(dados)
+        os.replace(temporario, caminho)
+        
+        self.gravados_desde_medicao += len(dados)
+        if self.tamanho_total is None or self.gravados_desde_medicao >= self.limite_bytes * self.FRACAO_REMEDICAO:
+            # Inclui o que os outros processos gravaram desde a última medição
+            self.tamanho_total = self._medir_entradas()[1]
+            self.gravados_desde_medicao = 0
+        else:
+            self.tamanho_total += len(dados)
+        if self.tamanho_total > self.limite_bytes:
+            self._remover_antigas()
+    
+    def _medir_entradas(self) -> Tuple[List[Tuple[float, int, str]], int]:
+        """Retorna (data de uso, tamanho, caminho) de cada entrada e o tamanho total."""
+        entradas = []
+        total = 0
+        for raiz, _, nomes in os.walk(self.diretorio):
+            for nome in nomes:
+                if nome.endswith('.tmp'):
                     continue
-                
-                erro_operador_relacional = self._verificar_operador_relacional_malformado(linha, coluna)
-                if erro_operador_relacional:
-                    erro_operador_relacional.linha = num_linha
-                    tokens.append(erro_operador_relacional)
-                    coluna += len(erro_operador_relacional.lexema)
+                caminho = os.path.join(raiz, nome)
+                try:
+                    info = os.stat(caminho)
+                except OSError:
                     continue
-                
-                erro_palavra_reservada = self._verificar_palavra_reservada_malformada(linha, coluna)
-                if erro_palavra_reservada:
-                    erro_palavra_reservada.linha = num_linha
-                    tokens.append(erro_palavra_reservada)
-                    coluna += len(erro_palavra_reservada.lexema)
+                entradas.append((info.st_mtime, info.st_size, caminho))
+                total += info.st_size
+        return entradas, total
+    
+    def _remover_antigas(self) -> None:
+        entradas, total = self._medir_entradas()
+        alvo = self.limite_bytes * self.FRACAO_APOS_REMOCAO
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= alvo:
+                break
+            try:
+                os.remove(caminho)
+            except OSError:
+                continue
+            total -= tamanho
+        self.tamanho_total = total
+        self.gravados_desde_medicao = 0
+    
+    @classmethod
+    def serializar(cls, tokens: List[Token]) -> bytes:
+        """
+        Formato compacto: os textos (lexemas e descrições) aparecem uma única vez em
+        uma tabela, e cada token vira uma posição em cinco colunas numéricas.
+        """
+        textos = {}
+        tipos = bytearray()
+        linhas = array('I')
+        colunas = array('I')
+        lexemas = array('I')
+        descricoes = array('I')
+        ordinais = TokenArray.ORDINAIS
+        
+        for token in tokens:
+            # O bit mais alto do tipo guarda eh_erro
+            tipos.append(ordinais[token.tipo] | (0x80 if token.eh_erro else 0))
+            linhas.append(token.linha)
+            colunas.append(token.coluna)
+            lexemas.append(textos.setdefault(token.lexema, len(textos)))
+            descricoes.append(textos.setdefault(token.descricao, len(textos)))
+        
+        return marshal.dumps((cls.VERSAO_FORMATO, list(textos), bytes(tipos), linhas.tobytes(),
+                              colunas.tobytes(), lexemas.tobytes(), descricoes.tobytes()))
+    
+    @classmethod
+    def desserializar(cls, dados: bytes) -> List[Token]:
+        versao, textos, tipos, *colunas_bytes = marshal.loads(dados)
+        if versao != cls.VERSAO_FORMATO:
+            raise ValueError(f"Versão de cache incompatível: {versao}")
+        
+        linhas, colunas, lexemas, descricoes = (array('I', bytes(coluna)) for coluna in colunas_bytes)
+        todos_os_tipos = TokenArray.TIPOS
+        return [
+            Token(todos_os_tipos[tipo & 0x7F], textos[lexema], linha, coluna, textos[descricao], bool(tipo & 0x80))
+            for tipo, linha, coluna, lexema, descricao in zip(tipos, linhas, colunas, lexemas, descricoes)
+        ]
+
+
+class EscritorArquivoTokens:
+    """
+    Grava tokens no formato binário lido por ArquivoTokens, à medida que chegam.
+
+    Layout (little-endian):
+        cabeçalho   MAGICO, versão (u16), tamanho do registro (u16), 4 bytes livres
+        registros   um registro de tamanho fixo por token: tipo (u8), erro (u8),
+                    2 bytes livres, linha, coluna, lexema e descrição (u32 cada);
+                    lexema e descrição são índices da tabela de textos
+        tipos       valores dos TokenType usados como tipo, separados por '\\n'
+        textos      tabela de textos: deslocamentos (u32, um a mais que o número de
+                    textos) seguidos dos textos em UTF-8, cada um gravado uma vez
+        rodapé      número de tokens, de tipos e de textos, posições das seções e
+                    MAGICO de novo, para detectar arquivos truncados
+
+    As tabelas vão depois dos registros, então o arquivo pode ser gravado em uma
+    única passada, inclusive em um destino sem seek (como a saída padrão); só os
+    textos distintos ficam na memória até o fim.
+    """
+    
+    MAGICO = b'ALSTOKEN'
+    VERSAO = 1
+    CABECALHO = struct.Struct('<8sHH4x')
+    REGISTRO = struct.Struct('<BBxxIIII')
+    RODAPE = struct.Struct('<QIIQQQ8s')
+    
+    def __init__(self, saida):
+        """saida: arquivo binário aberto para escrita."""
+        self.saida = saida
+        self.total_tokens = 0
+        self.tipos = {}     # TokenType -> índice na tabela de tipos
+        self.textos = {}    # texto -> índice na tabela de textos
+        self.saida.write(self.CABECALHO.pack(self.MAGICO, self.VERSAO, self.REGISTRO.size))
+    
+    def codificar(self, token: Token) -> bytes:
+        """Retorna o registro do token (a ser escrito na ordem em que foi codificado)."""
+        tipos, textos = self.tipos, self.textos
+        tipo = tipos.get(token.tipo)
+        if tipo is None:
+            tipo = tipos[token.tipo] = len(tipos)
+        lexema = textos.get(token.lexema)
+        if lexema is None:
+            lexema = textos[token.lexema] = len(textos)
+        descricao = textos.get(token.descricao)
+        if descricao is None:
+            descricao = textos[token.descricao] = len(textos)
+        self.total_tokens += 1
+        return self.REGISTRO.pack(tipo, token.eh_erro, token.linha, token.coluna, lexema, descricao)
+    
+    def acrescentar(self, token: Token) -> None:
+        self.saida.write(self.codificar(token))
+    
+    def finalizar(self) -> None:
+        """Escreve as tabelas e o rodapé. Nenhum token pode ser acrescentado depois."""
+        saida = self.saida
+        posicao = self.CABECALHO.size + self.total_tokens * self.REGISTRO.size
+        
+        tabela_tipos = '\n'.join(tipo.value for tipo in self.tipos).encode('utf-8')
+        posicao_tipos = posicao
+        saida.write(tabela_tipos)
+        posicao += len(tabela_tipos)
+        
+        # Deslocamentos alinhados a 4 bytes, para serem lidos como array de u32
+        alinhamento = -posicao % 4
+        saida.write(b'\0' * alinhamento)
+        posicao += alinhamento
+        
+        codificados = [texto.encode('utf-8') for texto in self.textos]
+        deslocamentos = array('I', [0])
+        for codificado in codificados:
+            deslocamentos.append(deslocamentos[-1] + len(codificado))
+        if sys.byteorder != 'little':
+            deslocamentos.byteswap()
+        posicao_textos = posicao
+        saida.write(deslocamentos.tobytes())
+        saida.write(b''.join(codificados))
+        
+        saida.write(self.RODAPE.pack(self.total_tokens, len(self.tipos), len(codificados),
+                                     posicao_tipos, len(tabela_tipos), posicao_textos, self.MAGICO))
+
+
+class ArquivoTokens:
+    """
+    Leitura de um arquivo de tokens gravado por EscritorArquivoTokens.
+
+    O arquivo é mapeado em memória e nada é decodificado na abertura além do
+    rodapé e da tabela de tipos: os registros são lidos por memoryview direto do
+    mapeamento e cada texto é decodificado apenas quando pedido (e guardado).
+    Indexar ou iterar produz objetos Token, então o resultado pode ser usado onde
+    uma lista de tokens é esperada.
+
+        with ArquivoTokens("programa.alstok") as tokens:
+            print(len(tokens), tokens[0], tokens.linha(10))
+    """
+    
+    def __init__(self, caminho: str):
+        self._arquivo = open(caminho, 'rb')
+        try:
+            self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._arquivo.close()
+            raise ValueError(f"Arquivo de tokens vazio: '{caminho}'")
+        try:
+            self._abrir()
+        except Exception:
+            self.fechar()
+            raise
+    
+    def _abrir(self) -> None:
+        escritor = EscritorArquivoTokens
+        dados = self._dados = memoryview(self._mapa)
+        tamanho = len(dados)
+        if tamanho < escritor.CABECALHO.size + escritor.RODAPE.size:
+            raise ValueError("Arquivo de tokens truncado")
+        
+        magico, versao, tamanho_registro = escritor.CABECALHO.unpack_from(dados, 0)
+        if magico != escritor.MAGICO:
+            raise ValueError("Não é um arquivo de tokens")
+        if versao != escritor.VERSAO or tamanho_registro != escritor.REGISTRO.size:
+            raise ValueError(f"Versão de arquivo de tokens incompatível: {versao}")
+        
+        (total_tokens, total_tipos, total_textos, posicao_tipos, tamanho_tipos,
+         posicao_textos, magico_final) = escritor.RODAPE.unpack_from(dados, tamanho - escritor.RODAPE.size)
+        fim_registros = escritor.CABECALHO.size + total_tokens * tamanho_registro
+        fim_deslocamentos = posicao_textos + 4 * (total_textos + 1)
+        if (magico_final != escritor.MAGICO or fim_registros > posicao_tipos or
+                posicao_tipos + tamanho_tipos > posicao_textos or posicao_textos % 4 or
+                fim_deslocamentos > tamanho - escritor.RODAPE.size):
+            raise ValueError("Arquivo de tokens truncado ou corrompido")
+        
+        self._total = total_tokens
+        self._registros = dados[escritor.CABECALHO.size:fim_registros]
+        
+        tabela_tipos = str(dados[posicao_tipos:posicao_tipos + tamanho_tipos], 'utf-8')
+        self.tipos = [TokenType(valor) for valor in tabela_tipos.split('\n')] if total_tipos else []
+        
+        self._deslocamentos = dados[posicao_textos:fim_deslocamentos].cast('I')
+        if sys.byteorder != 'little':
+            # Sem cópia apenas na ordem de bytes do formato
+            self._deslocamentos = array('I', self._deslocamentos)
+            self._deslocamentos.byteswap()
+        self._blob = dados[fim_deslocamentos:tamanho - escritor.RODAPE.size]
+        if self._deslocamentos[-1] != len(self._blob):
+            raise ValueError("Arquivo de tokens truncado ou corrompido")
+        self._textos = [None] * total_textos
+    
+    @classmethod
+    def gravar(cls, caminho: str, tokens: Iterable[Token]) -> int:
+        """Grava os tokens em caminho e retorna quantos foram gravados."""
+        with open(caminho, 'wb') as arquivo:
+            escritor = EscritorArquivoTokens(arquivo)
+            escrever = arquivo.write
+            codificar = escritor.codificar
+            for token in tokens:
+                escrever(codificar(token))
+            escritor.finalizar()
+        return escritor.total_tokens
+    
+    def texto(self, indice: int) -> str:
+        """Retorna o texto de índice indice da tabela de textos."""
+        texto = self._textos[indice]
+        if texto is None:
+            deslocamentos = self._deslocamentos
+            texto = self._textos[indice] = str(self._blob[deslocamentos[indice]:deslocamentos[indice + 1]], 'utf-8')
+        return texto
+    
+    def __len__(self) -> int:
+        return self._total
+    
+    def _registro(self, indice: int) -> tuple:
+        if indice < 0:
+            indice += self._total
+        if not 0 <= indice < self._total:
+            raise IndexError("índice de token fora do intervalo")
+        return EscritorArquivoTokens.REGISTRO.unpack_from(self._registros, indice * EscritorArquivoTokens.REGISTRO.size)
+    
+    def tipo(self, indice: int) -> TokenType:
+        return self.tipos[self._registro(indice)[0]]
+    
+    def linha(self, indice: int) -> int:
+        return self._registro(indice)[2]
+    
+    def coluna(self, indice: int) -> int:
+        return self._registro(indice)[3]
+    
+    def lexema(self, indice: int) -> str:
+        return self.texto(self._registro(indice)[4])
+    
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(self._total))]
+        tipo, erro, linha, coluna, lexema, descricao = self._registro(indice)
+        return Token(self.tipos[tipo], self.texto(lexema), linha, coluna, self.texto(descricao), bool(erro))
+    
+    def __iter__(self) -> Iterator[Token]:
+        tipos, texto = self.tipos, self.texto
+        for tipo, erro, linha, coluna, lexema, descricao in EscritorArquivoTokens.REGISTRO.iter_unpack(self._registros):
+            yield Token(tipos[tipo], texto(lexema), linha, coluna, texto(descricao), bool(erro))
+    
+    def contar_tipos(self) -> dict:
+        """Retorna {TokenType: quantidade}, lendo apenas o byte de tipo de cada registro."""
+        contagem = Counter(self._registros[::EscritorArquivoTokens.REGISTRO.size])
+        return {self.tipos[tipo]: quantidade for tipo, quantidade in contagem.items()}
+    
+    def fechar(self) -> None:
+        # As memoryviews precisam ser liberadas antes de fechar o mapeamento
+        for nome in ('_deslocamentos', '_blob', '_registros', '_dados'):
+            visao = self.__dict__.pop(nome, None)
+            if isinstance(visao, memoryview):
+                visao.release()
+        self._mapa.close()
+        self._arquivo.close()
+    
+    def __enter__(self) -> 'ArquivoTokens':
+        return self
+    
+    def __exit__(self, *excecao) -> None:
+        self.fechar()
+
+
+class IndiceSugestoes:
+    """
+    Índice de vizinhança por remoções para sugerir a palavra mais próxima de um
+    vocabulário pequeno (palavras reservadas, tipos, operadores).
+
+    Cada palavra do vocabulário é guardada sob todas as formas obtidas removendo
+    até distancia_maxima caracteres. Uma consulta gera as remoções da palavra
+    consultada e só calcula a distância de edição (com transposição de caracteres
+    vizinhos) para as palavras do vocabulário que compartilham alguma forma. Como
+    palavras mais longas que o vocabulário são descartadas antes, o número de
+    formas por consulta é limitado, e as respostas são memorizadas: o custo por
+    identificador não cresce com o tamanho do arquivo.
+
+    Para que nomes curtos não virem sugestões a cada letra, palavras com menos de
+    TAMANHO_MINIMO caracteres não são consultadas e a distância aceita é no máximo
+    um terço do tamanho da palavra (ao menos 1).
+
+        indice = IndiceSugestoes(['wrt', 'input', 'cycle'], distancia_maxima=1)
+        indice.sugerir('inptu')   # 'input'
+        indice.sugerir('valor')   # None
+    """
+    
+    TAMANHO_MINIMO = 3
+    # Número de respostas memorizadas antes de a memória ser esvaziada
+    LIMITE_MEMORIA = 65536
+    
+    def __init__(self, vocabulario: Iterable[str], distancia_maxima: int = 1, ignorar: Iterable[str] = ()):
+        if distancia_maxima < 1:
+            raise ValueError("distancia_maxima deve ser ao menos 1")
+        self.distancia_maxima = distancia_maxima
+        self.vocabulario = list(dict.fromkeys(vocabulario))
+        # Em caso de empate na distância vence a palavra que vem antes no vocabulário
+        self.ordem = {palavra: indice for indice, palavra in enumerate(self.vocabulario)}
+        # Palavras que nunca recebem sugestão (as do próprio vocabulário e outras válidas)
+        self.ignorar = frozenset(ignorar).union(self.vocabulario)
+        self.tamanho_maximo = max(map(len, self.vocabulario), default=0) + distancia_maxima
+        
+        self.vizinhanca = {}
+        for palavra in self.vocabulario:
+            for forma in self._remocoes(palavra, distancia_maxima):
+                self.vizinhanca.setdefault(forma, []).append(palavra)
+        self.memoria = {}
+    
+    @staticmethod
+    def _remocoes(palavra: str, distancia: int) -> set:
+        """A palavra e todas as formas obtidas removendo até distancia caracteres."""
+        formas = {palavra}
+        atuais = formas
+        for _ in range(distancia):
+            atuais = {forma[:indice] + forma[indice + 1:] for forma in atuais for indice in range(len(forma))}
+            formas |= atuais
+        return formas
+    
+    @staticmethod
+    def distancia(origem: str, destino: str, limite: int) -> int:
+        """
+        Distância de edição com transposições (alinhamento ótimo de cadeias).
+
+        Retorna limite + 1 assim que a distância certamente passa do limite.
+        """
+        if abs(len(origem) - len(destino)) > limite:
+            return limite + 1
+        anterior_anterior = None
+        anterior = list(range(len(destino) + 1))
+        for i, caractere in enumerate(origem, 1):
+            atual = [i] + [0] * len(destino)
+            for j, outro in enumerate(destino, 1):
+                custo = caractere != outro
+                valor = min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + custo)
+                if (anterior_anterior is not None and i > 1 and j > 1
+                        and caractere == destino[j - 2] and origem[i - 2] == outro):
+                    valor = min(valor, anterior_anterior[j - 2] + 1)
+                atual[j] = valor
+            if min(atual) > limite:
+                return limite + 1
+            anterior_anterior, anterior = anterior, atual
+        return anterior[-1]
+    
+    def sugerir(self, palavra: str) -> Optional[str]:
+        """Retorna a palavra do vocabulário mais próxima, ou None se nenhuma estiver perto o bastante."""
+        try:
+            return self.memoria[palavra]
+        except KeyError:
+            pass
+        sugestao = self._procurar(palavra)
+        if len(self.memoria) >= self.LIMITE_MEMORIA:
+            self.memoria.clear()
+        self.memoria[palavra] = sugestao
+        return sugestao
+    
+    def _procurar(self, palavra: str) -> Optional[str]:
+        tamanho = len(palavra)
+        if tamanho < self.TAMANHO_MINIMO or tamanho > self.tamanho_maximo or palavra in self.ignorar:
+            return None
+        limite = min(self.distancia_maxima, max(1, tamanho // 3))
+        
+        candidatos = set()
+        vizinhanca = self.vizinhanca
+        for forma in self._remocoes(palavra, limite):
+            candidatos.update(vizinhanca.get(forma, ()))
+        
+        melhor = None
+        melhor_distancia = limite + 1
+        for candidato in sorted(candidatos, key=self.ordem.__getitem__):
+            distancia = self.distancia(palavra, candidato, limite)
+            if distancia < melhor_distancia:
+                melhor, melhor_distancia = candidato, distancia
+        return melhor
+
+
+class AnalisadorLexico:
+    # Motores de varredura disponíveis para casar os padrões de tokens
+    MOTORES = ('sequencial', 'combinado')
+    
+    # Formatos de escrever_tokens, cabeçalho do formato CSV e linhas por chamada a write
+    FORMATOS_SAIDA = ('tabela', 'jsonl', 'csv', 'binario')
+    COLUNAS_CSV = ('tipo', 'lexema', 'linha', 'coluna', 'descricao', 'erro')
+    LINHAS_POR_ESCRITA = 2048
+    # Tokens que iterar_tokens retém, no máximo, à espera de um erro anterior a eles
+    MAX_TOKENS_RETIDOS = 8192
+    
+    # Menor fatia de analisar_paralelo: abaixo disso a comunicação custa mais que a varredura
+    LINHAS_MINIMAS_POR_FATIA = 2000
+    
+    # Erros comuns de operadores relacionais (válidos apenas dentro de colchetes)
+    OPERADORES_RELACIONAIS_MALFORMADOS = {
+        'e': 'eq',      # "e" em vez de "eq" (igual)
+        'g': 'gt',      # "g" em vez de "gt" (maior que)
+        'l': 'lt',      # "l" em vez de "lt" (menor que)
+        'n': 'ne',      # "n" em vez de "ne" (não igual)
+        'igual': 'eq',  # palavra em português
+        'maior': 'gt',  # palavra em português
+        'menor': 'lt',  # palavra em português
+    }
+    
+    # Erros comuns de palavras reservadas
+    PALAVRAS_RESERVADAS_MALFORMADAS = {
+        'wr': 'wrt',        # "wr" em vez de "wrt"
+        'wt': 'wrt',        # "wt" em vez de "wrt"
+        'write': 'wrt',     # palavra em inglês
+        'inp': 'input',     # "inp" em vez de "input"
+        'in': 'input',      # "in" em vez de "input"
+        'read': 'input',    # palavra em inglês
+        'scanf': 'input',   # referência C
+        'int': 'intn',      # "int" em vez de "intn"
+        'cd': 'cdt',        # "cd" em vez de "cdt"
+        'if': 'cdt',        # palavra em inglês
+        'else': '!cdt',     # palavra em inglês
+        'elseif': '!cdt+',  # palavra em inglês
+        'al': 'als',        # "al" em vez de "als"
+        'start': 'als',     # palavra em inglês
+        'function': 'func', # "function" em vez de "func"
+        'fn': 'func',       # "fn" em vez de "func"
+    }
+
+    # Palavras de token_patterns que não entram nos índices de sugestão
+    TIPOS_SEM_SUGESTAO = (TokenType.VALOR_LOGICO, TokenType.OPER_LOGICO)
+
+    # Constantes para limites
+    MAX_IDENTIFICADOR_LENGTH = 30
+    MAX_NUMERO_LENGTH = 15
+    
+    # Definindo os padrões de tokens com base na tabela fornecida
+    token_patterns = [
+        # Comentários (deve vir primeiro para evitar conflitos)
+        (TokenType.COMENTARIO, r'--.*', "Comentário"),
+        
+        # Palavras reservadas (ordem específica para evitar conflitos)
+        (TokenType.INICIO, r'\bals\b', "Palavra reservada para início"),
+        (TokenType.COND_SENAOSE, r'!cdt\+', "Palavra reservada para senãose"),
+        (TokenType.COND_SENAO, r'!cdt(?!\+)', "Palavra reservada para senão"),
+        (TokenType.COND_SE, r'\bcdt\b', "Palavra reservada para se"),
+        (TokenType.REP_PARA, r'\bcycle\b', "Palavra reservada para estrutura de repetição para"),
+        (TokenType.REP_ENQUANTO, r'\bduring\b', "Palavra reservada para estrutura de repetição enquanto"),
+        (TokenType.REP_RANGE, r'\brepeat\b', "Palavra reservada para repetição com contador fixo"),
+        (TokenType.WRT, r'\bwrt\b', "Palavra reservada para saída"),
+        (TokenType.INPUT, r'\binput\b', "Palavra reservada para entrada de dados"),
+        (TokenType.FUNCTION, r'\bfunc\b', "Palavra reservada para criação de funções"),
+        (TokenType.PULAR_LINHA, r'\bbrkln\b', "Palavra reservada para quebra de linha"),
+        
+        # Tipos de variáveis
+        (TokenType.TIPO_VAR, r'\b(intn|den|txt|bln|crt)\b', "Tipos de variáveis"),
+        
+        # Valores lógicos
+        (TokenType.VALOR_LOGICO, r'\b(valid|invalid)\b', "Valor booleano"),
+        
+        # Operadores relacionais
+        (TokenType.OP_REL, r'\b(gt|eq|ne|lt|ge|le)\b', "Operadores relacionais"),
+        
+        # Operadores lógicos
+        (TokenType.OPER_LOGICO, r'\b(and|or)\b', "Operadores lógicos"),
+        
+        # Operador de atribuição
+        (TokenType.OPER_ATRIB, r'<=', "Operador de atribuição"),
+        
+        # Operadores matemáticos
+        (TokenType.OPER_MATEMATICO, r'[+\-*/]', "Operadores matemáticos"),
+        
+        # Valores numéricos (reais devem vir antes dos inteiros)
+        (TokenType.VALOR_REAL, r'\b\d+\.\d+\b', "Valor real"),
+        (TokenType.VALOR_INTEIRO, r'\b\d+\b', "Valor inteiro"),
+        
+        # Strings (valores de texto)
+        (TokenType.VALOR_TEXTO, r'"[^"]*"', "Valor de texto"),
+        
+        # Delimitadores
+        (TokenType.ABRE_PARENT, r'\(', "Abertura de parênteses"),
+        (TokenType.FECHA_PARENT, r'\)', "Fechamento de parênteses"),
+        (TokenType.ABRE_COLCHETES, r'\[', "Abertura de colchetes"),
+        (TokenType.FECHA_COLCHETES, r'\]', "Fechamento de colchetes"),
+        (TokenType.VIRGULA, r',', "Vírgula"),
+        
+        # Identificadores (nomes de funções e variáveis)
+        (TokenType.IDENTIFICADOR, r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', "Identificador"),
+        
+        # Whitespace e quebras de linha
+        (TokenType.NEWLINE, r'\n', "Quebra de linha"),
+        (TokenType.WHITESPACE, r'[ \t]+', "Espaço em branco"),
+    ]
+    
+    @classmethod
+    def _obter_tabelas(cls) -> dict:
+        """
+        Retorna os padrões compilados e as tabelas derivadas de token_patterns,
+        construídos na primeira chamada e guardados na própria classe (cada
+        subclasse, que pode redefinir token_patterns, tem os seus).
+        """
+        tabelas = cls.__dict__.get('_tabelas_compiladas')
+        if tabelas is not None:
+            return tabelas
+        tabelas = {}
+        
+        # Compilar os padrões regex
+        tabelas['compiled_patterns'] = [
+            (token_type, re.compile(pattern), desc) 
+            for token_type, pattern, desc in cls.token_patterns
+        ]
+        
+        # Padrão combinado: uma alternância com um grupo nomeado por padrão,
+        # na mesma ordem de prioridade de token_patterns
+        tabelas['padrao_combinado'] = re.compile('|'.join(
+            f'(?P<p{indice}>{pattern})'
+            for indice, (_, pattern, _) in enumerate(cls.token_patterns)
+        ))
+        # Descrição constante de cada tipo de token válido
+        tabelas['descricoes'] = {token_type: desc for token_type, _, desc in cls.token_patterns}
+        
+        tabelas['grupos_combinados'] = {
+            f'p{indice}': (token_type, desc)
+            for indice, (token_type, _, desc) in enumerate(cls.token_patterns)
+        }
+        
+        # Padrões usados pelas verificações de erro: a sequência de caracteres de
+        # palavra (letras, dígitos, '_' e '@') e a palavra ASCII que começa na posição
+        tabelas['padrao_sequencia_palavra'] = re.compile(r'[\w@]*')
+        tabelas['padrao_palavra'] = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*\b')
+        
+        # Palavras de cada padrão formado só por palavras inteiras, como \b(intn|den)\b,
+        # na ordem de token_patterns
+        palavras_por_tipo = {}
+        # Classificação de uma palavra inteira pelo lexema: as palavras dos padrões
+        # anteriores ao de identificador (o primeiro padrão vence, como na varredura)
+        # e, para as demais, IDENTIFICADOR. Fica None se algum desses padrões anteriores
+        # puder casar uma palavra sem ser uma lista de palavras inteiras.
+        classificacao = {}
+        antes_do_identificador = True
+        for token_type, pattern, _ in cls.token_patterns:
+            palavras = re.fullmatch(r'\\b\(?(\w+(?:\|\w+)*)\)?\\b', pattern)
+            if token_type == TokenType.IDENTIFICADOR:
+                antes_do_identificador = False
+            elif palavras:
+                palavras_por_tipo.setdefault(token_type, []).extend(palavras.group(1).split('|'))
+                if antes_do_identificador and classificacao is not None:
+                    for palavra in palavras.group(1).split('|'):
+                        classificacao.setdefault(palavra, token_type)
+            elif antes_do_identificador and cls._pode_comecar_palavra(pattern):
+                classificacao = None
+        tabelas['palavras_por_tipo'] = palavras_por_tipo
+        tabelas['classificacao_palavras'] = (
+            None if classificacao is None or antes_do_identificador else MappingProxyType(classificacao))
+        
+        cls._tabelas_compiladas = tabelas
+        return tabelas
+    
+    @staticmethod
+    def _pode_comecar_palavra(pattern: str) -> bool:
+        """
+        Indica se o padrão pode casar a partir de uma letra ou '_'.
+
+        Examina só o primeiro elemento do padrão; na dúvida (alternativas, grupos,
+        classes com letras), responde que pode.
+        """
+        if pattern.startswith(r'\b'):
+            pattern = pattern[2:]
+        if not pattern or '|' in pattern or pattern[0] in '(.':
+            return True
+        if pattern[0] == '\\':
+            # \d, \s, \n, \t e símbolos escapados não começam palavras
+            return len(pattern) < 2 or (pattern[1].isalnum() and pattern[1] not in 'dsnt')
+        if pattern[0] == '[':
+            fim = pattern.find(']', 2)
+            classe = pattern[1:fim] if fim != -1 else pattern[1:]
+            classe = re.sub(r'\\([dsnt]|\W)', '', classe)
+            return fim == -1 or classe.startswith('^') or any(c.isalpha() or c in '_\\' for c in classe)
+        return pattern[0].isalnum() or pattern[0] == '_'
+    
+    def __init__(self, motor: str = 'sequencial', distancia_sugestoes: int = 0):
+        """
+        Cria o analisador léxico.
+
+        motor: 'sequencial' testa cada padrão de token_patterns, um após o outro;
+        'combinado' junta todos os padrões em uma única expressão regular com
+        grupos nomeados, custando uma única tentativa de casamento por token.
+        Ambos produzem exatamente a mesma sequência de tokens.
+
+        distancia_sugestoes: se maior que zero, além das tabelas de erros comuns,
+        identificadores a até essa distância de edição de uma palavra reservada ou
+        tipo (ou, dentro de colchetes, de um operador relacional) viram erros de
+        palavra ou operador mal formado, com a palavra mais próxima como sugestão.
+        """
+        if motor not in self.MOTORES:
+            raise ValueError(f"Motor de varredura desconhecido: '{motor}'. Use um de: {', '.join(self.MOTORES)}")
+        if distancia_sugestoes < 0:
+            raise ValueError("distancia_sugestoes não pode ser negativa")
+        self.motor = motor
+        self.distancia_sugestoes = distancia_sugestoes
+        # Instrumentação opcional (ativar_perfil)
+        self.perfil = None
+        
+        # Tabelas compiladas uma vez por processo e compartilhadas por todas as instâncias
+        tabelas = type(self)._obter_tabelas()
+        self.compiled_patterns = tabelas['compiled_patterns']
+        self.padrao_combinado = tabelas['padrao_combinado']
+        self.descricoes = tabelas['descricoes']
+        self.grupos_combinados = tabelas['grupos_combinados']
+        self.padrao_sequencia_palavra = tabelas['padrao_sequencia_palavra']
+        self.padrao_palavra = tabelas['padrao_palavra']
+        self.classificacao_palavras = tabelas['classificacao_palavras']
+        
+        self.sugestoes_palavras = None
+        self.sugestoes_operadores = None
+        if distancia_sugestoes:
+            palavras_por_tipo = tabelas['palavras_por_tipo']
+            todas = [palavra for palavras in palavras_por_tipo.values() for palavra in palavras]
+            self.sugestoes_palavras = IndiceSugestoes(
+                (palavra for tipo, palavras in palavras_por_tipo.items()
+                 if tipo != TokenType.OP_REL and tipo not in self.TIPOS_SEM_SUGESTAO for palavra in palavras),
+                distancia_sugestoes, todas)
+            self.sugestoes_operadores = IndiceSugestoes(
+                palavras_por_tipo.get(TokenType.OP_REL, ()), distancia_sugestoes, todas)
+        
+        if motor == 'combinado':
+            self._casar_padrao = self._casar_combinado
+        else:
+            self._casar_padrao = self._casar_sequencial
+    
+    def _casar_sequencial(self, linha: str, coluna: int) -> Optional[Tuple[TokenType, str, re.Match]]:
+        """Tenta cada padrão compilado em ordem e retorna o primeiro que casar."""
+        for token_type, pattern, desc in self.compiled_patterns:
+            match = pattern.match(linha, coluna)
+            if match:
+                return token_type, desc, match
+        return None
+    
+    def _casar_perfilado(self, linha: str, coluna: int,
+                         perfil: PerfilAnalise) -> Optional[Tuple[TokenType, str, re.Match]]:
+        """Igual a _casar_padrao, medindo o tempo e contando as tentativas de regex."""
+        inicio = time.perf_counter()
+        if self.motor == 'combinado':
+            casamento = self._casar_combinado(linha, coluna)
+            tentativas = 1
+        else:
+            casamento = None
+            tentativas = 0
+            for token_type, pattern, desc in self.compiled_patterns:
+                tentativas += 1
+                match = pattern.match(linha, coluna)
+                if match:
+                    casamento = (token_type, desc, match)
+                    break
+        perfil.tempos['padroes'] += time.perf_counter() - inicio
+        perfil.chamadas['padroes'] += 1
+        perfil.tentativas_por_token[tentativas] += 1
+        
+        # As verificações de erro já examinaram o token que começa com letra ou dígito
+        if casamento and (linha[coluna].isalnum() or linha[coluna] == '_'):
+            perfil.caracteres_reexaminados += casamento[2].end() - coluna
+        return casamento
+    
+    def _casar_combinado(self, linha: str, coluna: int) -> Optional[Tuple[TokenType, str, re.Match]]:
+        """Casa todos os padrões com uma única tentativa do padrão combinado."""
+        match = self.padrao_combinado.match(linha, coluna)
+        if match is None:
+            return None
+        token_type, desc = self.grupos_combinados[match.lastgroup]
+        return token_type, desc, match
+    
+    def _verificar_inicio_numerico(self, linha: str, posicao: int) -> Optional[Tuple[TokenType, int]]:
+        """
+        Verifica números e identificadores mal formados que começam com dígito.
+
+        Une as verificações de número mal formado, número muito longo e
+        identificador começando com número em uma única varredura da sequência.
+        Retorna o tipo de erro e a posição final do lexema, ou None.
+        """
+        tamanho = len(linha)
+        pos_atual = posicao + 1
+        tem_ponto = False
+        
+        while pos_atual < tamanho:
+            char = linha[pos_atual]
+            if char.isdigit():
+                pos_atual += 1
+            elif char == '.' and not tem_ponto:
+                tem_ponto = True
+                pos_atual += 1
+            elif char.isalpha():
+                # Número seguido de letra - coleta até encontrar um delimitador
+                pos_atual += 1
+                while pos_atual < tamanho and (linha[pos_atual].isalnum() or linha[pos_atual] == '.'):
+                    pos_atual += 1
+                return TokenType.ERRO_NUMERO_MALFORMADO, pos_atual
+            else:
+                break
+        
+        # Verifica se o número é muito longo
+        if pos_atual - posicao > self.MAX_NUMERO_LENGTH:
+            return TokenType.ERRO_NUMERO_MUITO_LONGO, pos_atual
+        
+        # Identificador começando com número (ex: 1_a, 1@)
+        fim = self.padrao_sequencia_palavra.match(linha, posicao).end()
+        if any(c.isalpha() or c in '_@' for c in linha[posicao:fim]):
+            return TokenType.ERRO_IDENTIFICADOR_MALFORMADO, fim
+        
+        return None
+    
+    def _verificar_inicio_alfabetico(self, linha: str, posicao: int,
+                                     dentro_de_colchetes: bool) -> Optional[Tuple[TokenType, int]]:
+        """
+        Verifica identificadores, operadores relacionais e palavras reservadas mal
+        formados e classifica as palavras válidas.
+
+        A sequência de caracteres de palavra é delimitada uma única vez; a palavra
+        resultante é consultada nas tabelas de erros comuns e, se não for um erro,
+        classificada pela tabela de palavras (palavra reservada, tipo, valor lógico,
+        operador ou identificador) sem tentar os padrões um a um.
+        Retorna o tipo (de erro ou da palavra) e a posição final do lexema, ou None
+        quando a posição deve ser decidida pelos padrões.
+        """
+        fim = self.padrao_sequencia_palavra.match(linha, posicao).end()
+        
+        # Identificador com caracteres inválidos
+        if linha.find('@', posicao, fim) != -1:
+            return TokenType.ERRO_IDENTIFICADOR_MALFORMADO, fim
+        
+        # Verifica se o identificador é muito longo
+        if fim - posicao > self.MAX_IDENTIFICADOR_LENGTH:
+            return TokenType.ERRO_IDENTIFICADOR_MUITO_LONGO, fim
+        
+        # Extrai a próxima palavra
+        match = self.padrao_palavra.match(linha, posicao)
+        if match:
+            lexema = match.group(0)
+            
+            # Dentro de uma condição, verifica se é um operador malformado
+            if dentro_de_colchetes and lexema in self.OPERADORES_RELACIONAIS_MALFORMADOS:
+                return TokenType.ERRO_OPERADOR_RELACIONAL_MALFORMADO, match.end()
+            
+            # Verifica se é uma palavra reservada malformada
+            if lexema in self.PALAVRAS_RESERVADAS_MALFORMADAS:
+                return TokenType.ERRO_PALAVRA_RESERVADA_MALFORMADA, match.end()
+            
+            # Palavras próximas de uma palavra da linguagem (com distancia_sugestoes)
+            if self.distancia_sugestoes:
+                if dentro_de_colchetes and self.sugestoes_operadores.sugerir(lexema):
+                    return TokenType.ERRO_OPERADOR_RELACIONAL_MALFORMADO, match.end()
+                if self.sugestoes_palavras.sugerir(lexema):
+                    return TokenType.ERRO_PALAVRA_RESERVADA_MALFORMADA, match.end()
+            
+            # Palavra válida: um acesso à tabela, desde que a palavra comece em uma
+            # fronteira (o \b inicial dos padrões), como depois de espaço ou símbolo
+            classificacao = self.classificacao_palavras
+            if classificacao is not None:
+                anterior = linha[posicao - 1] if posicao else ' '
+                if not (anterior.isalnum() or anterior == '_'):
+                    return classificacao.get(lexema, TokenType.IDENTIFICADOR), match.end()
+        
+        return None
+    
+    def descrever(self, tipo: TokenType, lexema: str) -> str:
+        """
+        Retorna a descrição de um token léxico a partir do seu tipo e lexema.
+
+        As descrições dos tokens válidos são as constantes de token_patterns; as dos
+        erros léxicos são montadas a partir do lexema, como na varredura.
+        """
+        if tipo in self.descricoes:
+            return self.descricoes[tipo]
+        if tipo == TokenType.ERRO_STRING_NAO_FECHADA:
+            return f"String não fechada: '{lexema}'"
+        if tipo == TokenType.ERRO_NUMERO_MALFORMADO:
+            return f"Número mal formado: '{lexema}'"
+        if tipo == TokenType.ERRO_NUMERO_MUITO_LONGO:
+            return f"Número muito longo (máximo {self.MAX_NUMERO_LENGTH} caracteres): '{lexema}'"
+        if tipo == TokenType.ERRO_IDENTIFICADOR_MALFORMADO:
+            if lexema[:1].isdigit():
+                return f"Identificador mal formado (não pode começar com número): '{lexema}'"
+            return f"Identificador mal formado (contém caracteres inválidos): '{lexema}'"
+        if tipo == TokenType.ERRO_IDENTIFICADOR_MUITO_LONGO:
+            return f"Identificador muito longo (máximo {self.MAX_IDENTIFICADOR_LENGTH} caracteres): '{lexema}'"
+        if tipo == TokenType.ERRO_OPERADOR_RELACIONAL_MALFORMADO:
+            sugestao = self.OPERADORES_RELACIONAIS_MALFORMADOS.get(lexema) or self.sugestoes_operadores.sugerir(lexema)
+            return f"Operador relacional mal formado: '{lexema}'. Sugestão: use '{sugestao}'"
+        if tipo == TokenType.ERRO_PALAVRA_RESERVADA_MALFORMADA:
+            sugestao = self.PALAVRAS_RESERVADAS_MALFORMADAS.get(lexema) or self.sugestoes_palavras.sugerir(lexema)
+            return f"Palavra reservada mal formada: '{lexema}'. Sugestão: use '{sugestao}'"
+        if tipo == TokenType.ERRO_SIMBOLO_INVALIDO:
+            return f"Símbolo não pertencente ao conjunto de símbolos terminais da linguagem: '{lexema}'"
+        if tipo == TokenType.ERRO:
+            return f"Caractere não reconhecido: '{lexema}'"
+        if tipo == TokenType.EOF:
+            return "Fim do arquivo"
+        return ""
+
+    def _varrer_linha(self, linha: str, trechos: List[Tuple[TokenType, int, int]]) -> None:
+        """
+        Varre uma linha e acrescenta à lista um trecho (tipo, início, fim) por token.
+
+        As verificações de erro são escolhidas pelo primeiro caractere da posição
+        atual, e as posições de aspas e colchetes são calculadas uma vez por linha,
+        de modo que cada caractere é examinado um número limitado de vezes.
+        """
+        tamanho = len(linha)
+        ultima_aspa = linha.rfind('"')
+        primeiro_abre_colchete = linha.find('[')
+        ultimo_fecha_colchete = linha.rfind(']')
+        coluna = 0
+        perfil = self.perfil
+        if perfil is not None:
+            perfil.linhas += 1
+            perfil.caracteres_varridos += tamanho
+        
+        while coluna < tamanho:
+            char = linha[coluna]
+            
+            # Verifica erros específicos primeiro
+            if char == '"':
+                if coluna == ultima_aspa:
+                    # String não fechada: consome o restante da linha
+                    trechos.append((TokenType.ERRO_STRING_NAO_FECHADA, coluna, tamanho))
+                    break
+            elif char.isdigit():
+                if perfil is None:
+                    erro = self._verificar_inicio_numerico(linha, coluna)
+                else:
+                    erro = perfil.medir('verificacoes_erro', self._verificar_inicio_numerico, linha, coluna)
+                    self._registrar_verificacao(perfil, 'numerica', erro)
+                if erro:
+                    trechos.append((erro[0], coluna, erro[1]))
+                    coluna = erro[1]
+                    continue
+            elif char.isalpha() or char == '_':
+                dentro_de_colchetes = (primeiro_abre_colchete != -1 and
+                                       primeiro_abre_colchete < coluna <= ultimo_fecha_colchete)
+                if perfil is None:
+                    palavra = self._verificar_inicio_alfabetico(linha, coluna, dentro_de_colchetes)
+                else:
+                    palavra = perfil.medir('verificacoes_erro', self._verificar_inicio_alfabetico,
+                                           linha, coluna, dentro_de_colchetes)
+                    self._registrar_verificacao(perfil, 'alfabetica', palavra)
+                if palavra:
+                    trechos.append((palavra[0], coluna, palavra[1]))
+                    coluna = palavra[1]
                     continue
+            
+            # Tenta fazer match com os padrões (conforme o motor escolhido)
+            if perfil is None:
+                casamento = self._casar_padrao(linha, coluna)
+            else:
+                casamento = self._casar_perfilado(linha, coluna, perfil)
+            if casamento:
+                token_type, _, match = casamento
+                fim = match.end()
                 
-                # Tenta fazer match com cada padrão
-                for token_type, pattern, desc in self.compiled_patterns:
-                    match = pattern.match(linha, coluna)
-                    
-                    if match:
-                        lexema = match.group(0)
-                        
-                        # Verifica se identificador é muito longo
-                        if token_type == TokenType.IDENTIFICADOR and len(lexema) > self.MAX_IDENTIFICADOR_LENGTH:
-                            token = Token(
-                                tipo=TokenType.ERRO_IDENTIFICADOR_MUITO_LONGO,
-                                lexema=lexema,
-                                linha=num_linha,
-                                coluna=coluna + 1,
-                                descricao=f"Identificador muito longo (máximo {self.MAX_IDENTIFICADOR_LENGTH} caracteres): '{lexema}'",
-                                eh_erro=True
-                            )
-                        elif token_type == TokenType.VALOR_INTEIRO and len(lexema) > self.MAX_NUMERO_LENGTH:
-                            token = Token(
-                                tipo=TokenType.ERRO_NUMERO_MUITO_LONGO,
-                                lexema=lexema,
-                                linha=num_linha,
-                                coluna=coluna + 1,
-                                descricao=f"Número muito longo (máximo {self.MAX_NUMERO_LENGTH} caracteres): '{lexema}'",
-                                eh_erro=True
-                            )
-                        else:
-                            # Pula whitespace (mas não quebras de linha)
-                            if token_type == TokenType.WHITESPACE:
-                                coluna = match.end()
-                                token_encontrado = True
-                                break
-                            
-                            token = Token(
-                                tipo=token_type,
-                                lexema=lexema,
-                                linha=num_linha,
-                                coluna=coluna + 1,
-                                descricao=desc
-                            )
-                        
-                        tokens.append(token)
-                        coluna = match.end()
-                        token_encontrado = True
-                        break
+                # Verifica se identificador ou número é muito longo
+                if token_type == TokenType.IDENTIFICADOR and fim - coluna > self.MAX_IDENTIFICADOR_LENGTH:
+                    trechos.append((TokenType.ERRO_IDENTIFICADOR_MUITO_LONGO, coluna, fim))
+                elif token_type == TokenType.VALOR_INTEIRO and fim - coluna > self.MAX_NUMERO_LENGTH:
+                    trechos.append((TokenType.ERRO_NUMERO_MUITO_LONGO, coluna, fim))
+                elif token_type != TokenType.WHITESPACE:
+                    # Whitespace é pulado (mas não quebras de linha)
+                    trechos.append((token_type, coluna, fim))
                 
-                if not token_encontrado:
-                    # Verifica se é um símbolo inválido específico
-                    char = linha[coluna]
-                    if char in '@$%#&!':
-                        token = Token(
-                            tipo=TokenType.ERRO_SIMBOLO_INVALIDO,
-                            lexema=char,
-                            linha=num_linha,
-                            coluna=coluna + 1,
-                            descricao=f"Símbolo não pertencente ao conjunto de símbolos terminais da linguagem: '{char}'",
-                            eh_erro=True
-                        )
-                    else:
-                        # Caractere não reconhecido genérico
-                        token = Token(
-                            tipo=TokenType.ERRO,
-                            lexema=char,
-                            linha=num_linha,
-                            coluna=coluna + 1,
-                            descricao=f"Caractere não reconhecido: '{char}'",
-                            eh_erro=True
-                        )
-                    
-                    tokens.append(token)
-                    coluna += 1
-          # Adiciona token EOF
-        tokens.append(Token(
+                coluna = fim
+            else:
+                # Símbolo inválido específico ou caractere não reconhecido genérico
+                if char in '@$%#&!':
+                    trechos.append((TokenType.ERRO_SIMBOLO_INVALIDO, coluna, coluna + 1))
+                else:
+                    trechos.append((TokenType.ERRO, coluna, coluna + 1))
+                coluna += 1
+    
+    @staticmethod
+    def _registrar_verificacao(perfil: PerfilAnalise, verificacao: str,
+                               erro: Optional[Tuple[TokenType, int]]) -> None:
+        perfil.verificacoes[verificacao] += 1
+        if erro:
+            if erro[0] in TIPOS_ERRO:
+                perfil.acertos_verificacoes[erro[0]] += 1
+            else:
+                # Palavra classificada pela tabela, sem nenhuma tentativa de regex
+                perfil.tentativas_por_token[0] += 1
+    
+    def ativar_perfil(self) -> PerfilAnalise:
+        """
+        Passa a registrar tempos e contadores das análises em um novo PerfilAnalise.
+
+        Sem perfil ativo, o custo da instrumentação é uma comparação com None por
+        verificação, tentativa de casamento e regra de validação.
+        """
+        self.perfil = PerfilAnalise()
+        return self.perfil
+    
+    def desativar_perfil(self) -> Optional[PerfilAnalise]:
+        """Para de registrar e retorna o perfil que estava ativo."""
+        perfil, self.perfil = self.perfil, None
+        return perfil
+    
+    def _tokenizar_linha(self, linha: str, num_linha: int, tokens: List[Token]) -> None:
+        """Varre uma linha e acrescenta seus tokens à lista."""
+        trechos = []
+        self._varrer_linha(linha, trechos)
+        descricoes = self.descricoes
+        
+        for tipo, inicio, fim in trechos:
+            lexema = linha[inicio:fim]
+            if tipo in descricoes:
+                tokens.append(Token(tipo, lexema, num_linha, inicio + 1, descricoes[tipo]))
+            else:
+                tokens.append(Token(tipo, lexema, num_linha, inicio + 1, self.descrever(tipo, lexema), True))
+
+    def analisar(self, codigo: str, indice: Optional[IndiceSimbolos] = None,
+                 limites: Optional[LimitesAnalise] = None) -> List[Token]:
+        """
+        Analisa o código e retorna os tokens e erros em ordem de posição.
+
+        Se indice for dado, ele recebe os símbolos do programa durante a análise.
+        Com limites, a análise para no primeiro limite atingido e o resultado é um
+        ResultadoAnalise, possivelmente truncado.
+        """
+        if limites is None:
+            return self._analisar_linhas(codigo.split('\n'), indice)
+        if limites.max_caracteres is not None:
+            # O caractere a mais indica se o código passa do limite
+            codigo = codigo[:limites.max_caracteres + 1]
+        return self._analisar_com_limites(self._linhas_do_texto(codigo), indice, limites)
+    
+    def analisar_paralelo(self, codigo: str, processos: Optional[int] = None,
+                          linhas_por_fatia: Optional[int] = None,
+                          indice: Optional[IndiceSimbolos] = None) -> List[Token]:
+        """
+        Analisa o código dividindo a varredura léxica entre processos; retorna os
+        mesmos tokens de analisar().
+
+        Cada linha é varrida sem depender das outras, então o código é dividido em
+        fatias de linhas consecutivas, varridas em paralelo. Os trechos de cada
+        fatia voltam como colunas numéricas, com a linha relativa à fatia; os
+        tokens são montados com o número de linha corrigido, na ordem das fatias,
+        e as validações rodam uma única vez sobre a sequência completa (enquanto
+        as fatias seguintes ainda estão sendo varridas).
+
+        processos: número de processos (padrão: número de CPUs). Com um único
+        processo, ou com poucas linhas, equivale a analisar().
+        """
+        linhas = codigo.split('\n')
+        processos = processos or os.cpu_count() or 1
+        if linhas_por_fatia is None:
+            # Algumas fatias por processo, para que nenhum fique ocioso no fim
+            linhas_por_fatia = max(self.LINHAS_MINIMAS_POR_FATIA, -(-len(linhas) // (processos * 4)))
+        if processos == 1 or len(linhas) <= linhas_por_fatia:
+            return self._analisar_linhas(linhas, indice)
+        
+        inicios_fatias = range(0, len(linhas), linhas_por_fatia)
+        fatias = ('\n'.join(linhas[inicio:inicio + linhas_por_fatia]) for inicio in inicios_fatias)
+        
+        import multiprocessing
+        with multiprocessing.Pool(processos, initializer=_iniciar_processo_fatias,
+                                  initargs=(self.motor, self.distancia_sugestoes)) as pool:
+            trechos_fatias = pool.imap(_varrer_fatia, fatias)
+            tokens_lexicos = self._montar_tokens_fatias(linhas, inicios_fatias, trechos_fatias)
+            return list(ValidadorIncremental(perfil=self.perfil, indice=indice).intercalar(tokens_lexicos))
+    
+    def _montar_tokens_fatias(self, linhas: List[str], inicios_fatias: Iterable[int],
+                              trechos_fatias: Iterable[tuple]) -> Iterator[Token]:
+        """Gera os tokens léxicos das fatias varridas por _varrer_fatia e, por fim, o EOF."""
+        todos_os_tipos = TokenArray.TIPOS
+        descricoes = self.descricoes
+        
+        for inicio_fatia, (tipos, linhas_relativas, inicios, fins) in zip(inicios_fatias, trechos_fatias):
+            linhas_relativas, inicios, fins = (array('I', coluna) for coluna in (linhas_relativas, inicios, fins))
+            for ordinal, relativa, inicio, fim in zip(tipos, linhas_relativas, inicios, fins):
+                tipo = todos_os_tipos[ordinal]
+                num_linha = inicio_fatia + relativa
+                lexema = linhas[num_linha][inicio:fim]
+                if tipo in descricoes:
+                    yield Token(tipo, lexema, num_linha + 1, inicio + 1, descricoes[tipo])
+                else:
+                    yield Token(tipo, lexema, num_linha + 1, inicio + 1, self.descrever(tipo, lexema), True)
+        
+        yield Token(
             tipo=TokenType.EOF,
             lexema="",
             linha=len(linhas) + 1,
             coluna=1,
             descricao="Fim do arquivo"
-        ))
+        )
+    
+    def analisar_compacto(self, codigo: str) -> TokenArray:
+        """
+        Analisa o código e retorna um TokenArray com os mesmos tokens de analisar().
+
+        Nenhum objeto Token é mantido para os tokens léxicos: cada um é guardado
+        como colunas numéricas que apontam para o trecho correspondente de codigo.
+        """
+        resultado = TokenArray(codigo, self)
+        # Trecho de codigo de cada token léxico ainda não devolvido pelo validador
+        trechos_pendentes = deque()
+        
+        def gerar_tokens():
+            trechos = []
+            inicio_linha = 0
+            num_linha = 0
+            
+            while True:
+                num_linha += 1
+                fim_linha = codigo.find('\n', inicio_linha)
+                linha = codigo[inicio_linha:] if fim_linha == -1 else codigo[inicio_linha:fim_linha]
+                
+                self._varrer_linha(linha, trechos)
+                for tipo, inicio, fim in trechos:
+                    token = Token(tipo, linha[inicio:fim], num_linha, inicio + 1)
+                    trechos_pendentes.append((token, inicio_linha + inicio, fim - inicio))
+                    yield token
+                trechos.clear()
+                
+                if fim_linha == -1:
+                    break
+                inicio_linha = fim_linha + 1
+            
+            eof = Token(TokenType.EOF, "", num_linha + 1, 1, "Fim do arquivo")
+            trechos_pendentes.append((eof, len(codigo), 0))
+            yield eof
+        
+        for token in ValidadorIncremental(perfil=self.perfil).intercalar(gerar_tokens()):
+            if trechos_pendentes and trechos_pendentes[0][0] is token:
+                # Token léxico: guarda só a posição do trecho
+                _, inicio, tamanho = trechos_pendentes.popleft()
+                resultado.acrescentar(token.tipo, token.linha, token.coluna, inicio, tamanho)
+            else:
+                resultado.acrescentar_token(token)
+        
+        return resultado
+    
+    def _analisar_linhas(self, linhas: Iterable[str], indice: Optional[IndiceSimbolos] = None) -> List[Token]:
+        """Analisa uma sequência de linhas (sem o caractere de quebra de linha)."""
+        # As validações acompanham a varredura e os erros já saem na posição certa
+        validador = ValidadorIncremental(perfil=self.perfil, indice=indice)
+        return list(validador.intercalar(self._gerar_tokens_lexicos(linhas)))
+    
+    def _analisar_com_limites(self, linhas: Iterable[str], indice: Optional[IndiceSimbolos],
+                              limites: LimitesAnalise) -> ResultadoAnalise:
+        """
+        Analisa uma sequência de linhas como _analisar_linhas, parando no primeiro
+        limite atingido.
+
+        O tempo e os caracteres são controlados na entrega das linhas à varredura;
+        quando um deles se esgota, a varredura termina sem o EOF e o validador
+        devolve o que já foi determinado. Os erros também são contados à medida
+        que são produzidos (os léxicos pela varredura, os de validação pelo
+        validador), mesmo os que o validador ainda retém à espera de um estado
+        pendente, como um input com variável não declarada ou um colchete aberto:
+        a varredura para ao chegar a max_erros, e a saída do validador é cortada
+        no erro de número max_erros.
+        """
+        resultado = ResultadoAnalise()
+        max_erros = limites.max_erros
+        validador = ValidadorIncremental(perfil=self.perfil, indice=indice)
+        prazo = None if limites.tempo_maximo is None else time.perf_counter() + limites.tempo_maximo
+        
+        def linhas_limitadas():
+            restantes = limites.max_caracteres
+            for linha in linhas:
+                if prazo is not None and time.perf_counter() > prazo:
+                    resultado.motivo = 'tempo_maximo'
+                    return
+                if restantes is not None:
+                    if len(linha) > restantes:
+                        resultado.motivo = 'max_caracteres'
+                        if restantes > 0:
+                            yield linha[:restantes]
+                        return
+                    restantes -= len(linha) + 1
+                yield linha
+        
+        def tokens_lexicos():
+            erros_lexicos = 0
+            for token in self._gerar_tokens_lexicos(linhas_limitadas()):
+                if token.tipo == TokenType.EOF and resultado.truncado:
+                    return
+                if max_erros is not None and erros_lexicos + validador.total_erros_intercalados >= max_erros:
+                    resultado.motivo = 'max_erros'
+                    return
+                yield token
+                if token.eh_erro:
+                    erros_lexicos += 1
+        
+        erros = 0
+        for token in validador.intercalar(tokens_lexicos()):
+            resultado.append(token)
+            if token.eh_erro:
+                erros += 1
+                if erros == max_erros:
+                    resultado.motivo = 'max_erros'
+                    break
+        return resultado
+    
+    @staticmethod
+    def _linhas_do_texto(codigo: str) -> Iterator[str]:
+        """Gera as linhas de codigo, como codigo.split('\\n'), sem dividir o texto inteiro de uma vez."""
+        inicio = 0
+        while True:
+            fim = codigo.find('\n', inicio)
+            if fim == -1:
+                yield codigo[inicio:]
+                return
+            yield codigo[inicio:fim]
+            inicio = fim + 1
+    
+    def _gerar_tokens_lexicos(self, linhas: Iterable[str]) -> Iterator[Token]:
+        """Gera os tokens léxicos de cada linha e, por fim, o token EOF."""
+        tokens_linha = []
+        total_linhas = 0
+        
+        for total_linhas, linha in enumerate(linhas, 1):
+            self._tokenizar_linha(linha, total_linhas, tokens_linha)
+            yield from tokens_linha
+            tokens_linha.clear()
+        
+        yield Token(
+            tipo=TokenType.EOF,
+            lexema="",
+            linha=total_linhas + 1,
+            coluna=1,
+            descricao="Fim do arquivo"
+        )
+    
+    @staticmethod
+    def _linhas_da_fonte(fonte: Iterable[str]) -> Iterator[str]:
+        """Gera as linhas de uma fonte lida linha a linha, sem a quebra de linha."""
+        terminou_com_quebra = True
+        for linha in fonte:
+            terminou_com_quebra = linha.endswith('\n')
+            yield linha[:-1] if terminou_com_quebra else linha
+        
+        # Uma fonte vazia ou terminada em quebra de linha tem uma última linha vazia
+        if terminou_com_quebra:
+            yield ''
+    
+    def cabecalho_tabela(self) -> str:
+        """Retorna o cabeçalho da tabela de tokens usada por imprimir_tokens."""
+        return f"{'Token':<25} {'Lexema':<20} {'Linha':<6} {'Coluna':<7} {'Descrição'}\n" + "-" * 100 + "\n"
+    
+    def formatar_token(self, token: Token) -> str:
+        """Formata um token como uma linha da tabela de imprimir_tokens."""
+        return f"{token.tipo.value:<25} {token.lexema:<20} {token.linha:<6} {token.coluna:<7} {token.descricao}\n"
+    
+    def formatar_token_json(self, token: Token) -> str:
+        """
+        Formata um token como uma linha JSON (formato 'jsonl' de escrever_tokens).
+
+        Equivale a json.dumps do dicionário com tipo, lexema, linha, coluna,
+        descricao e erro (com ensure_ascii=False), montado sem criar o dicionário.
+        """
+        texto_json = json.encoder.encode_basestring
+        return (f'{{"tipo": {texto_json(token.tipo.value)}, "lexema": {texto_json(token.lexema)}, '
+                f'"linha": {token.linha}, "coluna": {token.coluna}, '
+                f'"descricao": {texto_json(token.descricao)}, "erro": {"true" if token.eh_erro else "false"}}}\n')
+    
+    def escrever_tokens(self, tokens: Iterable[Token], saida: TextIO, formato: str = 'tabela') -> dict:
+        """
+        Escreve os tokens (exceto o EOF) em um arquivo aberto em modo texto e
+        retorna as estatísticas, como obter_estatisticas.
+
+        formato: 'tabela' (o mesmo texto de imprimir_tokens), 'jsonl' (um objeto
+        JSON por linha), 'csv' (com cabeçalho) ou 'binario' (o formato de
+        ArquivoTokens, com todos os tokens inclusive o EOF; saida deve ser um
+        arquivo aberto em modo binário). Os tokens são percorridos uma
+        única vez e escritos em blocos de LINHAS_POR_ESCRITA linhas, então tokens
+        pode ser o gerador de iterar_tokens: a memória usada não cresce com o
+        tamanho da entrada. As estatísticas são contadas na mesma passada.
+        """
+        if formato == 'tabela':
+            saida.write(self.cabecalho_tabela())
+            formatar = self.formatar_token
+            escrever = lambda bloco: saida.write(''.join(bloco))
+        elif formato == 'jsonl':
+            formatar = self.formatar_token_json
+            escrever = lambda bloco: saida.write(''.join(bloco))
+        elif formato == 'csv':
+            escritor = csv.writer(saida, lineterminator='\n')
+            escritor.writerow(self.COLUNAS_CSV)
+            formatar = lambda token: (token.tipo.value, token.lexema, token.linha, token.coluna,
+                                      token.descricao, int(token.eh_erro))
+            escrever = escritor.writerows
+        elif formato == 'binario':
+            escritor = EscritorArquivoTokens(saida)
+            formatar = escritor.codificar
+            escrever = lambda bloco: saida.write(b''.join(bloco))
+        else:
+            raise ValueError(f"Formato de saída desconhecido: '{formato}'. Use um de: {', '.join(self.FORMATOS_SAIDA)}")
+        
+        linhas_por_escrita = self.LINHAS_POR_ESCRITA
+        # O formato binário guarda o resultado completo, com o EOF
+        eof = None if formato == 'binario' else TokenType.EOF
+        # Estatísticas contadas na mesma passada, por tipo
+        contagem = {}
+        contar = contagem.get
+        bloco = []
+        
+        for token in tokens:
+            tipo = token.tipo
+            contagem[tipo] = contar(tipo, 0) + 1
+            if tipo is not eof:
+                bloco.append(formatar(token))
+                if len(bloco) >= linhas_por_escrita:
+                    escrever(bloco)
+                    bloco.clear()
+        if bloco:
+            escrever(bloco)
+        if formato == 'binario':
+            escritor.finalizar()
+        
+        return self._estatisticas_da_contagem(contagem)
+    
+    def imprimir_tokens(self, tokens: Iterable[Token]) -> str:
+        saida = io.StringIO()
+        self.escrever_tokens(tokens, saida)
+        return saida.getvalue()
+    
+    @staticmethod
+    def _estatisticas_da_contagem(contagem: dict) -> dict:
+        """Monta o resultado de obter_estatisticas a partir da quantidade de tokens por tipo."""
+        total_erros = sum(quantidade for tipo, quantidade in contagem.items() if tipo in TIPOS_ERRO)
+        tipos_tokens = {
+            tipo.value: quantidade for tipo, quantidade in contagem.items()
+            if tipo != TokenType.EOF and tipo != TokenType.WHITESPACE
+        }
+        total_tokens = sum(tipos_tokens.values())
+        return {
+            'total_tokens': total_tokens,
+            'total_erros': total_erros,
+            'tipos_tokens': tipos_tokens,
+            'tokens_validos': total_tokens - total_erros
+        }
+    
+    def obter_estatisticas(self, tokens: Iterable[Token]) -> dict:
+        if isinstance(tokens, (TokenArray, ArquivoTokens)):
+            # Conta direto nos tipos, sem montar os tokens
+            return self._estatisticas_da_contagem(tokens.contar_tipos())
+        
+        # Uma única passada, para aceitar também os tokens de iterar_tokens
+        total_tokens = 0
+        total_erros = 0
+        tipos_tokens = {}
+        
+        for token in tokens:
+            if token.eh_erro:
+                total_erros += 1
+            if token.tipo != TokenType.EOF and token.tipo != TokenType.WHITESPACE:
+                total_tokens += 1
+                if token.tipo.value in tipos_tokens:
+                    tipos_tokens[token.tipo.value] += 1
+                else:
+                    tipos_tokens[token.tipo.value] = 1
+        
+        return {
+            'total_tokens': total_tokens,
+            'total_erros': total_erros,
+            'tipos_tokens': tipos_tokens,
+            'tokens_validos': total_tokens - total_erros
+        }
+    
+    def analisar_arquivo(self, caminho_arquivo: str, usar_mmap: bool = False,
+                         cache: Optional[CacheResultados] = None,
+                         limites: Optional[LimitesAnalise] = None) -> List[Token]:
+        """
+        Analisa um arquivo e retorna os tokens.
+
+        Com usar_mmap=True o arquivo é mapeado em memória e decodificado uma linha
+        por vez, sem manter o conteúdo inteiro como texto.
+
+        Com um cache, um arquivo cujo conteúdo já foi analisado (com as mesmas
+        regras) custa apenas o cálculo do hash e a leitura da entrada do cache.
+
+        Com limites, o resultado é um ResultadoAnalise, como em analisar(); o cache
+        não é usado, e com max_caracteres apenas o início do arquivo é lido.
+        """
+        try:
+            if limites is not None:
+                if usar_mmap:
+                    linhas = self._linhas_mmap(caminho_arquivo, limites.max_caracteres)
+                    return self._analisar_com_limites(linhas, None, limites)
+                with open(caminho_arquivo, 'r', encoding='utf-8') as arquivo:
+                    codigo = arquivo.read(-1 if limites.max_caracteres is None else limites.max_caracteres + 1)
+                return self.analisar(codigo, limites=limites)
+            if cache is not None:
+                return self._analisar_arquivo_com_cache(caminho_arquivo, cache)
+            if usar_mmap:
+                return self._analisar_linhas(self._linhas_mmap(caminho_arquivo))
+            with open(caminho_arquivo, 'r', encoding='utf-8') as arquivo:
+                codigo = arquivo.read()
+            return self.analisar(codigo)
+        except FileNotFoundError:
+            print(f"Erro: Arquivo '{caminho_arquivo}' não encontrado.")
+            return []
+        except Exception as e:
+            print(f"Erro ao ler arquivo: {e}")
+            return []
+    
+    def _analisar_arquivo_com_cache(self, caminho_arquivo: str, cache: CacheResultados) -> List[Token]:
+        with open(caminho_arquivo, 'rb') as arquivo:
+            conteudo = arquivo.read()
+        
+        chave = cache.chave(self, conteudo)
+        tokens = cache.obter(chave)
+        if tokens is None:
+            tokens = self.analisar(self._decodificar(conteudo))
+            cache.guardar(chave, tokens)
+        return tokens
+    
+    @staticmethod
+    def _decodificar(conteudo: bytes) -> str:
+        """Decodifica o conteúdo de um arquivo com as conversões de quebra de linha da leitura em modo texto."""
+        return conteudo.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+    
+    def _linhas_mmap(self, caminho_arquivo: str, max_caracteres: Optional[int] = None) -> Iterator[str]:
+        """
+        Gera as linhas de um arquivo mapeado em memória, como codigo.split('\\n').
+
+        As quebras de linha '\\r\\n' e '\\r' são tratadas como '\\n', igual à leitura em
+        modo texto. Um caractere UTF-8 de vários bytes nunca contém o byte da quebra
+        de linha, então cada linha pode ser decodificada separadamente.
+
+        Com max_caracteres, uma linha que passa do restante do limite é decodificada
+        só até um caractere além dele (o suficiente para indicar o corte) e é a última
+        gerada, de modo que uma linha enorme não é decodificada por inteiro.
+        """
+        with open(caminho_arquivo, 'rb') as arquivo:
+            tamanho = os.fstat(arquivo.fileno()).st_size
+            if tamanho == 0:
+                # Não é possível mapear um arquivo vazio
+                yield ''
+                return
+            
+            with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                inicio = 0
+                restantes = max_caracteres
+                while True:
+                    fim = mapa.find(b'\n', inicio)
+                    fim_trecho = tamanho if fim == -1 else fim
+                    cortada = False
+                    # Um caractere tem no máximo 4 bytes em UTF-8
+                    if restantes is not None and fim_trecho - inicio > 4 * (restantes + 1):
+                        fim_trecho = max(inicio, inicio + 4 * (restantes + 1))
+                        # Recua até o início de um caractere (bytes de continuação são 10xxxxxx)
+                        while fim_trecho > inicio and mapa[fim_trecho] & 0xC0 == 0x80:
+                            fim_trecho -= 1
+                        cortada = True
+                    linha = mapa[inicio:fim_trecho].decode('utf-8')
+                    
+                    if fim != -1 and not cortada and linha.endswith('\r'):
+                        linha = linha[:-1]
+                    partes = linha.split('\r') if '\r' in linha else (linha,)
+                    for parte in partes:
+                        yield parte
+                        if restantes is not None:
+                            restantes -= len(parte) + 1
+                    
+                    if fim == -1 or cortada:
+                        break
+                    inicio = fim + 1
+    
+    def iterar_tokens(self, fonte: Iterable[str], indice: Optional[IndiceSimbolos] = None) -> Iterator[Token]:
+        """
+        Gera os tokens de uma fonte lida linha a linha.
+
+        fonte pode ser um arquivo aberto em modo texto, sys.stdin ou qualquer
+        iterável de linhas. Os tokens são produzidos à medida que cada linha é
+        analisada, e as validações rodam de forma incremental, de modo que a
+        memória usada não cresce com o tamanho da fonte. Os tokens e erros são
+        os mesmos de analisar(); um token só é retido enquanto algum erro anterior
+        a ele ainda pode ser produzido. Se indice for dado, ele recebe os símbolos
+        à medida que os tokens são gerados.
+
+        Um estado pendente que dura muito (um input cuja variável não é declarada,
+        um colchete que não é fechado) reteria todos os tokens seguintes; por isso
+        no máximo MAX_TOKENS_RETIDOS tokens ficam retidos. Passando disso, os
+        tokens são liberados, e o erro decidido depois (no fim do arquivo, por
+        exemplo) sai fora da ordem de posição, após os tokens que o seguem.
+        """
+        validador = ValidadorIncremental(perfil=self.perfil, indice=indice)
+        linhas = self._linhas_da_fonte(fonte)
+        yield from validador.intercalar(self._gerar_tokens_lexicos(linhas), self.MAX_TOKENS_RETIDOS)
+    
+    def iterar_tokens_arquivo(self, caminho_arquivo: str, usar_mmap: bool = False,
+                              indice: Optional[IndiceSimbolos] = None) -> Iterator[Token]:
+        """
+        Gera os tokens de um arquivo sem carregá-lo inteiro na memória.
+
+        Com usar_mmap=True as linhas são lidas do arquivo mapeado em memória.
+
+        Uma falha de leitura (arquivo inexistente, erro de E/S ou conteúdo que não
+        é UTF-8 válido) é informada na saída de erros e encerra os tokens, sem o
+        EOF; as demais exceções são propagadas.
+        """
+        try:
+            if usar_mmap:
+                yield from self.iterar_tokens(self._linhas_mmap(caminho_arquivo), indice)
+                return
+            with open(caminho_arquivo, 'r', encoding='utf-8') as arquivo:
+                yield from self.iterar_tokens(arquivo, indice)
+        except FileNotFoundError:
+            print(f"Erro: Arquivo '{caminho_arquivo}' não encontrado.", file=sys.stderr)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Erro ao ler arquivo: {e}", file=sys.stderr)
+
+
+@dataclass
+class RegistroLinha:
+    """Tokens, erros de validação e estado do validador de uma linha de AnalisadorIncremental."""
+    texto: str
+    tokens: List[Token]
+    linha_base: int                 # Número da linha quando os tokens e erros foram gerados
+    estado: tuple = ()              # Estado do validador ao fim da linha (exportar_estado)
+    variaveis: list = field(default_factory=list)     # Registro de ValidadorIncremental.registro_variaveis
+    erros_inicio: list = field(default_factory=list)
+    erros_tipo: list = field(default_factory=list)
+    erros_condicionais: list = field(default_factory=list)
+    erros_input: list = field(default_factory=list)
+    simbolos: Optional[dict] = None  # Tabela de símbolos ao fim da linha, guardada a cada LINHAS_POR_TABELA linhas
+
+
+class AnalisadorIncremental:
+    """
+    Mantém a análise de um texto que é editado aos poucos.
+
+    Cada linha guarda seus tokens, os erros de validação gerados enquanto eles eram
+    processados e o estado do validador ao seu fim. Uma edição gera novamente os
+    tokens apenas das linhas alteradas; as linhas seguintes são revalidadas só até
+    o estado do validador (e a tabela de variáveis) voltar a coincidir com o de antes
+    da edição, e as demais apenas têm seus números de linha deslocados.
+
+    Para que o custo de uma edição não cresça com as linhas anteriores a ela, a
+    tabela de símbolos é guardada a cada LINHAS_POR_TABELA linhas, e os índices
+    das linhas com erros ficam em uma lista ordenada, usada por erros() e tokens().
+
+    tokens() retorna a mesma lista que AnalisadorLexico.analisar(texto).
+    """
+    
+    # Linhas varridas entre duas consultas a cancelar() em sincronizar
+    LINHAS_POR_CANCELAMENTO = 1000
+    # Distância (em linhas) entre as tabelas de símbolos guardadas nos registros
+    LINHAS_POR_TABELA = 512
+    
+    def __init__(self, codigo: str = '', analisador: Optional[AnalisadorLexico] = None):
+        self.analisador = analisador or AnalisadorLexico()
+        self.linhas: List[RegistroLinha] = []
+        self.linhas_com_erros: List[int] = []   # índices (ordenados) dos registros com algum erro
+        self._tokens = None
+        self._indice = None
+        self.definir_texto(codigo)
+    
+    @property
+    def texto(self) -> str:
+        return '\n'.join(registro.texto for registro in self.linhas)
+    
+    def definir_texto(self, codigo: str) -> None:
+        """Descarta o estado atual e analisa codigo por completo."""
+        self.linhas = []
+        self.linhas_com_erros = []
+        self._substituir(0, 0, codigo.split('\n'))
+    
+    def editar(self, linha_inicio: int, coluna_inicio: int, linha_fim: int, coluna_fim: int, texto: str) -> int:
+        """
+        Substitui o trecho de (linha_inicio, coluna_inicio) até (linha_fim, coluna_fim),
+        exclusive, por texto. Linhas e colunas começam em 1, como nos tokens.
+
+        Retorna quantas linhas foram revalidadas.
+        """
+        if not 1 <= linha_inicio <= linha_fim <= len(self.linhas):
+            raise ValueError(f"Intervalo de linhas inválido: {linha_inicio}-{linha_fim}")
+        primeira = self.linhas[linha_inicio - 1].texto
+        ultima = self.linhas[linha_fim - 1].texto
+        novo_texto = primeira[:coluna_inicio - 1] + texto + ultima[coluna_fim - 1:]
+        return self._substituir(linha_inicio - 1, linha_fim, novo_texto.split('\n'))
+    
+    def substituir_linhas(self, linha_inicio: int, linha_fim: int, novas_linhas: Iterable[str]) -> int:
+        """
+        Substitui as linhas linha_inicio a linha_fim (inclusive, a partir de 1) por
+        novas_linhas. Com linha_fim = linha_inicio - 1 as linhas são apenas inseridas.
+
+        Retorna quantas linhas foram revalidadas.
+        """
+        if not 1 <= linha_inicio <= linha_fim + 1 <= len(self.linhas) + 1:
+            raise ValueError(f"Intervalo de linhas inválido: {linha_inicio}-{linha_fim}")
+        novas_linhas = list(novas_linhas)
+        if not novas_linhas and linha_fim - linha_inicio + 1 == len(self.linhas):
+            # O texto tem sempre ao menos uma linha, como em codigo.split('\n')
+            novas_linhas = ['']
+        return self._substituir(linha_inicio - 1, linha_fim, novas_linhas)
+    
+    def sincronizar(self, codigo: str, cancelar: Optional[Callable[[], bool]] = None) -> Optional[int]:
+        """
+        Atualiza o texto para codigo, tratando como editadas apenas as linhas entre
+        o maior prefixo e o maior sufixo de linhas em comum com o texto atual.
+        
+        Retorna quantas linhas foram revalidadas. cancelar, se dado, é consultado a
+        cada LINHAS_POR_CANCELAMENTO linhas varridas; se retornar True, a
+        sincronização é abandonada antes de alterar o estado, e o retorno é None.
+        """
+        antigas = self.linhas
+        novas = codigo.split('\n')
+        limite = min(len(antigas), len(novas))
+        
+        prefixo = 0
+        while prefixo < limite and antigas[prefixo].texto == novas[prefixo]:
+            prefixo += 1
+        sufixo = 0
+        while (sufixo < limite - prefixo and
+               antigas[len(antigas) - 1 - sufixo].texto == novas[len(novas) - 1 - sufixo]):
+            sufixo += 1
+        
+        if prefixo == len(antigas) == len(novas):
+            return 0
+        return self._substituir(prefixo, len(antigas) - sufixo, novas[prefixo:len(novas) - sufixo], cancelar)
+    
+    def tokens(self) -> List[Token]:
+        """Retorna os tokens e erros do texto atual, na ordem de analisar()."""
+        if self._tokens is not None:
+            return self._tokens
+        
+        lexicos = []
+        for num_linha, registro in enumerate(self.linhas, 1):
+            deslocamento = num_linha - registro.linha_base
+            if deslocamento:
+                lexicos.extend(replace(token, linha=token.linha + deslocamento) for token in registro.tokens)
+            else:
+                lexicos.extend(registro.tokens)
+        lexicos.append(Token(TokenType.EOF, "", len(self.linhas) + 1, 1, "Fim do arquivo"))
+        
+        self._tokens = self._intercalar_erros(lexicos, self._erros_validacao())
+        return self._tokens
+    
+    def erros(self) -> List[Token]:
+        """
+        Retorna só os erros (léxicos e de validação) do texto atual, na ordem de
+        tokens(), sem montar a lista completa de tokens.
+        """
+        if self._tokens is not None:
+            return [token for token in self._tokens if token.eh_erro]
+        
+        lexicos = []
+        for indice in self.linhas_com_erros:
+            registro = self.linhas[indice]
+            deslocamento = indice + 1 - registro.linha_base
+            for token in registro.tokens:
+                if token.eh_erro:
+                    lexicos.append(replace(token, linha=token.linha + deslocamento) if deslocamento else token)
+        return self._intercalar_erros(lexicos, self._erros_validacao())
+    
+    def _erros_validacao(self) -> List[Token]:
+        """Erros de validação do texto atual, em ordem de posição."""
+        linhas = self.linhas
+        total_linhas = len(linhas)
+        validador = ValidadorIncremental(acumular=True, perfil=self.analisador.perfil)
+        validador.importar_estado(linhas[-1].estado, total_linhas)
+        validador.simbolos = self._simbolos_ate(total_linhas)
+        
+        for indice in self.linhas_com_erros:
+            registro = linhas[indice]
+            deslocamento = indice + 1 - registro.linha_base
+            for origem, destino in ((registro.erros_inicio, validador.erros_inicio),
+                                    (registro.erros_tipo, validador.erros_tipo),
+                                    (registro.erros_condicionais, validador.erros_condicionais),
+                                    (registro.erros_input, validador.erros_input)):
+                for erro in origem:
+                    destino.append(self._deslocar_erro(erro, deslocamento))
+        
+        # EOF e regras que dependem do programa inteiro
+        validador.total_erros_tipo = len(validador.erros_tipo)
+        validador.processar(Token(TokenType.EOF, "", total_linhas + 1, 1, "Fim do arquivo"))
+        validador.finalizar()
+        
+        prioridades = ValidadorIncremental.PRIORIDADE_ERROS
+        return sorted(validador.erros_inicio + validador.erros_tipo +
+                      validador.erros_condicionais + validador.erros_input,
+                      key=lambda erro: (erro.linha, erro.coluna, prioridades[erro.tipo]))
+    
+    @staticmethod
+    def _intercalar_erros(lexicos: List[Token], erros: List[Token]) -> List[Token]:
+        """Intercala os erros de validação (em ordem) com os tokens léxicos, antes do token da mesma posição."""
+        if not erros:
+            return lexicos
+        
+        tokens = []
+        indice = 0
+        for erro in erros:
+            posicao = (erro.linha, erro.coluna)
+            inicio = indice
+            while indice < len(lexicos) and (lexicos[indice].linha, lexicos[indice].coluna) < posicao:
+                indice += 1
+            tokens.extend(lexicos[inicio:indice])
+            tokens.append(erro)
+        tokens.extend(lexicos[indice:])
+        return tokens
+    
+    def indice_simbolos(self) -> IndiceSimbolos:
+        """Retorna o índice de símbolos do texto atual (montado uma vez por versão do texto)."""
+        if self._indice is None:
+            self._indice = IndiceSimbolos.de_tokens(self.tokens())
+        return self._indice
+    
+    def _substituir(self, inicio: int, fim: int, textos: List[str],
+                    cancelar: Optional[Callable[[], bool]] = None) -> Optional[int]:
+        """
+        Troca os registros inicio:fim por novas linhas e revalida o necessário.
+
+        cancelar só é consultado durante a varredura das novas linhas, enquanto
+        nenhum registro foi alterado; retorna None se ela for cancelada.
+        """
+        analisador = self.analisador
+        linhas = self.linhas
+        por_cancelamento = self.LINHAS_POR_CANCELAMENTO
+        
+        novas = []
+        for num_linha, texto in enumerate(textos, inicio + 1):
+            tokens = []
+            analisador._tokenizar_linha(texto, num_linha, tokens)
+            novas.append(RegistroLinha(texto, tokens, num_linha))
+            if cancelar is not None and len(novas) % por_cancelamento == 0 and cancelar():
+                return None
+        
+        self._tokens = None
+        self._indice = None
+        removidas = linhas[inicio:fim]
+        linhas[inicio:fim] = novas
+        fim_novas = inicio + len(novas)
+        self._deslocar_linhas_com_erros(inicio, fim, fim_novas)
+        
+        validador = ValidadorIncremental(acumular=True, perfil=analisador.perfil)
+        if inicio > 0:
+            validador.importar_estado(linhas[inicio - 1].estado, inicio)
+        simbolos_antigos = self._simbolos_ate(inicio)
+        validador.simbolos = dict(simbolos_antigos)
+        
+        # Estado ao fim da linha anterior à primeira linha não editada, antes da
+        # edição, e tabela de símbolos de antes da edição ao fim do trecho revalidado
+        if removidas:
+            estado_antigo = removidas[-1].estado
+        elif inicio > 0:
+            estado_antigo = linhas[inicio - 1].estado
+        else:
+            estado_antigo = ValidadorIncremental().exportar_estado(0)
+        for registro in removidas:
+            self._acumular_simbolos(registro, simbolos_antigos)
+        
+        # Revalida até o estado das regras voltar a ser o de antes da edição
+        indice = inicio
+        revalidadas = 0
+        while indice < len(linhas):
+            registro = linhas[indice]
+            if indice >= fim_novas:
+                if validador.exportar_estado(indice) == estado_antigo:
+                    break
+                estado_antigo = registro.estado
+                self._acumular_simbolos(registro, simbolos_antigos)
+            self._validar_linha(validador, registro, indice + 1)
+            self._marcar_erros(indice, registro)
+            self._guardar_simbolos(indice, registro, validador.simbolos)
+            revalidadas += 1
+            indice += 1
+        
+        # O estado não depende da tabela de símbolos, mas os erros de tipo sim: as
+        # linhas seguintes só são revalidadas se consultarem uma variável cujo tipo
+        # mudou. A tabela é acompanhada até voltar a ser a de antes da edição (com
+        # as mesmas variáveis), pois daí em diante as tabelas guardadas continuam
+        # valendo
+        ausente = object()
+        divergentes = {
+            nome for nome in simbolos_antigos.keys() | validador.simbolos.keys()
+            if simbolos_antigos.get(nome, ausente) != validador.simbolos.get(nome, ausente)
+        }
+        while divergentes and indice < len(linhas):
+            registro = linhas[indice]
+            nomes = {uso[1] for uso in registro.variaveis}
+            if any(uso[0] == 'consulta' and uso[1] in divergentes and
+                   simbolos_antigos.get(uso[1]) != validador.simbolos.get(uso[1]) for uso in registro.variaveis):
+                self._acumular_simbolos(registro, simbolos_antigos)
+                if indice > 0:
+                    validador.importar_estado(linhas[indice - 1].estado, indice)
+                else:
+                    simbolos = validador.simbolos
+                    validador = ValidadorIncremental(acumular=True, perfil=analisador.perfil)
+                    validador.simbolos = simbolos
+                self._validar_linha(validador, registro, indice + 1)
+                self._marcar_erros(indice, registro)
+                nomes.update(uso[1] for uso in registro.variaveis)
+                revalidadas += 1
+            else:
+                self._acumular_simbolos(registro, simbolos_antigos)
+                self._acumular_simbolos(registro, validador.simbolos)
+            self._guardar_simbolos(indice, registro, validador.simbolos)
+            for nome in nomes:
+                if simbolos_antigos.get(nome, ausente) == validador.simbolos.get(nome, ausente):
+                    divergentes.discard(nome)
+                else:
+                    divergentes.add(nome)
+            indice += 1
+        
+        return revalidadas
+    
+    def _validar_linha(self, validador: ValidadorIncremental, registro: RegistroLinha, num_linha: int) -> None:
+        deslocamento = num_linha - registro.linha_base
+        if deslocamento:
+            registro.tokens = [replace(token, linha=num_linha) for token in registro.tokens]
+        registro.linha_base = num_linha
+        registro.variaveis = validador.registro_variaveis = []
+        registro.erros_inicio = validador.erros_inicio = []
+        registro.erros_tipo = validador.erros_tipo = []
+        registro.erros_condicionais = validador.erros_condicionais = []
+        registro.erros_input = validador.erros_input = []
+        
+        # Com acumular=True os comandos input ficam sempre pendentes: a decisão,
+        # em tokens(), usa as declarações de todas as linhas
+        for token in registro.tokens:
+            validador.processar(token)
+        registro.estado = validador.exportar_estado(num_linha)
+    
+    def _simbolos_ate(self, fim: int) -> dict:
+        """
+        Tabela de símbolos do validador ao fim das linhas [0, fim), a partir da
+        última tabela guardada antes de fim.
+        """
+        linhas = self.linhas
+        inicio = fim
+        while inicio > 0 and linhas[inicio - 1].simbolos is None:
+            inicio -= 1
+        simbolos = dict(linhas[inicio - 1].simbolos) if inicio > 0 else {}
+        for indice in range(inicio, fim):
+            self._acumular_simbolos(linhas[indice], simbolos)
+        if fim - inicio > self.LINHAS_POR_TABELA:
+            # As edições removeram as tabelas guardadas neste trecho
+            linhas[fim - 1].simbolos = dict(simbolos)
+        return simbolos
+    
+    def _guardar_simbolos(self, indice: int, registro: RegistroLinha, simbolos: dict) -> None:
+        """Atualiza a tabela guardada em um registro cujas linhas anteriores mudaram."""
+        registro.simbolos = dict(simbolos) if (indice + 1) % self.LINHAS_POR_TABELA == 0 else None
+    
+    def _deslocar_linhas_com_erros(self, inicio: int, fim: int, fim_novas: int) -> None:
+        """Remove de linhas_com_erros os registros inicio:fim e desloca os seguintes."""
+        com_erros = self.linhas_com_erros
+        deslocamento = fim_novas - fim
+        seguintes = com_erros[bisect_left(com_erros, fim):]
+        com_erros[bisect_left(com_erros, inicio):] = [indice + deslocamento for indice in seguintes]
+    
+    def _marcar_erros(self, indice: int, registro: RegistroLinha) -> None:
+        """Inclui ou retira um registro revalidado de linhas_com_erros."""
+        com_erros = self.linhas_com_erros
+        posicao = bisect_left(com_erros, indice)
+        presente = posicao < len(com_erros) and com_erros[posicao] == indice
+        tem_erros = bool(registro.erros_inicio or registro.erros_tipo or registro.erros_condicionais or
+                         registro.erros_input or any(token.eh_erro for token in registro.tokens))
+        if tem_erros and not presente:
+            com_erros.insert(posicao, indice)
+        elif presente and not tem_erros:
+            del com_erros[posicao]
+    
+    @staticmethod
+    def _acumular_simbolos(registro: RegistroLinha, simbolos: dict) -> None:
+        for uso in registro.variaveis:
+            if uso[0] == 'tipo':
+                simbolos[uso[1]] = uso[2]
+            elif uso[0] == 'par':
+                simbolos.setdefault(uso[1], None)
+    
+    @staticmethod
+    def _deslocar_erro(erro, deslocamento: int):
+        if not deslocamento:
+            return erro
+        if isinstance(erro, Token):
+            return replace(erro, linha=erro.linha + deslocamento)
+        # Comando input pendente: (nome, token_input)
+        nome, token_input = erro
+        return nome, replace(token_input, linha=token_input.linha + deslocamento)
+
+
+class ServidorLSP:
+    """
+    Servidor do Language Server Protocol pela entrada e saída padrão (--lsp).
+
+    Cada documento aberto é um AnalisadorIncremental, então uma mudança
+    incremental (didChange com intervalo) só gera de novo os tokens das linhas
+    editadas. Após cada mudança, os erros do documento são publicados como
+    diagnósticos. O servidor também atende semantic tokens (a classe de cada
+    token, para o realce de sintaxe), definição e referências (pelo
+    IndiceSimbolos). As posições seguem o protocolo: linhas e colunas começam
+    em 0 e as colunas são contadas em unidades UTF-16.
+    """
+    
+    # Legenda dos semantic tokens e classe de cada tipo de token (os demais não são enviados)
+    TIPOS_SEMANTICOS = ('keyword', 'type', 'variable', 'function', 'parameter',
+                        'number', 'string', 'comment', 'operator')
+    CLASSES_SEMANTICAS = {
+        TokenType.INICIO: 'keyword',
+        TokenType.COND_SE: 'keyword',
+        TokenType.COND_SENAO: 'keyword',
+        TokenType.COND_SENAOSE: 'keyword',
+        TokenType.REP_PARA: 'keyword',
+        TokenType.REP_ENQUANTO: 'keyword',
+        TokenType.REP_RANGE: 'keyword',
+        TokenType.WRT: 'keyword',
+        TokenType.INPUT: 'keyword',
+        TokenType.FUNCTION: 'keyword',
+        TokenType.PULAR_LINHA: 'keyword',
+        TokenType.VALOR_LOGICO: 'keyword',
+        TokenType.TIPO_VAR: 'type',
+        TokenType.IDENTIFICADOR: 'variable',
+        TokenType.VALOR_INTEIRO: 'number',
+        TokenType.VALOR_REAL: 'number',
+        TokenType.VALOR_TEXTO: 'string',
+        TokenType.COMENTARIO: 'comment',
+        TokenType.OP_REL: 'operator',
+        TokenType.OPER_LOGICO: 'operator',
+        TokenType.OPER_ATRIB: 'operator',
+        TokenType.OPER_MATEMATICO: 'operator',
+    }
+    # Classe de um identificador pela categoria do símbolo
+    CLASSES_CATEGORIAS = {'funcao': 'function', 'parametro': 'parameter'}
+    
+    # Códigos de erro do JSON-RPC
+    ERRO_JSON_INVALIDO = -32700
+    ERRO_PEDIDO_INVALIDO = -32600
+    ERRO_METODO_DESCONHECIDO = -32601
+    ERRO_INTERNO = -32603
+    
+    def __init__(self, analisador: Optional[AnalisadorLexico] = None, entrada=None, saida=None):
+        self.analisador = analisador or AnalisadorLexico()
+        self.entrada = entrada or sys.stdin.buffer
+        self.saida = saida or sys.stdout.buffer
+        self.documentos = {}    # uri -> AnalisadorIncremental
+        self.versoes = {}       # uri -> versão informada pelo editor
+        self.encerrando = False
+        self.indices_semanticos = {classe: indice for indice, classe in enumerate(self.TIPOS_SEMANTICOS)}
+        
+        self.pedidos = {
+            'initialize': self.inicializar,
+            'shutdown': self.encerrar,
+            'textDocument/semanticTokens/full': self.tokens_semanticos,
+            'textDocument/definition': self.definicao,
+            'textDocument/references': self.referencias,
+        }
+        self.notificacoes = {
+            'textDocument/didOpen': self.documento_aberto,
+            'textDocument/didChange': self.documento_alterado,
+            'textDocument/didClose': self.documento_fechado,
+        }
+    
+    def executar(self) -> int:
+        """Atende mensagens até 'exit' ou o fim da entrada; retorna o código de saída."""
+        while True:
+            mensagem = self._ler_mensagem()
+            if mensagem is None:
+                return 0 if self.encerrando else 1
+            metodo = mensagem.get('method')
+            if metodo == 'exit':
+                return 0 if self.encerrando else 1
+            if metodo is not None:
+                self._despachar(metodo, mensagem)
+    
+    def _ler_mensagem(self) -> Optional[dict]:
+        """
+        Lê a próxima mensagem (cabeçalhos e corpo JSON), ou None no fim da entrada.
+
+        Um Content-Length inválido ou um corpo que não é JSON válido (ou não é um
+        objeto) é respondido com o erro do JSON-RPC e lido como uma mensagem vazia,
+        sem encerrar o servidor.
+        """
+        tamanho = None
+        while True:
+            linha = self.entrada.readline()
+            if not linha:
+                return None
+            linha = linha.strip()
+            if linha:
+                nome, _, valor = linha.partition(b':')
+                if nome.strip().lower() == b'content-length':
+                    try:
+                        tamanho = int(valor)
+                    except ValueError:
+                        tamanho = -1
+            elif tamanho is not None:
+                break
+        if tamanho < 0:
+            # Sem um tamanho válido o corpo não pode ser separado: segue para a próxima mensagem
+            self._enviar({'jsonrpc': '2.0', 'id': None,
+                          'error': {'code': self.ERRO_JSON_INVALIDO, 'message': "Content-Length inválido"}})
+            return {}
+        try:
+            mensagem = json.loads(self.entrada.read(tamanho).decode('utf-8'))
+        except (ValueError, UnicodeDecodeError) as e:
+            self._enviar({'jsonrpc': '2.0', 'id': None,
+                          'error': {'code': self.ERRO_JSON_INVALIDO, 'message': f"JSON inválido: {e}"}})
+            return {}
+        if not isinstance(mensagem, dict):
+            self._enviar({'jsonrpc': '2.0', 'id': None,
+                          'error': {'code': self.ERRO_PEDIDO_INVALIDO, 'message': "A mensagem deve ser um objeto JSON"}})
+            return {}
+        return mensagem
+    
+    def _enviar(self, mensagem: dict) -> None:
+        corpo = json.dumps(mensagem, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.saida.write(b'Content-Length: %d\r\n\r\n' % len(corpo) + corpo)
+        self.saida.flush()
+    
+    def _despachar(self, metodo: str, mensagem: dict) -> None:
+        parametros = mensagem.get('params') or {}
+        if 'id' not in mensagem:
+            # Notificação: sem resposta; as desconhecidas (como $/cancelRequest) são ignoradas
+            tratador = self.notificacoes.get(metodo)
+            if tratador is not None:
+                try:
+                    tratador(parametros)
+                except Exception as e:
+                    print(f"Erro ao tratar {metodo}: {e}", file=sys.stderr)
+            return
+        
+        resposta = {'jsonrpc': '2.0', 'id': mensagem['id']}
+        tratador = self.pedidos.get(metodo)
+        if tratador is None:
+            resposta['error'] = {'code': self.ERRO_METODO_DESCONHECIDO, 'message': f"Método desconhecido: {metodo}"}
+        else:
+            try:
+                resposta['result'] = tratador(parametros)
+            except Exception as e:
+                resposta['error'] = {'code': self.ERRO_INTERNO, 'message': str(e)}
+        self._enviar(resposta)
+    
+    # Ciclo de vida
+    
+    def inicializar(self, parametros: dict) -> dict:
+        return {
+            'capabilities': {
+                'positionEncoding': 'utf-16',
+                'textDocumentSync': {'openClose': True, 'change': 2},   # 2: mudanças incrementais
+                'semanticTokensProvider': {
+                    'legend': {'tokenTypes': list(self.TIPOS_SEMANTICOS), 'tokenModifiers': []},
+                    'full': True,
+                },
+                'definitionProvider': True,
+                'referencesProvider': True,
+            },
+            'serverInfo': {'name': 'analisador-alaias'},
+        }
+    
+    def encerrar(self, parametros: dict) -> None:
+        self.encerrando = True
+        return None
+    
+    # Sincronização de documentos
+    
+    def documento_aberto(self, parametros: dict) -> None:
+        documento = parametros['textDocument']
+        uri = documento['uri']
+        self.documentos[uri] = AnalisadorIncremental(documento['text'].replace('\r\n', '\n'), self.analisador)
+        self.versoes[uri] = documento.get('version')
+        self._publicar_diagnosticos(uri)
+    
+    def documento_alterado(self, parametros: dict) -> None:
+        uri = parametros['textDocument']['uri']
+        documento = self.documentos[uri]
+        for mudanca in parametros['contentChanges']:
+            texto = mudanca['text'].replace('\r\n', '\n')
+            intervalo = mudanca.get('range')
+            if intervalo is None:
+                # Texto completo: só as linhas diferentes são analisadas de novo
+                documento.sincronizar(texto)
+            else:
+                linha_inicio, coluna_inicio = self._posicao_interna(documento, intervalo['start'])
+                linha_fim, coluna_fim = self._posicao_interna(documento, intervalo['end'])
+                documento.editar(linha_inicio, coluna_inicio, linha_fim, coluna_fim, texto)
+        self.versoes[uri] = parametros['textDocument'].get('version')
+        self._publicar_diagnosticos(uri)
+    
+    def documento_fechado(self, parametros: dict) -> None:
+        uri = parametros['textDocument']['uri']
+        self.documentos.pop(uri, None)
+        self.versoes.pop(uri, None)
+        self._enviar({'jsonrpc': '2.0', 'method': 'textDocument/publishDiagnostics',
+                      'params': {'uri': uri, 'diagnostics': []}})
+    
+    def _publicar_diagnosticos(self, uri: str) -> None:
+        documento = self.documentos[uri]
+        diagnosticos = [self._diagnostico(documento, erro) for erro in documento.erros()]
+        parametros = {'uri': uri, 'diagnostics': diagnosticos}
+        if self.versoes.get(uri) is not None:
+            parametros['version'] = self.versoes[uri]
+        self._enviar({'jsonrpc': '2.0', 'method': 'textDocument/publishDiagnostics', 'params': parametros})
+    
+    def _diagnostico(self, documento: AnalisadorIncremental, erro: Token) -> dict:
+        # O intervalo cobre o lexema, limitado ao fim da linha (os erros de
+        # validação após a última linha ficam no fim do documento)
+        total_linhas = len(documento.linhas)
+        linha = min(erro.linha, total_linhas) - 1
+        texto = documento.linhas[linha].texto
+        if erro.linha > total_linhas:
+            inicio = fim = len(texto)
+        else:
+            inicio = min(erro.coluna - 1, len(texto))
+            fim = min(inicio + max(len(erro.lexema), 1), len(texto))
+        return {
+            'range': {'start': {'line': linha, 'character': self._para_utf16(texto, inicio)},
+                      'end': {'line': linha, 'character': self._para_utf16(texto, fim)}},
+            'severity': 1,
+            'source': 'alaias',
+            'code': erro.tipo.value,
+            'message': erro.descricao,
+        }
+    
+    # Semantic tokens, definição e referências
+    
+    def tokens_semanticos(self, parametros: dict) -> dict:
+        documento = self.documentos[parametros['textDocument']['uri']]
+        indice = documento.indice_simbolos()
+        classes = self.CLASSES_SEMANTICAS
+        categorias = self.CLASSES_CATEGORIAS
+        indices = self.indices_semanticos
+        
+        # Cada token: linha e início relativos ao anterior, tamanho, classe e modificadores
+        dados = []
+        linha_anterior = 0
+        inicio_anterior = 0
+        for num_linha, registro in enumerate(documento.linhas):
+            texto = registro.texto
+            ascii = texto.isascii()
+            for token in registro.tokens:
+                classe = classes.get(token.tipo)
+                if classe is None:
+                    continue
+                if token.tipo == TokenType.IDENTIFICADOR:
+                    simbolo = indice.obter(token.lexema)
+                    if simbolo is not None:
+                        classe = categorias.get(simbolo.categoria, classe)
+                inicio = token.coluna - 1
+                fim = inicio + len(token.lexema)
+                if not ascii:
+                    inicio, fim = self._para_utf16(texto, inicio), self._para_utf16(texto, fim)
+                if num_linha != linha_anterior:
+                    inicio_anterior = 0
+                dados.extend((num_linha - linha_anterior, inicio - inicio_anterior, fim - inicio, indices[classe], 0))
+                linha_anterior, inicio_anterior = num_linha, inicio
+        return {'data': dados}
+    
+    def definicao(self, parametros: dict) -> Optional[dict]:
+        uri = parametros['textDocument']['uri']
+        documento = self.documentos[uri]
+        token = self._identificador_em(documento, parametros['position'])
+        simbolo = token and documento.indice_simbolos().obter(token.lexema)
+        if not simbolo or simbolo.declaracao is None:
+            return None
+        return self._local(uri, documento, simbolo.declaracao, len(simbolo.nome))
+    
+    def referencias(self, parametros: dict) -> List[dict]:
+        uri = parametros['textDocument']['uri']
+        documento = self.documentos[uri]
+        token = self._identificador_em(documento, parametros['position'])
+        if token is None:
+            return []
+        incluir = parametros.get('context', {}).get('includeDeclaration', False)
+        posicoes = documento.indice_simbolos().referencias(token.lexema, incluir_declaracoes=incluir)
+        return [self._local(uri, documento, posicao, len(token.lexema)) for posicao in posicoes]
+    
+    def _identificador_em(self, documento: AnalisadorIncremental, posicao: dict) -> Optional[Token]:
+        """Identificador que contém a posição (ou termina nela), ou None."""
+        if posicao['line'] >= len(documento.linhas):
+            return None
+        registro = documento.linhas[posicao['line']]
+        coluna = self._de_utf16(registro.texto, posicao['character']) + 1
+        for token in registro.tokens:
+            if token.tipo == TokenType.IDENTIFICADOR and token.coluna <= coluna <= token.coluna + len(token.lexema):
+                return token
+        return None
+    
+    def _local(self, uri: str, documento: AnalisadorIncremental, posicao: Tuple[int, int], tamanho: int) -> dict:
+        linha, coluna = posicao
+        texto = documento.linhas[linha - 1].texto
+        return {'uri': uri, 'range': {
+            'start': {'line': linha - 1, 'character': self._para_utf16(texto, coluna - 1)},
+            'end': {'line': linha - 1, 'character': self._para_utf16(texto, coluna - 1 + tamanho)},
+        }}
+    
+    # Posições: colunas do analisador (caracteres, a partir de 1) e do protocolo (UTF-16, a partir de 0)
+    
+    def _posicao_interna(self, documento: AnalisadorIncremental, posicao: dict) -> Tuple[int, int]:
+        """Converte uma posição do protocolo em (linha, coluna) de AnalisadorIncremental.editar."""
+        linhas = documento.linhas
+        if posicao['line'] >= len(linhas):
+            return len(linhas), len(linhas[-1].texto) + 1
+        texto = linhas[posicao['line']].texto
+        return posicao['line'] + 1, self._de_utf16(texto, posicao['character']) + 1
+    
+    @staticmethod
+    def _para_utf16(texto: str, coluna: int) -> int:
+        """Unidades UTF-16 dos primeiros coluna caracteres do texto."""
+        if texto.isascii():
+            return coluna
+        return len(texto[:coluna].encode('utf-16-le')) // 2
+    
+    @staticmethod
+    def _de_utf16(texto: str, unidades: int) -> int:
+        """Número de caracteres do texto que ocupam as primeiras unidades UTF-16 (limitado ao fim)."""
+        if texto.isascii():
+            return min(unidades, len(texto))
+        contagem = 0
+        for indice, caractere in enumerate(texto):
+            if contagem >= unidades:
+                return indice
+            contagem += 2 if ord(caractere) > 0xFFFF else 1
+        return len(texto)
+
+
+def _importar_tkinter() -> None:
+    """
+    Importa o tkinter (e os submódulos usados) como nomes globais do módulo.
+
+    A importação só acontece quando a interface gráfica é criada, então o modo
+    console, o modo em lote e o uso como biblioteca não pagam por ela (nem
+    precisam do tkinter instalado).
+    """
+    global tk, ttk, scrolledtext, filedialog, messagebox, font
+    import tkinter as tk
+    from tkinter import ttk, scrolledtext, filedialog, messagebox, font
+
+
+class ListaTokensVirtual:
+    """
+    Tabela de tokens (ttk.Treeview) que só cria os itens visíveis.
+
+    O Treeview tem sempre tantos itens quantas linhas cabem na tela, e rolar apenas
+    troca os valores desses itens, então exibir um resultado custa o mesmo para cem
+    ou para cem mil tokens. Os tokens são lidos sob demanda de qualquer sequência
+    indexável (lista de Token ou TokenArray), por meio de uma lista de índices.
+
+    Um clique no título de uma coluna ordena as linhas por ela (um segundo clique
+    inverte a ordem), e a caixa "Filtrar por tipo" mostra só um TokenType.
+    """
+    
+    ALTURA_LINHA = 20           # pixels por linha do Treeview
+    ALTURA_CABECALHO = 25       # pixels do cabeçalho das colunas
+    LINHAS_POR_RODA = 3         # linhas roladas por passo da roda do mouse
+    TODOS_OS_TIPOS = "Todos"
+    
+    def __init__(self, master, colunas: List[Tuple[str, int, object]], numerar: bool = False,
+                 mensagem_vazia: str = ""):
+        """
+        colunas: (título, largura, valor(token)) de cada coluna. Com numerar=True a
+        primeira coluna é a posição da linha na sequência original (1, 2, ...).
+        """
+        _importar_tkinter()
+        self.colunas = [("#", 50, None)] + list(colunas) if numerar else list(colunas)
+        self.numerar = numerar
+        self.mensagem_vazia = mensagem_vazia
         
-        # Valida se o programa começa com 'als'
-        erro_inicio = self._validar_inicio_programa(tokens)
-        if erro_inicio:
-            tokens.insert(0, erro_inicio)
+        self.tokens = []
+        self.indices = []           # índices em tokens, na ordem original
+        self.visao = range(0)       # posições em indices, após filtro e ordenação
+        self.primeira = 0           # primeira posição de visao exibida
+        self.itens = []             # iids dos itens do Treeview, um por linha visível
+        self.coluna_ordenada = None
+        self.ordem_decrescente = False
         
-        # Validação de tipos
-        erros_tipo = self._validar_tipos_variaveis(tokens)
-        tokens.extend(erros_tipo)
+        self.frame = ttk.Frame(master)
         
-        # Validação de expressões condicionais
-        erros_condicionais = self._validar_expressoes_condicionais(tokens)
-        tokens.extend(erros_condicionais)
+        barra = ttk.Frame(self.frame)
+        barra.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 5))
+        ttk.Label(barra, text="Filtrar por tipo:").grid(row=0, column=0, padx=(0, 5))
+        self.filtro = ttk.Combobox(barra, state='readonly', width=35, values=[self.TODOS_OS_TIPOS])
+        self.filtro.set(self.TODOS_OS_TIPOS)
+        self.filtro.grid(row=0, column=1)
+        self.filtro.bind('<<ComboboxSelected>>', self.filtro_alterado)
+        self.label_total = ttk.Label(barra, text="")
+        self.label_total.grid(row=0, column=2, padx=(10, 0))
         
-        # Validação de comandos input
-        erros_input = self._validar_comando_input(tokens)
-        tokens.extend(erros_input)
+        ttk.Style(master).configure('Virtual.Treeview', rowheight=self.ALTURA_LINHA)
+        ids = [f"c{i}" for i in range(len(self.colunas))]
+        self.tree = ttk.Treeview(self.frame, columns=ids, show='headings', selectmode='browse',
+                                 style='Virtual.Treeview')
+        for i, (titulo, largura, _) in enumerate(self.colunas):
+            self.tree.heading(ids[i], text=titulo, command=lambda coluna=i: self.ordenar(coluna))
+            self.tree.column(ids[i], width=largura, stretch=(i == len(self.colunas) - 1))
+        self.tree.grid(row=1, column=0, sticky="nsew")
         
-        return tokens
-    def imprimir_tokens(self, tokens: List[Token]) -> str:
-        resultado = f"{'Token':<25} {'Lexema':<20} {'Linha':<6} {'Coluna':<7} {'Descrição'}\n"
-        resultado += "-" * 100 + "\n"
+        self.barra_rolagem = ttk.Scrollbar(self.frame, orient='vertical', command=self.rolar)
+        self.barra_rolagem.grid(row=1, column=1, sticky="ns")
         
-        for token in tokens:
-            if token.tipo != TokenType.EOF:
-                cor = "ERRO" if token.eh_erro else "OK"
-                resultado += f"{token.tipo.value:<25} {token.lexema:<20} {token.linha:<6} {token.coluna:<7} {token.descricao}\n"
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(1, weight=1)
         
-        return resultado
+        self.tree.bind('<Configure>', self.redimensionado)
+        self.tree.bind('<MouseWheel>', self.roda_mouse)
+        self.tree.bind('<Button-4>', self.roda_mouse)
+        self.tree.bind('<Button-5>', self.roda_mouse)
+        self.tree.bind('<Prior>', lambda event: self.rolar('scroll', -1, 'pages') or 'break')
+        self.tree.bind('<Next>', lambda event: self.rolar('scroll', 1, 'pages') or 'break')
+    
+    def definir_tokens(self, tokens, indices: List[int], tipos: Iterable[str] = ()) -> None:
+        """Exibe tokens[i] para cada i de indices; tipos são as opções do filtro."""
+        self.tokens = tokens
+        self.indices = indices
+        self.visao = range(len(indices))
+        self.primeira = 0
+        self.coluna_ordenada = None
+        self.ordem_decrescente = False
+        self.filtro.configure(values=[self.TODOS_OS_TIPOS] + sorted(tipos))
+        self.filtro.set(self.TODOS_OS_TIPOS)
+        self.renderizar()
+    
+    def limpar(self) -> None:
+        self.definir_tokens([], [])
+    
+    def filtro_alterado(self, event=None) -> None:
+        escolha = self.filtro.get()
+        tokens, indices = self.tokens, self.indices
+        if escolha == self.TODOS_OS_TIPOS:
+            self.visao = range(len(indices))
+        else:
+            self.visao = [posicao for posicao, indice in enumerate(indices) if tokens[indice].tipo.value == escolha]
+        if self.coluna_ordenada is not None:
+            self._ordenar_visao()
+        self.primeira = 0
+        self.renderizar()
+    
+    def ordenar(self, coluna: int) -> None:
+        if self.coluna_ordenada == coluna:
+            self.ordem_decrescente = not self.ordem_decrescente
+        else:
+            self.coluna_ordenada = coluna
+            self.ordem_decrescente = False
+        self._ordenar_visao()
+        self.primeira = 0
+        self.renderizar()
+    
+    def _ordenar_visao(self) -> None:
+        valor = self.colunas[self.coluna_ordenada][2]
+        if valor is None:
+            # Coluna de numeração: ordem original
+            chave = None
+        else:
+            tokens, indices = self.tokens, self.indices
+            chave = lambda posicao: valor(tokens[indices[posicao]])
+        self.visao = sorted(self.visao, key=chave, reverse=self.ordem_decrescente)
+    
+    def rolar(self, *args) -> None:
+        """Comando da barra de rolagem: ('moveto', fração) ou ('scroll', n, 'units'|'pages')."""
+        total = len(self.visao)
+        if args[0] == 'moveto':
+            primeira = int(float(args[1]) * total)
+        else:
+            passo = int(args[1])
+            primeira = self.primeira + (passo * len(self.itens) if args[2] == 'pages' else passo)
+        self.primeira = max(0, min(primeira, total - len(self.itens)))
+        self.renderizar()
     
-    def obter_estatisticas(self, tokens: List[Token]) -> dict:
-        total_tokens = len([t for t in tokens if t.tipo != TokenType.EOF and t.tipo != TokenType.WHITESPACE])
-        total_erros = len([t for t in tokens if t.eh_erro])
+    def roda_mouse(self, event) -> str:
+        if event.num == 4 or event.delta > 0:
+            self.rolar('scroll', -self.LINHAS_POR_RODA, 'units')
+        else:
+            self.rolar('scroll', self.LINHAS_POR_RODA, 'units')
+        return 'break'
+    
+    def redimensionado(self, event) -> None:
+        linhas = max(1, (event.height - self.ALTURA_CABECALHO) // self.ALTURA_LINHA)
+        while len(self.itens) < linhas:
+            self.itens.append(self.tree.insert('', tk.END))
+        while len(self.itens) > linhas:
+            self.tree.delete(self.itens.pop())
+        self.primeira = max(0, min(self.primeira, len(self.visao) - linhas))
+        self.renderizar()
+    
+    def renderizar(self) -> None:
+        """Preenche os itens visíveis com as linhas a partir de self.primeira."""
+        tokens, indices, visao = self.tokens, self.indices, self.visao
+        total = len(visao)
         
-        tipos_tokens = {}
-        for token in tokens:
-            if token.tipo != TokenType.EOF and token.tipo != TokenType.WHITESPACE:
-                if token.tipo.value in tipos_tokens:
-                    tipos_tokens[token.tipo.value] += 1
-                else:
-                    tipos_tokens[token.tipo.value] = 1
+        for linha, item in enumerate(self.itens):
+            posicao_visao = self.primeira + linha
+            if posicao_visao >= total:
+                self.tree.detach(item)
+                continue
+            posicao = visao[posicao_visao]
+            token = tokens[indices[posicao]]
+            valores = [posicao + 1 if valor is None else valor(token) for _, _, valor in self.colunas]
+            self.tree.item(item, values=valores)
+            self.tree.move(item, '', linha)
         
-        return {
-            'total_tokens': total_tokens,
-            'total_erros': total_erros,
-            'tipos_tokens': tipos_tokens,
-            'tokens_validos': total_tokens - total_erros
-        }
-    
-    def analisar_arquivo(self, caminho_arquivo: str) -> List[Token]:
-        """
-        Analisa um arquivo e retorna os tokens.
-        """
-        try:
-            with open(caminho_arquivo, 'r', encoding='utf-8') as arquivo:
-                codigo = arquivo.read()
-            return self.analisar(codigo)
-        except FileNotFoundError:
-            print(f"Erro: Arquivo '{caminho_arquivo}' não encontrado.")
-            return []
-        except Exception as e:
-            print(f"Erro ao ler arquivo: {e}")
-            return []
+        if total:
+            self.barra_rolagem.set(self.primeira / total, min(1.0, (self.primeira + len(self.itens)) / total))
+        else:
+            self.barra_rolagem.set(0.0, 1.0)
+        
+        if not indices:
+            self.label_total.config(text=self.mensagem_vazia)
+        elif total == len(indices):
+            self.label_total.config(text=f"{total} item(ns)")
+        else:
+            self.label_total.config(text=f"{total} de {len(indices)} item(ns)")
 
 
 class InterfaceGrafica:
+    # Espera após a última tecla antes de analisar no modo "analisar ao digitar"
+    ATRASO_ANALISE_MS = 400
+    # Intervalo de verificação dos resultados da thread de análise (~60 quadros/s)
+    INTERVALO_VERIFICACAO_MS = 16
+    
+    # Destaque de sintaxe do editor: cor de cada tag e tag de cada tipo de token
+    CORES_DESTAQUE = {
+        'destaque_reservada': '#8e44ad',
+        'destaque_tipo': '#2980b9',
+        'destaque_operador': '#d35400',
+        'destaque_valor': '#27ae60',
+        'destaque_comentario': '#7f8c8d',
+        'destaque_erro': '#e74c3c',
+    }
+    TAGS_DESTAQUE = {
+        **{tipo: 'destaque_reservada' for tipo in (
+            TokenType.INICIO, TokenType.COND_SE, TokenType.COND_SENAO, TokenType.COND_SENAOSE,
+            TokenType.REP_PARA, TokenType.REP_ENQUANTO, TokenType.REP_RANGE, TokenType.WRT,
+            TokenType.INPUT, TokenType.FUNCTION, TokenType.NOME_FUNCAO, TokenType.PULAR_LINHA)},
+        TokenType.TIPO_VAR: 'destaque_tipo',
+        **{tipo: 'destaque_operador' for tipo in (
+            TokenType.OPER_MATEMATICO, TokenType.OPER_ATRIB, TokenType.OPER_LOGICO, TokenType.OP_REL)},
+        **{tipo: 'destaque_valor' for tipo in (
+            TokenType.VALOR_LOGICO, TokenType.VALOR_TEXTO, TokenType.VALOR_INTEIRO, TokenType.VALOR_REAL)},
+        TokenType.COMENTARIO: 'destaque_comentario',
+        **{tipo: 'destaque_erro' for tipo in TIPOS_ERRO},
+    }
+    # Linhas destacadas além da área visível, acima e abaixo dela
+    MARGEM_DESTAQUE = 50
+    # Depois de destacar esse número de linhas, os destaques fora da área visível são removidos
+    LIMITE_LINHAS_DESTACADAS = 2000
+    
+    # Colunas das abas de tokens e de erros: (título, largura, valor(token))
+    COLUNAS_TOKENS = [
+        ("Token", 180, lambda token: token.tipo.value),
+        ("Lexema", 140, lambda token: token.lexema),
+        ("Linha", 60, lambda token: token.linha),
+        ("Coluna", 60, lambda token: token.coluna),
+        ("Descrição", 300, lambda token: token.descricao),
+    ]
+    
+    LEGENDA_ERROS = (
+        "TIPOS DE ERROS DETECTÁVEIS:\n"
+        "• Programa deve começar com a palavra reservada 'als'\n"
+        "• Incompatibilidade de tipos (ex: intn recebendo valor decimal)\n"
+        "• Operadores relacionais mal formados (ex: 'e' em vez de 'eq')\n"
+        "• Palavras reservadas mal formadas (ex: 'wr' em vez de 'wrt')\n"
+        "• Operadores relacionais ausentes em condições (ex: [ idade 18 ])\n"
+        "• Expressões lógicas mal formadas (ex: 'and' sem expressões completas)\n"
+        "• Comando 'input' com sintaxe incorreta (ex: input sem parênteses)\n"
+        "• Comando 'input' sem variável especificada\n"
+        "• Comando 'input' com variável não declarada\n"
+        "• Símbolos não pertencentes ao conjunto de símbolos terminais (@)\n"
+        "• Identificadores mal formados (j@, 1a)\n"
+        "• Identificadores muito longos (mais de 30 caracteres)\n"
+        "• Números mal formados (2.a3)\n"
+        "• Números muito longos (mais de 15 dígitos)\n"
+        "• Strings não fechadas (\"hello world)\n"
+        "• Caracteres não reconhecidos\n"
+        "\nOPERADORES LÓGICOS SUPORTADOS:\n"
+        "• 'and' - E lógico (ex: [ idade ge 18 and idade lt 80 ])\n"
+        "• 'or' - OU lógico (ex: [ idade lt 18 or idade ge 65 ])\n"
+    )
+    
     def __init__(self):
+        _importar_tkinter()
         self.analisador = AnalisadorLexico()
         self.tokens_atuais = []
         
+        # Análise em segundo plano: cada pedido recebe um número de geração, e
+        # resultados de gerações anteriores à atual são descartados
+        self.incremental = AnalisadorIncremental(analisador=self.analisador)
+        self.trava_incremental = threading.Lock()
+        self.resultados_analise = queue.Queue()
+        self.geracao_analise = 0
+        self.geracao_exibida = 0
+        self.analise_agendada = None
+        self.verificacao_agendada = None
+        
+        # Destaque de sintaxe: só as linhas próximas da área visível recebem tags,
+        # e linhas_destacadas guarda o texto de cada linha já destacada
+        self.linhas_destacadas = {}
+        self.total_linhas_destacadas = 0
+        self.destaque_agendado = None
+        
         # Configuração da janela principal
         self.root = tk.Tk()
         self.root.title("Analisador Léxico - Linguagem ALAIAS")
         self.root.geometry("1200x800")
         self.root.configure(bg='#f0f0f0')
+        self.analisar_ao_digitar = tk.BooleanVar(value=False)
         
         # Configuração de estilo
         style = ttk.Style()
@@ -896,6 +3568,12 @@ class InterfaceGrafica:
         self.texto_codigo = scrolledtext.ScrolledText(frame_esquerda, width=50, height=25, 
                                                      font=('Consolas', 10))
         self.texto_codigo.grid(row=0, column=0, columnspan=3, sticky="nsew")
+        self.texto_codigo.bind('<<Modified>>', self.codigo_modificado)
+        self.texto_codigo.configure(yscrollcommand=self.codigo_rolado)
+        self.interceptar_edicoes(self.texto_codigo)
+        for tag, cor in self.CORES_DESTAQUE.items():
+            self.texto_codigo.tag_configure(tag, foreground=cor)
+        self.texto_codigo.tag_configure('destaque_erro', underline=True)
         
         # Botões de arquivo
         frame_botoes_arquivo = ttk.Frame(frame_esquerda)
@@ -918,6 +3596,11 @@ class InterfaceGrafica:
                                  command=self.analisar_codigo, style='Accent.TButton')
         btn_analisar.grid(row=2, column=0, columnspan=3, pady=(10, 0), sticky="ew")
         
+        check_ao_digitar = ttk.Checkbutton(frame_esquerda, text="Analisar ao digitar",
+                                           variable=self.analisar_ao_digitar,
+                                           command=self.agendar_analise)
+        check_ao_digitar.grid(row=3, column=0, columnspan=3, pady=(5, 0), sticky="w")
+        
         # Frame da direita - Resultados
         frame_direita = ttk.LabelFrame(main_frame, text="Resultados da Análise", padding="10")
         frame_direita.grid(row=1, column=1, sticky="nsew", padx=(5, 0))
@@ -930,17 +3613,22 @@ class InterfaceGrafica:
         frame_tokens = ttk.Frame(self.notebook)
         self.notebook.add(frame_tokens, text="Tokens")
         
-        self.texto_tokens = scrolledtext.ScrolledText(frame_tokens, width=60, height=20, 
-                                                     font=('Consolas', 9))
-        self.texto_tokens.grid(row=0, column=0, sticky="nsew")
+        self.lista_tokens = ListaTokensVirtual(frame_tokens, self.COLUNAS_TOKENS)
+        self.lista_tokens.frame.grid(row=0, column=0, sticky="nsew")
         
         # Aba de erros
         frame_erros = ttk.Frame(self.notebook)
         self.notebook.add(frame_erros, text="Erros")
         
-        self.texto_erros = scrolledtext.ScrolledText(frame_erros, width=60, height=20, 
-                                                    font=('Consolas', 9))
-        self.texto_erros.grid(row=0, column=0, sticky="nsew")
+        self.lista_erros = ListaTokensVirtual(
+            frame_erros, self.COLUNAS_TOKENS, numerar=True,
+            mensagem_vazia="Nenhum erro encontrado! O código está sintaticamente correto.")
+        self.lista_erros.frame.grid(row=0, column=0, sticky="nsew")
+        
+        legenda_erros = scrolledtext.ScrolledText(frame_erros, width=60, height=8, font=('Consolas', 9))
+        legenda_erros.grid(row=1, column=0, sticky="nsew", pady=(5, 0))
+        legenda_erros.insert('1.0', self.LEGENDA_ERROS)
+        legenda_erros.configure(state='disabled')
         
         frame_stats = ttk.Frame(self.notebook)
         self.notebook.add(frame_stats, text="Estatísticas")
@@ -963,7 +3651,8 @@ class InterfaceGrafica:
         frame_tokens.columnconfigure(0, weight=1)
         frame_tokens.rowconfigure(0, weight=1)
         frame_erros.columnconfigure(0, weight=1)
-        frame_erros.rowconfigure(0, weight=1)
+        frame_erros.rowconfigure(0, weight=3)
+        frame_erros.rowconfigure(1, weight=1)
         frame_stats.columnconfigure(0, weight=1)
         frame_stats.rowconfigure(0, weight=1)
         
@@ -1045,9 +3734,14 @@ cdt [ idade ge 18 and idade lt 80 ]
     def limpar_codigo(self):
         # Limpa o código fonte e os resultados
         self.texto_codigo.delete('1.0', tk.END)
-        self.texto_tokens.delete('1.0', tk.END)
-        self.texto_erros.delete('1.0', tk.END)
+        self.lista_tokens.limpar()
+        self.lista_erros.limpar()
         self.texto_stats.delete('1.0', tk.END)
+        self.tokens_atuais = []
+        
+        # Descarta o resultado de uma análise ainda em andamento
+        self.geracao_analise += 1
+        self.geracao_exibida = self.geracao_analise
         self.label_status.config(text="Código limpo", fg='#27ae60')
     
     def analisar_codigo(self):
@@ -1060,81 +3754,260 @@ cdt [ idade ge 18 and idade lt 80 ]
             messagebox.showwarning("Aviso", "Por favor, insira um código para análise.")
             return
         
-        try:
-            # Análise
-            self.label_status.config(text="Analisando código...", fg='#f39c12')
-            self.root.update()
-            
-            self.tokens_atuais = self.analisador.analisar(codigo)
-            
-            # Atualizar resultados
-            self.atualizar_tokens()
-            self.atualizar_erros()
-            self.atualizar_estatisticas()
-            
-            # Status final
-            stats = self.analisador.obter_estatisticas(self.tokens_atuais)
-            if stats['total_erros'] > 0:
-                self.label_status.config(text=f"Análise concluída com {stats['total_erros']} erro(s)", fg='#e74c3c')
-            else:
-                self.label_status.config(text="Análise concluída com sucesso!", fg='#27ae60')
-                
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro durante a análise: {str(e)}")
-            self.label_status.config(text="Erro na análise", fg='#e74c3c')
+        self.iniciar_analise(codigo)
     
-    def atualizar_tokens(self):
-        self.texto_tokens.delete('1.0', tk.END)
+    def codigo_modificado(self, event=None):
+        # Limpar a marca de modificação também gera <<Modified>>
+        if not self.texto_codigo.edit_modified():
+            return
+        self.texto_codigo.edit_modified(False)
         
-        resultado = ""
-        for token in self.tokens_atuais:
-            if token.tipo != TokenType.EOF:
-                resultado += str(token) + "\n"
+        # registrar_edicao já descartou do cache as linhas editadas
+        self.agendar_destaque()
+        self.agendar_analise()
+    
+    def interceptar_edicoes(self, texto):
+        """
+        Faz o comando Tcl do editor passar por registrar_edicao antes de cada
+        inserção ou remoção (inclusive as feitas pelo teclado e pela área de
+        transferência), já que o <<Modified>> do Tk não informa o que mudou.
+        """
+        original = texto._w + '_original'
+        texto.tk.call('rename', texto._w, original)
         
-        self.texto_tokens.insert('1.0', resultado)
+        def comando(*argumentos):
+            if argumentos and argumentos[0] in ('insert', 'delete', 'replace', 'edit'):
+                self.registrar_edicao(texto, original, argumentos)
+            return texto.tk.call((original,) + argumentos)
+        
+        texto.tk.createcommand(texto._w, comando)
     
-    def atualizar_erros(self):
-
-        self.texto_erros.delete('1.0', tk.END)
+    def registrar_edicao(self, texto, original: str, argumentos: tuple):
+        """
+        Descarta do cache de destaque as linhas que uma edição vai alterar e desloca
+        as seguintes. As tags do Tk acompanham o texto, então as demais linhas
+        continuam com os destaques certos e não são varridas de novo.
+        """
+        def linha(indice):
+            # 'end' fica depois da última quebra de linha, que não pode ser editada
+            return min(int(str(texto.tk.call(original, 'index', indice)).split('.')[0]), ultima)
         
-        erros = [token for token in self.tokens_atuais if token.eh_erro]
+        ultima = int(str(texto.tk.call(original, 'index', 'end - 1c')).split('.')[0])
         
-        if not erros:
-            self.texto_erros.insert('1.0', "Nenhum erro encontrado! O código está sintaticamente correto.")
+        operacao = argumentos[0]
+        if operacao == 'edit':
+            # Desfazer e refazer alteram o texto sem passar por insert e delete
+            if len(argumentos) > 1 and str(argumentos[1]) in ('undo', 'redo'):
+                self.linhas_destacadas.clear()
+            return
+        if operacao == 'insert':
+            inicio = fim = linha(argumentos[1])
+            textos = argumentos[2::2]
+        elif operacao == 'delete' and len(argumentos) <= 3:
+            inicio = linha(argumentos[1])
+            # Sem o segundo índice, remove um caractere (que pode ser a quebra de linha)
+            fim = linha(argumentos[2] if len(argumentos) == 3 else f'{argumentos[1]} +1c')
+            textos = ()
+        elif operacao == 'replace':
+            inicio = linha(argumentos[1])
+            fim = linha(argumentos[2])
+            textos = argumentos[3::2]
         else:
-            resultado = "ERROS ENCONTRADOS:\n\n"
-            for i, erro in enumerate(erros, 1):
-                resultado += f"{i}. {str(erro)}\n\n"
+            # Remoção de vários intervalos de uma vez: o cache é refeito
+            self.linhas_destacadas.clear()
+            return
+        if fim < inicio:
+            # Intervalo invertido: o Tk não altera o texto
+            return
+        novas_linhas = sum(str(trecho).count('\n') for trecho in textos)
+        self.linhas_destacadas = self.deslocar_linhas_destacadas(
+            self.linhas_destacadas, inicio, fim, novas_linhas - (fim - inicio))
+    
+    @staticmethod
+    def deslocar_linhas_destacadas(linhas: dict, inicio: int, fim: int, deslocamento: int) -> dict:
+        """Remove as linhas inicio..fim do cache e soma deslocamento às seguintes."""
+        if not deslocamento:
+            for num_linha in range(inicio, fim + 1):
+                linhas.pop(num_linha, None)
+            return linhas
+        return {num_linha + deslocamento if num_linha > fim else num_linha: texto
+                for num_linha, texto in linhas.items() if num_linha < inicio or num_linha > fim}
+    
+    def agendar_analise(self):
+        """Agenda uma nova análise, se o modo "analisar ao digitar" estiver ativo."""
+        if self.analise_agendada is not None:
+            self.root.after_cancel(self.analise_agendada)
+            self.analise_agendada = None
+        
+        if self.analisar_ao_digitar.get():
+            # Debounce: só analisa quando o usuário para de digitar
+            self.analise_agendada = self.root.after(self.ATRASO_ANALISE_MS, self.analisar_ao_parar_de_digitar)
+    
+    def codigo_rolado(self, *args):
+        self.texto_codigo.vbar.set(*args)
+        self.agendar_destaque()
+    
+    def agendar_destaque(self):
+        if self.destaque_agendado is None:
+            self.destaque_agendado = self.root.after_idle(self.destacar_area_visivel)
+    
+    def destacar_area_visivel(self):
+        """
+        Aplica o destaque de sintaxe às linhas visíveis do editor (mais uma margem).
+
+        Criar tags do Tk para todos os tokens de um arquivo grande é muito lento, então
+        apenas linhas próximas da área visível são destacadas, e cada linha só é
+        varrida de novo se foi editada (ou seu texto mudou) desde que foi destacada.
+        Como os tokens de uma linha não dependem das demais, cada linha é varrida
+        isoladamente.
+        """
+        self.destaque_agendado = None
+        texto = self.texto_codigo
+        
+        primeira_visivel = int(texto.index('@0,0').split('.')[0])
+        ultima_visivel = int(texto.index(f'@0,{texto.winfo_height()}').split('.')[0])
+        total_linhas = int(texto.index('end-1c').split('.')[0])
+        inicio = max(1, primeira_visivel - self.MARGEM_DESTAQUE)
+        fim = min(total_linhas, ultima_visivel + self.MARGEM_DESTAQUE)
+        
+        # Mantém limitado o número de tags no documento
+        if self.total_linhas_destacadas > self.LIMITE_LINHAS_DESTACADAS:
+            for tag in self.CORES_DESTAQUE:
+                texto.tag_remove(tag, '1.0', tk.END)
+            self.linhas_destacadas.clear()
+            self.total_linhas_destacadas = 0
+        
+        linhas = texto.get(f'{inicio}.0', f'{fim}.end').split('\n')
+        trechos = []
+        for num_linha, linha in enumerate(linhas, inicio):
+            if self.linhas_destacadas.get(num_linha) == linha:
+                continue
             
-            resultado += "\nTIPOS DE ERROS DETECTÁVEIS:\n"
-            resultado += "• Programa deve começar com a palavra reservada 'als'\n"
-            resultado += "• Incompatibilidade de tipos (ex: intn recebendo valor decimal)\n"
-            resultado += "• Operadores relacionais mal formados (ex: 'e' em vez de 'eq')\n"
-            resultado += "• Palavras reservadas mal formadas (ex: 'wr' em vez de 'wrt')\n"
-            resultado += "• Operadores relacionais ausentes em condições (ex: [ idade 18 ])\n"
-            resultado += "• Expressões lógicas mal formadas (ex: 'and' sem expressões completas)\n"
-            resultado += "• Comando 'input' com sintaxe incorreta (ex: input sem parênteses)\n"
-            resultado += "• Comando 'input' sem variável especificada\n"
-            resultado += "• Comando 'input' com variável não declarada\n"
-            resultado += "• Símbolos não pertencentes ao conjunto de símbolos terminais (@)\n"
-            resultado += "• Identificadores mal formados (j@, 1a)\n"
-            resultado += "• Identificadores muito longos (mais de 30 caracteres)\n"
-            resultado += "• Números mal formados (2.a3)\n"
-            resultado += "• Números muito longos (mais de 15 dígitos)\n"
-            resultado += "• Strings não fechadas (\"hello world)\n"
-            resultado += "• Caracteres não reconhecidos\n"
-            resultado += "\nOPERADORES LÓGICOS SUPORTADOS:\n"
-            resultado += "• 'and' - E lógico (ex: [ idade ge 18 and idade lt 80 ])\n"
-            resultado += "• 'or' - OU lógico (ex: [ idade lt 18 or idade ge 65 ])\n"
+            for tag in self.CORES_DESTAQUE:
+                texto.tag_remove(tag, f'{num_linha}.0', f'{num_linha}.end')
+            self.analisador._varrer_linha(linha, trechos)
+            for tipo, coluna_inicio, coluna_fim in trechos:
+                tag = self.TAGS_DESTAQUE.get(tipo)
+                if tag:
+                    texto.tag_add(tag, f'{num_linha}.{coluna_inicio}', f'{num_linha}.{coluna_fim}')
+            trechos.clear()
             
-            self.texto_erros.insert('1.0', resultado)
+            self.linhas_destacadas[num_linha] = linha
+            self.total_linhas_destacadas += 1
+    
+    def analisar_ao_parar_de_digitar(self):
+        self.analise_agendada = None
+        codigo = self.texto_codigo.get('1.0', tk.END).strip()
+        if codigo:
+            self.iniciar_analise(codigo)
     
-    def atualizar_estatisticas(self):
+    def iniciar_analise(self, codigo: str):
+        """
+        Analisa o código em uma thread de trabalho, sem bloquear a interface.
 
-        self.texto_stats.delete('1.0', tk.END)
+        Uma análise iniciada antes desta é cancelada na próxima verificação de
+        geração e seu resultado nunca é exibido.
+        """
+        self.geracao_analise += 1
+        self.label_status.config(text="Analisando código...", fg='#f39c12')
+        
+        thread = threading.Thread(target=self.executar_analise, args=(self.geracao_analise, codigo), daemon=True)
+        thread.start()
+        
+        if self.verificacao_agendada is None:
+            self.verificacao_agendada = self.root.after(self.INTERVALO_VERIFICACAO_MS, self.verificar_resultados)
+    
+    def executar_analise(self, geracao: int, codigo: str):
+        """
+        Executada na thread de trabalho: não acessa nenhum widget.
+
+        Se um pedido mais novo for feito, a análise é abandonada na próxima
+        verificação: entre cada etapa e, durante a varredura, a cada bloco de linhas.
+        """
+        def cancelada():
+            return geracao != self.geracao_analise
+        
+        try:
+            with self.trava_incremental:
+                if cancelada():
+                    return
+                if self.incremental.sincronizar(codigo, cancelada) is None or cancelada():
+                    return
+                tokens = self.incremental.tokens()
+            
+            # Tudo que percorre a lista de tokens é feito aqui, fora da thread da interface
+            if cancelada():
+                return
+            stats = self.analisador.obter_estatisticas(tokens)
+            if cancelada():
+                return
+            indices = self.indices_exibidos(tokens)
+            texto_stats = self.formatar_estatisticas(stats)
+            self.resultados_analise.put((geracao, tokens, stats, (indices, texto_stats), None))
+        except Exception as e:
+            self.resultados_analise.put((geracao, None, None, None, e))
+    
+    def verificar_resultados(self):
+        """Exibe, na thread da interface, o resultado mais recente da thread de trabalho."""
+        self.verificacao_agendada = None
+        
+        resultado = None
+        while True:
+            try:
+                item = self.resultados_analise.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] == self.geracao_analise:
+                resultado = item
+        
+        if resultado is not None:
+            self.exibir_resultado(*resultado)
+        
+        if self.geracao_exibida != self.geracao_analise:
+            self.verificacao_agendada = self.root.after(self.INTERVALO_VERIFICACAO_MS, self.verificar_resultados)
+    
+    def exibir_resultado(self, geracao, tokens, stats, dados, erro):
+        self.geracao_exibida = geracao
         
-        stats = self.analisador.obter_estatisticas(self.tokens_atuais)
+        if erro is not None:
+            messagebox.showerror("Erro", f"Erro durante a análise: {str(erro)}")
+            self.label_status.config(text="Erro na análise", fg='#e74c3c')
+            return
+        
+        self.tokens_atuais = tokens
+        indices, texto_stats = dados
+        self.exibir_listas(tokens, indices, stats)
+        self.texto_stats.delete('1.0', tk.END)
+        self.texto_stats.insert('1.0', texto_stats)
         
+        # Status final
+        if stats['total_erros'] > 0:
+            self.label_status.config(text=f"Análise concluída com {stats['total_erros']} erro(s)", fg='#e74c3c')
+        else:
+            self.label_status.config(text="Análise concluída com sucesso!", fg='#27ae60')
+    
+    def exibir_listas(self, tokens, indices: Tuple[List[int], List[int]], stats: dict):
+        """Exibe os tokens e os erros nas listas virtuais (custo independe do total)."""
+        indices_tokens, indices_erros = indices
+        tipos = [tipo for tipo in stats['tipos_tokens'] if tipo != TokenType.EOF.value]
+        self.lista_tokens.definir_tokens(tokens, indices_tokens, tipos)
+        self.lista_erros.definir_tokens(tokens, indices_erros, [tipo for tipo in tipos if tipo.startswith('erro')])
+    
+    # Os métodos abaixo não acessam widgets e podem rodar na thread de trabalho
+    
+    @staticmethod
+    def indices_exibidos(tokens) -> Tuple[List[int], List[int]]:
+        """Índices dos tokens da aba Tokens (todos menos o EOF) e da aba Erros."""
+        indices_tokens = []
+        indices_erros = []
+        for indice, token in enumerate(tokens):
+            if token.tipo != TokenType.EOF:
+                indices_tokens.append(indice)
+            if token.eh_erro:
+                indices_erros.append(indice)
+        return indices_tokens, indices_erros
+    
+    def formatar_estatisticas(self, stats: dict) -> str:
         resultado = "ESTATÍSTICAS DA ANÁLISE LÉXICA\n"
         resultado += "=" * 50 + "\n\n"
         
@@ -1152,17 +4025,790 @@ cdt [ idade ge 18 and idade lt 80 ]
         for tipo, quantidade in sorted(stats['tipos_tokens'].items()):
             resultado += f"{tipo:<25}: {quantidade:>3}\n"
         
-        self.texto_stats.insert('1.0', resultado)
+        return resultado
     
     def executar(self):
         self.root.mainloop()
 
 
+def analisar_console_streaming(analisador: AnalisadorLexico, fonte: str, formato: str = 'tabela',
+                               processos: Optional[int] = None, simbolos: bool = False) -> int:
+    """
+    Analisa um arquivo (ou a entrada padrão, se fonte for '-') e escreve os tokens
+    na saída padrão, em blocos, à medida que são produzidos. Retorna o código de
+    saída: 1 se a leitura falhar (o erro vai para a saída de erros, e os tokens
+    já escritos ficam incompletos), 0 caso contrário.
+
+    Com processos, o arquivo é lido inteiro e varrido por analisar_paralelo. Com
+    simbolos, o índice de símbolos é escrito após as estatísticas.
+
+    No formato 'tabela' as estatísticas vêm após a tabela; nos demais formatos vão
+    para a saída de erros, para não misturar com os dados.
+    """
+    indice = IndiceSimbolos() if simbolos else None
+    try:
+        with contextlib.ExitStack() as pilha:
+            if fonte == '-':
+                if hasattr(sys.stdin, 'reconfigure'):
+                    sys.stdin.reconfigure(encoding='utf-8')
+                tokens = analisador.iterar_tokens(sys.stdin, indice)
+            elif processos:
+                with open(fonte, 'r', encoding='utf-8') as arquivo:
+                    tokens = analisador.analisar_paralelo(arquivo.read(), processos, indice=indice)
+            else:
+                # Aberto aqui, e não por iterar_tokens_arquivo, para que uma falha de
+                # leitura chegue até o código de saída
+                arquivo = pilha.enter_context(open(fonte, 'r', encoding='utf-8'))
+                tokens = analisador.iterar_tokens(arquivo, indice)
+            
+            if formato == 'binario':
+                sys.stdout.flush()
+                stats = analisador.escrever_tokens(tokens, sys.stdout.buffer, formato)
+                sys.stdout.buffer.flush()
+            else:
+                stats = analisador.escrever_tokens(tokens, sys.stdout, formato)
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{fonte}' não encontrado.", file=sys.stderr)
+        return 1
+    except (OSError, UnicodeDecodeError) as e:
+        sys.stdout.flush()
+        print(f"Erro ao ler arquivo: {e}", file=sys.stderr)
+        return 1
+    
+    destino = sys.stdout if formato == 'tabela' else sys.stderr
+    destino.write(f"\nESTATÍSTICAS:\n")
+    destino.write(f"Total de tokens: {stats['total_tokens']}\n")
+    destino.write(f"Erros: {stats['total_erros']}\n")
+    if indice is not None:
+        destino.write("\n" + indice.relatorio())
+    return 0
+
+
+# Analisador de cada processo de analisar_paralelo, criado uma vez por processo
+_analisador_fatias = None
+
+
+def _iniciar_processo_fatias(motor: str, distancia_sugestoes: int = 0) -> None:
+    global _analisador_fatias
+    _analisador_fatias = AnalisadorLexico(motor, distancia_sugestoes)
+
+
+def _varrer_fatia(texto: str) -> Tuple[bytes, bytes, bytes, bytes]:
+    """
+    Varre as linhas de uma fatia de analisar_paralelo e retorna os trechos como
+    colunas compactas: ordinais dos tipos, linha relativa à fatia, início e fim.
+    """
+    varrer_linha = _analisador_fatias._varrer_linha
+    ordinais = TokenArray.ORDINAIS
+    tipos = bytearray()
+    linhas = array('I')
+    inicios = array('I')
+    fins = array('I')
+    trechos = []
+    
+    for relativa, linha in enumerate(texto.split('\n')):
+        varrer_linha(linha, trechos)
+        for tipo, inicio, fim in trechos:
+            tipos.append(ordinais[tipo])
+            linhas.append(relativa)
+            inicios.append(inicio)
+            fins.append(fim)
+        trechos.clear()
+    
+    return bytes(tipos), linhas.tobytes(), inicios.tobytes(), fins.tobytes()
+
+
+# Analisador de cada processo do modo em lote, criado uma vez por processo
+_analisador_lote = None
+_incluir_tokens_lote = False
+_cache_lote = None
+_limites_lote = None
+
+
+def _iniciar_processo_lote(motor: str, incluir_tokens: bool, diretorio_cache: Optional[str] = None,
+                           limite_cache_bytes: int = 0, perfilar: bool = False,
+                           distancia_sugestoes: int = 0, limites: Optional[LimitesAnalise] = None) -> None:
+    global _analisador_lote, _incluir_tokens_lote, _cache_lote, _limites_lote
+    _analisador_lote = AnalisadorLexico(motor, distancia_sugestoes)
+    if perfilar:
+        _analisador_lote.ativar_perfil()
+    _incluir_tokens_lote = incluir_tokens
+    _cache_lote = CacheResultados(diretorio_cache, limite_cache_bytes) if diretorio_cache else None
+    _limites_lote = limites
+
+
+def _token_para_lista(token: Token) -> list:
+    return [token.tipo.value, token.lexema, token.linha, token.coluna]
+
+
+def _analisar_arquivo_lote(caminho: str) -> dict:
+    """
+    Analisa um arquivo em um processo do lote e retorna um resultado pequeno (e
+    serializável), para que a troca de dados entre processos não limite a escala.
+    """
+    # analisar_arquivo informa falhas de leitura com print: não pode ir para a saída do lote
+    with contextlib.redirect_stdout(sys.stderr):
+        tokens = _analisador_lote.analisar_arquivo(caminho, cache=_cache_lote, limites=_limites_lote)
+    
+    # Um arquivo lido por inteiro sempre produz ao menos o EOF; sem tokens e sem
+    # um limite atingido (que pode cortar a análise antes do primeiro token), a leitura falhou
+    truncado = isinstance(tokens, ResultadoAnalise) and tokens.truncado
+    if not tokens and not truncado:
+        return {'arquivo': caminho, 'erro_leitura': True}
+    
+    resultado = {
+        'arquivo': caminho,
+        'estatisticas': _analisador_lote.obter_estatisticas(tokens),
+        'erros': [_token_para_lista(token) + [token.descricao] for token in tokens if token.eh_erro],
+    }
+    if truncado:
+        resultado['truncado'] = True
+        resultado['motivo'] = tokens.motivo
+    if _incluir_tokens_lote:
+        resultado['tokens'] = [_token_para_lista(token) for token in tokens]
+    if _analisador_lote.perfil is not None:
+        # Perfil só deste arquivo; o processo principal soma os de todos
+        resultado['perfil'] = _analisador_lote.perfil
+        _analisador_lote.ativar_perfil()
+    return resultado
+
+
+def expandir_caminhos(caminhos: Iterable[str], extensao: str = '.als') -> List[str]:
+    """
+    Expande arquivos, diretórios (recursivamente, apenas arquivos com a extensão) e
+    padrões glob em uma lista de arquivos sem repetições, na ordem em que aparecem.
+    """
+    arquivos = []
+    vistos = set()
+    
+    def acrescentar(caminho):
+        if caminho not in vistos:
+            vistos.add(caminho)
+            arquivos.append(caminho)
+    
+    def acrescentar_diretorio(diretorio):
+        for raiz, subdiretorios, nomes in os.walk(diretorio):
+            subdiretorios.sort()
+            for nome in sorted(nomes):
+                if nome.endswith(extensao):
+                    acrescentar(os.path.join(raiz, nome))
+    
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            acrescentar_diretorio(caminho)
+        elif any(caractere in caminho for caractere in '*?['):
+            for encontrado in sorted(glob.glob(caminho, recursive=True)):
+                if os.path.isdir(encontrado):
+                    acrescentar_diretorio(encontrado)
+                else:
+                    acrescentar(encontrado)
+        else:
+            # Arquivos inexistentes são mantidos e informados como erro de leitura
+            acrescentar(caminho)
+    
+    return arquivos
+
+
+def executar_lote(argumentos: List[str]) -> int:
+    """
+    Modo em lote: analisa muitos arquivos em paralelo e escreve uma linha JSON por
+    arquivo (na ordem de entrada), seguida de uma linha com o resumo de todos eles.
+
+    Retorna o código de saída: 0 sem erros, 1 se algum arquivo tem erros, não
+    pôde ser lido ou foi analisado só em parte por um limite.
+    """
+    parser = argparse.ArgumentParser(
+        prog="analisador.py --lote",
+        description="Analisa arquivos, diretórios e padrões glob de arquivos .als em paralelo.")
+    parser.add_argument('caminhos', nargs='+', help="arquivos, diretórios ou padrões glob (ex: 'entregas/**/*.als')")
+    parser.add_argument('-p', '--processos', type=int, default=os.cpu_count() or 1,
+                        help="número de processos (padrão: número de CPUs)")
+    parser.add_argument('--bloco', type=int, default=None,
+                        help="arquivos enviados a um processo por vez (padrão: automático)")
+    parser.add_argument('--motor', choices=AnalisadorLexico.MOTORES, default='sequencial',
+                        help="motor de casamento de padrões (padrão: sequencial)")
+    parser.add_argument('--tokens', action='store_true', help="inclui a lista completa de tokens de cada arquivo")
+    parser.add_argument('-o', '--saida', default='-', help="arquivo de saída JSON Lines (padrão: saída padrão)")
+    parser.add_argument('--cache', metavar='DIRETORIO',
+                        help="diretório do cache de resultados; arquivos inalterados não são analisados de novo")
+    parser.add_argument('--cache-limite', type=float, default=256, metavar='MB',
+                        help="tamanho máximo do cache, em MB (padrão: 256)")
+    parser.add_argument('--profile', action='store_true',
+                        help="escreve na saída de erros o perfil somado de todos os arquivos analisados")
+    parser.add_argument('--sugestoes', type=int, default=0, metavar='DISTANCIA',
+                        help="aponta identificadores a até DISTANCIA edições de uma palavra reservada (padrão: 0, desligado)")
+    parser.add_argument('--max-erros', type=int, metavar='N',
+                        help="para a análise de um arquivo no N-ésimo erro")
+    parser.add_argument('--falhar-rapido', action='store_true',
+                        help="para a análise de um arquivo no primeiro erro (o mesmo que --max-erros 1)")
+    parser.add_argument('--max-caracteres', type=int, metavar='N',
+                        help="analisa apenas os primeiros N caracteres de cada arquivo")
+    parser.add_argument('--tempo-maximo', type=float, metavar='SEGUNDOS',
+                        help="tempo máximo de análise de cada arquivo")
+    args = parser.parse_args(argumentos)
+    
+    limites = None
+    max_erros = 1 if args.falhar_rapido else args.max_erros
+    if max_erros is not None or args.max_caracteres is not None or args.tempo_maximo is not None:
+        try:
+            limites = LimitesAnalise(max_erros, args.max_caracteres, args.tempo_maximo)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    arquivos = expandir_caminhos(args.caminhos)
+    processos = max(1, min(args.processos, len(arquivos) or 1))
+    # Blocos grandes o bastante para diluir o custo da comunicação, mas com vários
+    # blocos por processo para que nenhum processo fique ocioso no fim
+    bloco = args.bloco or max(1, min(64, len(arquivos) // (processos * 4)))
+    
+    resumo = {
+        'total_arquivos': len(arquivos),
+        'arquivos_com_erro': 0,
+        'arquivos_nao_lidos': 0,
+        'arquivos_truncados': 0,
+        'total_tokens': 0,
+        'tokens_validos': 0,
+        'total_erros': 0,
+        'tipos_tokens': Counter(),
+    }
+    
+    saida = sys.stdout if args.saida == '-' else open(args.saida, 'w', encoding='utf-8')
+    try:
+        configuracao = (args.motor, args.tokens, args.cache, int(args.cache_limite * 1024 * 1024), args.profile,
+                        args.sugestoes, limites)
+        perfil = PerfilAnalise() if args.profile else None
+        if processos == 1:
+            _iniciar_processo_lote(*configuracao)
+            resultados = map(_analisar_arquivo_lote, arquivos)
+            pool = None
+        else:
+            import multiprocessing
+            pool = multiprocessing.Pool(processos, initializer=_iniciar_processo_lote, initargs=configuracao)
+            resultados = pool.imap(_analisar_arquivo_lote, arquivos, chunksize=bloco)
+        
+        try:
+            for resultado in resultados:
+                if 'perfil' in resultado:
+                    perfil.acumular(resultado.pop('perfil'))
+                saida.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+                if resultado.get('erro_leitura'):
+                    resumo['arquivos_nao_lidos'] += 1
+                    continue
+                if 'truncado' in resultado:
+                    resumo['arquivos_truncados'] += 1
+                stats = resultado['estatisticas']
+                if stats['total_erros']:
+                    resumo['arquivos_com_erro'] += 1
+                resumo['total_tokens'] += stats['total_tokens']
+                resumo['tokens_validos'] += stats['tokens_validos']
+                resumo['total_erros'] += stats['total_erros']
+                resumo['tipos_tokens'].update(stats['tipos_tokens'])
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        
+        resumo['tipos_tokens'] = dict(resumo['tipos_tokens'])
+        saida.write(json.dumps({'resumo': resumo}, ensure_ascii=False) + '\n')
+        if perfil is not None:
+            sys.stderr.write(perfil.relatorio())
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+    
+    return 1 if resumo['arquivos_com_erro'] or resumo['arquivos_nao_lidos'] or resumo['arquivos_truncados'] else 0
+
+
+class MonitorDiretorio:
+    """
+    Modo de observação (--watch): mantém a análise de todos os arquivos .als de um
+    diretório e analisa de novo apenas os arquivos que mudam.
+
+    Para cada arquivo é guardado um índice com a data de modificação, o tamanho, o
+    hash SHA-256 do conteúdo e as estatísticas da última análise. Um arquivo só
+    volta a analisar_arquivo se a data ou o tamanho mudou e o hash também mudou
+    (salvar sem alterar nada não custa uma análise), e o resumo de todos os
+    arquivos é atualizado subtraindo as estatísticas antigas e somando as novas.
+
+    No Linux as alterações chegam pelo inotify (via ctypes): o processo fica
+    bloqueado em select enquanto nada muda, sem custo de CPU. Sem inotify, o
+    diretório é consultado a cada intervalo, e o mesmo vale para os diretórios
+    que o inotify não pôde observar (por exemplo, depois que o limite de
+    observações do sistema acaba): todos os subdiretórios (arquivos criados e
+    removidos mudam a data do diretório), os arquivos alterados recentemente e
+    uma fatia de ARQUIVOS_POR_VARREDURA dos demais, em rodízio. Assim o custo de cada consulta
+    não cresce com o número de arquivos, e uma alteração em um arquivo parado há
+    muito tempo é percebida em até (arquivos / ARQUIVOS_POR_VARREDURA) intervalos.
+    """
+    
+    # Espera após o primeiro evento do inotify, para juntar as alterações de um salvamento
+    SEGUNDOS_AGRUPAMENTO = 0.2
+    # Arquivos consultados por intervalo no modo de consulta periódica, além dos recentes
+    ARQUIVOS_POR_VARREDURA = 2000
+    # Por quanto tempo um arquivo alterado é consultado a cada intervalo
+    SEGUNDOS_RECENTE = 60.0
+    
+    # Constantes do inotify (linux/inotify.h)
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    EVENTO_INOTIFY = struct.Struct('iIII')
+    
+    def __init__(self, diretorio: str, analisador: Optional[AnalisadorLexico] = None,
+                 saida: Optional[TextIO] = None, intervalo: float = 1.0, extensao: str = '.als'):
+        self.diretorio = os.path.abspath(diretorio)
+        self.analisador = analisador or AnalisadorLexico()
+        self.saida = saida or sys.stdout
+        self.intervalo = intervalo
+        self.extensao = extensao
+        
+        # caminho -> (mtime_ns, tamanho, hash, estatísticas ou None se não pôde ser lido)
+        self.indice = {}
+        # diretório -> mtime_ns, e arquivos de cada diretório
+        self.diretorios = {}
+        self.arquivos_por_diretorio = {}
+        self.resumo = {
+            'total_arquivos': 0,
+            'arquivos_com_erro': 0,
+            'arquivos_nao_lidos': 0,
+            'total_tokens': 0,
+            'tokens_validos': 0,
+            'total_erros': 0,
+            'tipos_tokens': Counter(),
+        }
+        self.analises = 0
+        
+        # Consulta periódica: fila do rodízio e arquivos alterados recentemente
+        self._rodizio = []
+        self._posicao_rodizio = 0
+        self._recentes = {}
+        
+        # Erros de cada arquivo na análise inicial, escritos ao fim dela
+        self._erros_iniciais = {}
+        
+        # inotify: descritor, diretório de cada observação e diretórios que não
+        # puderam ser observados (e são consultados periodicamente)
+        self._inotify = None
+        self._observacoes = {}
+        self._sem_observacao = set()
+        self._erros_observacao = set()
+    
+    # Índice e resumo
+    
+    def _somar(self, estatisticas: Optional[dict], sinal: int) -> None:
+        resumo = self.resumo
+        resumo['total_arquivos'] += sinal
+        if estatisticas is None:
+            resumo['arquivos_nao_lidos'] += sinal
+            return
+        if estatisticas['total_erros']:
+            resumo['arquivos_com_erro'] += sinal
+        resumo['total_tokens'] += sinal * estatisticas['total_tokens']
+        resumo['tokens_validos'] += sinal * estatisticas['tokens_validos']
+        resumo['total_erros'] += sinal * estatisticas['total_erros']
+        for tipo, quantidade in estatisticas['tipos_tokens'].items():
+            resumo['tipos_tokens'][tipo] += sinal * quantidade
+        resumo['tipos_tokens'] += Counter()     # descarta os tipos que zeraram
+    
+    def verificar(self, caminho: str, informar: bool = True) -> bool:
+        """
+        Atualiza o índice de um arquivo; retorna True se ele foi analisado de novo
+        (ou removido do índice por não existir mais).
+        """
+        try:
+            informacao = os.stat(caminho)
+        except OSError:
+            return self.remover(caminho, informar)
+        
+        anterior = self.indice.get(caminho)
+        if anterior is not None and anterior[:2] == (informacao.st_mtime_ns, informacao.st_size):
+            return False
+        # O hash e a análise usam os mesmos bytes: uma escrita entre duas leituras
+        # deixaria no índice estatísticas de outro conteúdo
+        try:
+            with open(caminho, 'rb') as arquivo:
+                conteudo = arquivo.read()
+            digest = hashlib.sha256(conteudo).digest()
+        except OSError as e:
+            print(f"Erro ao ler arquivo: {e}", file=sys.stderr)
+            conteudo = digest = None
+        if anterior is not None and digest is not None and anterior[2] == digest:
+            # Só a data mudou (por exemplo, salvo sem alterações)
+            self.indice[caminho] = (informacao.st_mtime_ns, informacao.st_size, digest, anterior[3])
+            return False
+        
+        tokens = []
+        if conteudo is not None:
+            try:
+                tokens = self.analisador.analisar(self.analisador._decodificar(conteudo))
+            except UnicodeDecodeError as e:
+                print(f"Erro ao ler arquivo '{caminho}': {e}", file=sys.stderr)
+        self.analises += 1
+        estatisticas = self.analisador.obter_estatisticas(tokens) if tokens else None
+        
+        if anterior is not None:
+            self._somar(anterior[3], -1)
+        else:
+            self.arquivos_por_diretorio.setdefault(os.path.dirname(caminho), set()).add(caminho)
+        self._somar(estatisticas, 1)
+        self.indice[caminho] = (informacao.st_mtime_ns, informacao.st_size, digest, estatisticas)
+        
+        if informar:
+            self._recentes[caminho] = time.monotonic()
+            self._informar_arquivo(caminho, tokens, estatisticas)
+        elif estatisticas is None or estatisticas['total_erros']:
+            # Análise inicial: os erros são escritos por iniciar(), em ordem de caminho
+            self._erros_iniciais[caminho] = [token for token in tokens if token.eh_erro]
+        return True
+    
+    def remover(self, caminho: str, informar: bool = True) -> bool:
+        anterior = self.indice.pop(caminho, None)
+        self._recentes.pop(caminho, None)
+        if anterior is None:
+            return False
+        self.arquivos_por_diretorio.get(os.path.dirname(caminho), set()).discard(caminho)
+        self._somar(anterior[3], -1)
+        if informar:
+            self.saida.write(f"[{time.strftime('%H:%M:%S')}] {self._relativo(caminho)}: removido\n")
+        return True
+    
+    def _remover_diretorio(self, diretorio: str) -> bool:
+        """Remove do índice um diretório e tudo abaixo dele."""
+        prefixo = diretorio + os.sep
+        removido = False
+        for outro in [d for d in self.diretorios if d == diretorio or d.startswith(prefixo)]:
+            del self.diretorios[outro]
+            self._sem_observacao.discard(outro)
+            for caminho in list(self.arquivos_por_diretorio.pop(outro, ())):
+                removido = self.remover(caminho) or removido
+        return removido
+    
+    def _relativo(self, caminho: str) -> str:
+        return os.path.relpath(caminho, self.diretorio)
+    
+    def _informar_arquivo(self, caminho: str, tokens: List[Token], estatisticas: Optional[dict]) -> None:
+        nome = self._relativo(caminho)
+        momento = time.strftime('%H:%M:%S')
+        if estatisticas is None:
+            self.saida.write(f"[{momento}] {nome}: não pôde ser lido\n")
+            return
+        self.saida.write(f"[{momento}] {nome}: {estatisticas['total_tokens']} tokens, "
+                         f"{estatisticas['total_erros']} erros\n")
+        for token in tokens:
+            if token.eh_erro:
+                self.saida.write(f"  {nome}:{token.linha}:{token.coluna}: {token.tipo.value}: {token.descricao}\n")
+    
+    def _informar_resumo(self) -> None:
+        resumo = self.resumo
+        self.saida.write(f"TOTAL: {resumo['total_arquivos']} arquivos, {resumo['arquivos_com_erro']} com erros, "
+                         f"{resumo['arquivos_nao_lidos']} não lidos, {resumo['total_tokens']} tokens, "
+                         f"{resumo['total_erros']} erros\n")
+        self.saida.flush()
+    
+    # Varredura de diretórios
+    
+    def _varrer_diretorio(self, diretorio: str, informar: bool) -> bool:
+        """Registra um diretório (e os subdiretórios novos) e verifica seus arquivos."""
+        alterado = False
+        novo = diretorio not in self.diretorios
+        try:
+            self.diretorios[diretorio] = os.stat(diretorio).st_mtime_ns
+            entradas = list(os.scandir(diretorio))
+        except OSError:
+            return self._remover_diretorio(diretorio)
+        if novo and self._inotify is not None:
+            self._observar(diretorio)
+        
+        presentes = set()
+        for entrada in sorted(entradas, key=lambda entrada: entrada.name):
+            try:
+                if entrada.is_dir(follow_symlinks=False):
+                    if entrada.path not in self.diretorios:
+                        alterado = self._varrer_diretorio(entrada.path, informar) or alterado
+                elif entrada.name.endswith(self.extensao) and entrada.is_file():
+                    presentes.add(entrada.path)
+                    alterado = self.verificar(entrada.path, informar) or alterado
+            except OSError:
+                continue
+        
+        # Arquivos e subdiretórios que deixaram de existir
+        if novo:
+            return alterado
+        for caminho in self.arquivos_por_diretorio.get(diretorio, set()) - presentes:
+            alterado = self.remover(caminho, informar) or alterado
+        nomes = {entrada.path for entrada in entradas}
+        for subdiretorio in [d for d in self.diretorios if os.path.dirname(d) == diretorio and d not in nomes]:
+            alterado = self._remover_diretorio(subdiretorio) or alterado
+        return alterado
+    
+    def iniciar(self) -> None:
+        """Analisa todos os arquivos do diretório e escreve os erros encontrados e o resumo."""
+        self._varrer_diretorio(self.diretorio, informar=False)
+        for caminho in sorted(self._erros_iniciais):
+            if caminho in self.indice:
+                self._informar_arquivo(caminho, self._erros_iniciais[caminho], self.indice[caminho][3])
+        self._erros_iniciais.clear()
+        self._informar_resumo()
+    
+    # Consulta periódica
+    
+    def consultar(self, diretorios: Optional[set] = None) -> bool:
+        """
+        Uma rodada da consulta periódica: diretórios, arquivos recentes e uma fatia
+        dos demais. Retorna True se algo mudou.
+
+        Com diretorios, consulta apenas esses diretórios e os arquivos contidos
+        diretamente neles (os que o inotify não pôde observar).
+        """
+        alterado = False
+        if diretorios is None:
+            consultados = list(self.diretorios.items())
+        else:
+            consultados = [(d, self.diretorios[d]) for d in list(diretorios) if d in self.diretorios]
+        for diretorio, data in consultados:
+            try:
+                atual = os.stat(diretorio).st_mtime_ns
+            except OSError:
+                alterado = self._remover_diretorio(diretorio) or alterado
+                continue
+            if atual != data:
+                alterado = self._varrer_diretorio(diretorio, informar=True) or alterado
+        
+        agora = time.monotonic()
+        for caminho, momento in list(self._recentes.items()):
+            if agora - momento > self.SEGUNDOS_RECENTE:
+                del self._recentes[caminho]
+            elif diretorios is None or os.path.dirname(caminho) in diretorios:
+                alterado = self.verificar(caminho) or alterado
+        
+        if self._posicao_rodizio >= len(self._rodizio):
+            if diretorios is None:
+                self._rodizio = list(self.indice)
+            else:
+                self._rodizio = [caminho for caminho in self.indice if os.path.dirname(caminho) in diretorios]
+            self._posicao_rodizio = 0
+        fim = self._posicao_rodizio + self.ARQUIVOS_POR_VARREDURA
+        for caminho in self._rodizio[self._posicao_rodizio:fim]:
+            if caminho in self.indice:
+                alterado = self.verificar(caminho) or alterado
+        self._posicao_rodizio = fim
+        return alterado
+    
+    # inotify
+    
+    def _iniciar_inotify(self) -> bool:
+        """Cria o descritor do inotify; retorna False se não houver inotify."""
+        try:
+            import ctypes
+            self._libc = ctypes.CDLL(None, use_errno=True)
+            descritor = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return False
+        if descritor < 0:
+            return False
+        self._inotify = descritor
+        return True
+    
+    def _observar(self, diretorio: str) -> None:
+        """
+        Observa um diretório pelo inotify; se não for possível (em geral, pelo
+        limite fs.inotify.max_user_watches), ele passa a ser consultado periodicamente.
+        """
+        mascara = (self.IN_CLOSE_WRITE | self.IN_MOVED_FROM | self.IN_MOVED_TO |
+                   self.IN_CREATE | self.IN_DELETE | self.IN_DELETE_SELF)
+        observacao = self._libc.inotify_add_watch(self._inotify, os.fsencode(diretorio), mascara)
+        if observacao < 0:
+            import ctypes
+            numero = ctypes.get_errno()
+            # Cada tipo de falha é informado uma vez, não uma vez por diretório
+            if numero not in self._erros_observacao:
+                self._erros_observacao.add(numero)
+                print(f"inotify indisponível para '{diretorio}' ({os.strerror(numero)}); usando consulta "
+                      f"periódica nele e em outros diretórios com a mesma falha", file=sys.stderr)
+            self._sem_observacao.add(diretorio)
+            return
+        self._observacoes[observacao] = diretorio
+    
+    def _ler_eventos(self) -> Tuple[set, set, bool]:
+        """Lê os eventos pendentes: arquivos alterados, diretórios a varrer e se houve estouro da fila."""
+        arquivos = set()
+        diretorios = set()
+        estouro = False
+        evento = self.EVENTO_INOTIFY
+        while True:
+            try:
+                dados = os.read(self._inotify, 65536)
+            except BlockingIOError:
+                break
+            posicao = 0
+            while posicao < len(dados):
+                observacao, mascara, _, tamanho = evento.unpack_from(dados, posicao)
+                nome = dados[posicao + evento.size:posicao + evento.size + tamanho].rstrip(b'\0')
+                posicao += evento.size + tamanho
+                if mascara & self.IN_Q_OVERFLOW:
+                    estouro = True
+                    continue
+                diretorio = self._observacoes.get(observacao)
+                if diretorio is None:
+                    continue
+                if mascara & self.IN_IGNORED:
+                    del self._observacoes[observacao]
+                    continue
+                if mascara & self.IN_DELETE_SELF:
+                    diretorios.add(diretorio)
+                    continue
+                caminho = os.path.join(diretorio, os.fsdecode(nome))
+                if mascara & self.IN_ISDIR:
+                    # Diretório criado, movido ou removido: a varredura do pai resolve
+                    diretorios.add(diretorio)
+                elif caminho.endswith(self.extensao):
+                    arquivos.add(caminho)
+        return arquivos, diretorios, estouro
+    
+    def _processar_eventos(self) -> bool:
+        arquivos, diretorios, estouro = self._ler_eventos()
+        if estouro:
+            # Eventos perdidos: confere todos os diretórios e arquivos
+            arquivos = set(self.indice)
+            diretorios = set(self.diretorios)
+        alterado = False
+        for diretorio in sorted(diretorios):
+            if os.path.isdir(diretorio):
+                alterado = self._varrer_diretorio(diretorio, informar=True) or alterado
+            else:
+                alterado = self._remover_diretorio(diretorio) or alterado
+        for caminho in sorted(arquivos):
+            alterado = self.verificar(caminho) or alterado
+        return alterado
+    
+    def executar(self, usar_inotify: bool = True) -> None:
+        """Faz a análise inicial e observa o diretório até ser interrompido (Ctrl+C)."""
+        import select
+        if usar_inotify:
+            self._iniciar_inotify()
+        self.iniciar()
+        
+        try:
+            while True:
+                if self._inotify is not None:
+                    # Sem diretórios fora do inotify, espera sem prazo
+                    espera = self.intervalo if self._sem_observacao else None
+                    prontos, _, _ = select.select([self._inotify], [], [], espera)
+                    alterado = False
+                    if prontos:
+                        time.sleep(self.SEGUNDOS_AGRUPAMENTO)
+                        alterado = self._processar_eventos()
+                    if self._sem_observacao:
+                        alterado = self.consultar(self._sem_observacao) or alterado
+                else:
+                    time.sleep(self.intervalo)
+                    alterado = self.consultar()
+                if alterado:
+                    self._informar_resumo()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self._inotify is not None:
+                os.close(self._inotify)
+                self._inotify = None
+
+
+def executar_monitor(argumentos: List[str]) -> int:
+    """Modo de observação: analisa os arquivos .als de um diretório e, depois, apenas os que mudam."""
+    parser = argparse.ArgumentParser(
+        prog="analisador.py --watch",
+        description="Observa um diretório e analisa de novo os arquivos .als que mudam.")
+    parser.add_argument('diretorio', help="diretório observado (recursivamente)")
+    parser.add_argument('--intervalo', type=float, default=1.0, metavar='SEGUNDOS',
+                        help="intervalo da consulta periódica, quando não há inotify (padrão: 1)")
+    parser.add_argument('--consulta', action='store_true',
+                        help="usa a consulta periódica mesmo com inotify disponível")
+    parser.add_argument('--motor', choices=AnalisadorLexico.MOTORES, default='sequencial',
+                        help="motor de casamento de padrões (padrão: sequencial)")
+    parser.add_argument('--sugestoes', type=int, default=0, metavar='DISTANCIA',
+                        help="aponta identificadores a até DISTANCIA edições de uma palavra reservada (padrão: 0, desligado)")
+    args = parser.parse_args(argumentos)
+    
+    if not os.path.isdir(args.diretorio):
+        print(f"Erro: '{args.diretorio}' não é um diretório.", file=sys.stderr)
+        return 1
+    monitor = MonitorDiretorio(args.diretorio, AnalisadorLexico(args.motor, args.sugestoes), intervalo=args.intervalo)
+    monitor.executar(usar_inotify=not args.consulta)
+    return 0
+
+
 def main():
 
-    if len(sys.argv) > 1 and sys.argv[1] == '--console':
+    if len(sys.argv) > 1 and sys.argv[1] == '--lote':
+        # Modo em lote: muitos arquivos em paralelo, com saída JSON Lines
+        sys.exit(executar_lote(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == '--watch':
+        # Modo de observação: analisa de novo apenas os arquivos que mudam
+        sys.exit(executar_monitor(sys.argv[2:]))
+    
+    # --profile: no modo console, escreve o perfil da análise após as estatísticas
+    argumentos = [argumento for argumento in sys.argv[1:] if argumento != '--profile']
+    perfilar = len(argumentos) < len(sys.argv) - 1
+    
+    # --simbolos: no modo console, escreve o índice de símbolos após as estatísticas
+    simbolos = '--simbolos' in argumentos
+    argumentos = [argumento for argumento in argumentos if argumento != '--simbolos']
+    
+    # --formato tabela|jsonl|csv|binario: formato dos tokens no modo console com arquivo
+    formato = 'tabela'
+    if '--formato' in argumentos:
+        posicao = argumentos.index('--formato')
+        formato = argumentos[posicao + 1] if posicao + 1 < len(argumentos) else ''
+        if formato not in AnalisadorLexico.FORMATOS_SAIDA:
+            sys.exit(f"--formato deve ser um de: {', '.join(AnalisadorLexico.FORMATOS_SAIDA)}")
+        del argumentos[posicao:posicao + 2]
+    
+    # --paralelo N: no modo console com arquivo, divide a varredura entre N processos
+    processos = None
+    if '--paralelo' in argumentos:
+        posicao = argumentos.index('--paralelo')
+        valor = argumentos[posicao + 1] if posicao + 1 < len(argumentos) else ''
+        if not valor.isdigit() or int(valor) < 1:
+            sys.exit("--paralelo deve ser seguido do número de processos")
+        processos = int(valor)
+        del argumentos[posicao:posicao + 2]
+    
+    # --sugestoes N: aponta identificadores a até N edições de uma palavra reservada
+    distancia_sugestoes = 0
+    if '--sugestoes' in argumentos:
+        posicao = argumentos.index('--sugestoes')
+        valor = argumentos[posicao + 1] if posicao + 1 < len(argumentos) else ''
+        if not valor.isdigit():
+            sys.exit("--sugestoes deve ser seguido da distância de edição máxima")
+        distancia_sugestoes = int(valor)
+        del argumentos[posicao:posicao + 2]
+    
+    if argumentos and argumentos[0] == '--lsp':
+        # Servidor de linguagem (LSP) pela entrada e saída padrão
+        sys.exit(ServidorLSP(AnalisadorLexico(distancia_sugestoes=distancia_sugestoes)).executar())
+    elif len(argumentos) > 1 and argumentos[0] == '--console':
+        # Modo console sobre um arquivo ou sobre a entrada padrão ('-')
+        analisador = AnalisadorLexico(distancia_sugestoes=distancia_sugestoes)
+        if perfilar:
+            analisador.ativar_perfil()
+        inicio = time.perf_counter()
+        codigo_saida = analisar_console_streaming(analisador, argumentos[1], formato, processos, simbolos)
+        if perfilar and codigo_saida == 0:
+            destino = sys.stdout if formato == 'tabela' else sys.stderr
+            print(f"\nTempo total: {time.perf_counter() - inicio:.4f} s", file=destino)
+            print(analisador.perfil.relatorio(), file=destino)
+        sys.exit(codigo_saida)
+    elif argumentos and argumentos[0] == '--console':
         # Modo console
-        analisador = AnalisadorLexico()
+        analisador = AnalisadorLexico(distancia_sugestoes=distancia_sugestoes)
+        if perfilar:
+            analisador.ativar_perfil()
         
         # Exemplo do enunciado
         exemplo = """als
@@ -1199,7 +4845,8 @@ wrt "Análise concluída"
         print(exemplo)
         print("\nTOKENS:")
         
-        tokens = analisador.analisar(exemplo)
+        indice = IndiceSimbolos() if simbolos else None
+        tokens = analisador.analisar(exemplo, indice)
         print(analisador.imprimir_tokens(tokens))
         
         
@@ -1207,6 +4854,12 @@ wrt "Análise concluída"
         print(f"\nESTATÍSTICAS:")
         print(f"Total de tokens: {stats['total_tokens']}")
         print(f"Erros: {stats['total_erros']}")
+        if indice is not None:
+            print()
+            print(indice.relatorio())
+        if perfilar:
+            print()
+            print(analisador.perfil.relatorio())
     else:
         app = InterfaceGrafica()
         app.executar()
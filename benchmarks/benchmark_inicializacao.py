@@ -0,0 +1,119 @@
+"""
+Benchmark: custo fixo de inicialização do analisador.
+
+Quando cada arquivo é analisado por um processo separado (por exemplo, um
+corretor que chama o analisador uma vez por entrega), o tempo é dominado pela
+inicialização do interpretador, pela importação do módulo e pela criação do
+AnalisadorLexico, e não pela análise em si. Cada cenário roda em um subprocesso
+novo, várias vezes, e o tempo de parede é medido de fora:
+
+    interpretador       python -c pass (referência)
+    importacao          import analisador
+    instancia           import analisador; AnalisadorLexico()
+    console_script      python analisador.py --console <exemplo>
+    console_modulo      python -m analisador --console <exemplo>
+
+'console_script' compila analisador.py a cada execução (o Python não guarda o
+bytecode do script principal); 'console_modulo' usa o bytecode em __pycache__,
+quando a gravação dele é permitida (sem PYTHONDONTWRITEBYTECODE).
+
+Também são informados, no próprio processo, o tempo de criar um AnalisadorLexico
+depois do primeiro e se a importação carregou o tkinter.
+
+Uso:
+    python benchmarks/benchmark_inicializacao.py
+    python benchmarks/benchmark_inicializacao.py --repeticoes 50 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXEMPLO = os.path.join(RAIZ, 'exemplos', 'exemplo_basico.als')
+
+CENARIOS = {
+    'interpretador': ['-c', 'pass'],
+    'importacao': ['-c', 'import analisador'],
+    'instancia': ['-c', 'import analisador; analisador.AnalisadorLexico()'],
+    'console_script': [os.path.join(RAIZ, 'analisador.py'), '--console', EXEMPLO],
+    'console_modulo': ['-m', 'analisador', '--console', EXEMPLO],
+}
+
+# Executado em um subprocesso: custo de instâncias adicionais e módulos carregados
+CODIGO_PROCESSO = """
+import json, sys, time
+inicio = time.perf_counter()
+import analisador
+importacao = time.perf_counter() - inicio
+inicio = time.perf_counter()
+analisador.AnalisadorLexico()
+primeira = time.perf_counter() - inicio
+inicio = time.perf_counter()
+for _ in range({instancias}):
+    analisador.AnalisadorLexico()
+seguintes = (time.perf_counter() - inicio) / {instancias}
+print(json.dumps({{
+    'importacao_s': importacao,
+    'primeira_instancia_s': primeira,
+    'instancia_seguinte_s': seguintes,
+    'tkinter_carregado': 'tkinter' in sys.modules,
+    'multiprocessing_carregado': 'multiprocessing' in sys.modules,
+}}))
+"""
+
+
+def medir_cenario(argumentos: list, repeticoes: int) -> dict:
+    amostras = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable] + argumentos, cwd=RAIZ, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        amostras.append(time.perf_counter() - inicio)
+    return {
+        'min_s': min(amostras),
+        'mediana_s': statistics.median(amostras),
+        'max_s': max(amostras),
+    }
+
+
+def medir_processo(instancias: int) -> dict:
+    saida = subprocess.run([sys.executable, '-c', CODIGO_PROCESSO.format(instancias=instancias)],
+                           cwd=RAIZ, capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o custo fixo de inicialização do analisador.")
+    parser.add_argument('--repeticoes', type=int, default=20,
+                        help="execuções de cada cenário (padrão: 20)")
+    parser.add_argument('--cenarios', nargs='+', choices=list(CENARIOS), default=list(CENARIOS),
+                        help="cenários a medir (padrão: todos)")
+    parser.add_argument('--instancias', type=int, default=1000,
+                        help="instâncias criadas para medir o custo de cada uma (padrão: 1000)")
+    parser.add_argument('--json', action='store_true', help="imprime os resultados em JSON")
+    args = parser.parse_args()
+
+    resultados = {'cenarios': {}, 'processo': medir_processo(args.instancias)}
+    for nome in args.cenarios:
+        resultados['cenarios'][nome] = medicao = medir_cenario(CENARIOS[nome], args.repeticoes)
+        if not args.json:
+            print(f"{nome:<16} mediana {medicao['mediana_s'] * 1000:>8.1f} ms   "
+                  f"mín {medicao['min_s'] * 1000:>8.1f} ms", flush=True)
+
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+    else:
+        processo = resultados['processo']
+        print(f"\nimport analisador (no processo): {processo['importacao_s'] * 1000:.1f} ms")
+        print(f"primeiro AnalisadorLexico():     {processo['primeira_instancia_s'] * 1000:.3f} ms")
+        print(f"AnalisadorLexico() seguinte:     {processo['instancia_seguinte_s'] * 1000:.4f} ms")
+        print(f"tkinter carregado: {processo['tkinter_carregado']}   "
+              f"multiprocessing carregado: {processo['multiprocessing_carregado']}")
+
+
+if __name__ == '__main__':
+    main()
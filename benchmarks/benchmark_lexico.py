@@ -0,0 +1,257 @@
+"""
+Benchmark reproduzível do analisador léxico, por etapa.
+
+Gera corpora sintéticos com benchmarks/gerador_corpus.py (mesma semente, mesmo
+texto) e mede cada etapa separadamente, repetindo cada medição várias vezes:
+
+    analisar                 analisar(codigo), o caminho completo
+    tokenizacao              apenas os tokens léxicos, sem validação
+    validacao                todas as regras de validação, em uma passada
+    validacao_inicio         cada regra sozinha, sobre os mesmos tokens léxicos
+    validacao_tipos
+    validacao_condicionais
+    validacao_input
+    imprimir_tokens          tabela de texto dos tokens de analisar()
+    obter_estatisticas       estatísticas dos tokens de analisar()
+
+Para cada corpus e etapa são informados os tempos (mínimo, média, desvio,
+percentis 50, 90 e 99), tokens/s e MB/s calculados pela mediana. O resultado é
+um JSON; com --comparar, as medianas são comparadas às de um JSON anterior e o
+código de saída é 1 se alguma etapa ficou mais lenta que a tolerância.
+
+Uso:
+    python benchmarks/benchmark_lexico.py > base.json
+    python benchmarks/benchmark_lexico.py --tamanhos 100 1000 --perfis valido erros
+    python benchmarks/benchmark_lexico.py --comparar base.json --tolerancia 0.1
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from analisador import AnalisadorLexico, TokenType, ValidadorIncremental  # noqa: E402
+from gerador_corpus import PERFIS, gerar_perfil  # noqa: E402
+
+ETAPAS = ('analisar', 'tokenizacao', 'validacao', 'validacao_inicio', 'validacao_tipos',
+          'validacao_condicionais', 'validacao_input', 'imprimir_tokens', 'obter_estatisticas')
+
+
+def validar_regra(tokens_lexicos, regra: str) -> None:
+    """
+    Executa uma única regra de ValidadorIncremental sobre os tokens léxicos.
+
+    Repete a seleção feita em processar(): a tabela de símbolos é atualizada para
+    todos os tokens e a regra só recebe os tokens que podem mudar seu estado.
+    """
+    validador = ValidadorIncremental(acumular=True)
+    simbolos = validador.simbolos
+    tipo_anterior = None
+
+    if regra == 'inicio':
+        erros = validador.erros_inicio
+        for token in tokens_lexicos:
+            if validador.inicio_resolvido:
+                break
+            validador._processar_inicio(token, erros)
+        return
+
+    for token in tokens_lexicos:
+        tipo = token.tipo
+        if tipo == TokenType.IDENTIFICADOR and tipo_anterior == TokenType.TIPO_VAR:
+            simbolos.setdefault(token.lexema, None)
+        tipo_anterior = tipo
+
+        if regra == 'tipos':
+            if validador.janela_tipos or tipo in validador.TIPOS_INICIO_TIPOS:
+                validador._processar_tipos(token, validador.erros_tipo)
+        elif regra == 'condicionais':
+            if validador.dentro_de_colchetes or tipo == TokenType.ABRE_COLCHETES:
+                validador._processar_condicional(token, validador.erros_condicionais)
+        elif validador.estado_input is not None or tipo == TokenType.INPUT:
+            validador._processar_input(token, validador.erros_input)
+
+
+def validar(tokens_lexicos) -> None:
+    validador = ValidadorIncremental(acumular=True)
+    processar = validador.processar
+    for token in tokens_lexicos:
+        processar(token)
+    validador.finalizar()
+
+
+def percentil(amostras, fracao: float) -> float:
+    """Percentil com interpolação linear entre as amostras ordenadas."""
+    ordenadas = sorted(amostras)
+    posicao = (len(ordenadas) - 1) * fracao
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenadas) - 1)
+    return ordenadas[inferior] + (ordenadas[superior] - ordenadas[inferior]) * (posicao - inferior)
+
+
+def medir(funcao, repeticoes: int, aquecimento: int) -> list:
+    for _ in range(aquecimento):
+        funcao()
+    amostras = []
+    for _ in range(repeticoes):
+        # Coleta antes de cada amostra e desliga o coletor durante ela
+        gc.collect()
+        gc.disable()
+        try:
+            inicio = time.perf_counter()
+            funcao()
+            amostras.append(time.perf_counter() - inicio)
+        finally:
+            gc.enable()
+    return amostras
+
+
+def resumir(amostras: list, total_tokens: int, total_bytes: int) -> dict:
+    mediana = statistics.median(amostras)
+    return {
+        'amostras': len(amostras),
+        'min_s': min(amostras),
+        'media_s': statistics.fmean(amostras),
+        'desvio_s': statistics.stdev(amostras) if len(amostras) > 1 else 0.0,
+        'p50_s': mediana,
+        'p90_s': percentil(amostras, 0.90),
+        'p99_s': percentil(amostras, 0.99),
+        'tokens_por_s': total_tokens / mediana if mediana else None,
+        'mb_por_s': total_bytes / (1024 * 1024) / mediana if mediana else None,
+    }
+
+
+def medir_corpus(analisador: AnalisadorLexico, codigo: str, etapas, repeticoes: int, aquecimento: int) -> dict:
+    tokens = analisador.analisar(codigo)
+    tokens_lexicos = list(analisador._gerar_tokens_lexicos(codigo.split('\n')))
+    total_tokens = len(tokens)
+    total_bytes = len(codigo.encode('utf-8'))
+
+    funcoes = {
+        'analisar': lambda: analisador.analisar(codigo),
+        'tokenizacao': lambda: list(analisador._gerar_tokens_lexicos(codigo.split('\n'))),
+        'validacao': lambda: validar(tokens_lexicos),
+        'validacao_inicio': lambda: validar_regra(tokens_lexicos, 'inicio'),
+        'validacao_tipos': lambda: validar_regra(tokens_lexicos, 'tipos'),
+        'validacao_condicionais': lambda: validar_regra(tokens_lexicos, 'condicionais'),
+        'validacao_input': lambda: validar_regra(tokens_lexicos, 'input'),
+        'imprimir_tokens': lambda: analisador.imprimir_tokens(tokens),
+        'obter_estatisticas': lambda: analisador.obter_estatisticas(tokens),
+    }
+
+    resultado = {
+        'bytes': total_bytes,
+        'linhas': codigo.count('\n') + 1,
+        'tokens': total_tokens,
+        'erros': sum(1 for token in tokens if token.eh_erro),
+        'etapas': {},
+    }
+    for etapa in etapas:
+        amostras = medir(funcoes[etapa], repeticoes, aquecimento)
+        resultado['etapas'][etapa] = resumir(amostras, total_tokens, total_bytes)
+    return resultado
+
+
+def versao_codigo() -> str:
+    try:
+        saida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+                               capture_output=True, text=True, check=True)
+        return saida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual: dict, anterior: dict, tolerancia: float) -> list:
+    """Retorna as etapas cuja mediana piorou mais que a tolerância, como texto."""
+    anteriores = {(item['perfil'], item['tamanho_kb']): item for item in anterior['corpora']}
+    regressoes = []
+    for item in atual['corpora']:
+        base = anteriores.get((item['perfil'], item['tamanho_kb']))
+        if base is None:
+            continue
+        for etapa, medida in item['etapas'].items():
+            medida_base = base['etapas'].get(etapa)
+            if medida_base is None:
+                continue
+            razao = medida['p50_s'] / medida_base['p50_s']
+            medida['razao_anterior'] = razao
+            if razao > 1 + tolerancia:
+                regressoes.append(f"{item['perfil']} {item['tamanho_kb']:g} KB {etapa}: "
+                                  f"{medida_base['p50_s']:.4f} s -> {medida['p50_s']:.4f} s ({razao:.2f}x)")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede cada etapa do analisador em corpora sintéticos.")
+    parser.add_argument('--tamanhos', type=float, nargs='+', default=[100, 1000],
+                        help="tamanhos dos corpora, em KB (padrão: 100 1000)")
+    parser.add_argument('--perfis', nargs='+', choices=sorted(PERFIS), default=['valido', 'erros'],
+                        help="perfis de gerador_corpus (padrão: valido erros)")
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS, default=list(ETAPAS),
+                        help="etapas a medir (padrão: todas)")
+    parser.add_argument('--semente', type=int, default=0, help="semente do gerador (padrão: 0)")
+    parser.add_argument('--repeticoes', type=int, default=7, help="amostras por etapa (padrão: 7)")
+    parser.add_argument('--aquecimento', type=int, default=1,
+                        help="execuções descartadas antes das amostras (padrão: 1)")
+    parser.add_argument('--motor', choices=('sequencial', 'combinado'), default='sequencial')
+    parser.add_argument('--sugestoes', type=int, default=0,
+                        help="distancia_sugestoes do analisador (padrão: 0, desligado)")
+    parser.add_argument('-o', '--saida', help="grava o JSON neste arquivo (padrão: saída padrão)")
+    parser.add_argument('--comparar', metavar='JSON', help="JSON de uma execução anterior")
+    parser.add_argument('--tolerancia', type=float, default=0.10,
+                        help="piora relativa aceita na mediana com --comparar (padrão: 0.10)")
+    args = parser.parse_args()
+
+    analisador = AnalisadorLexico(motor=args.motor, distancia_sugestoes=args.sugestoes)
+    relatorio = {
+        'ambiente': {
+            'python': platform.python_version(),
+            'implementacao': platform.python_implementation(),
+            'plataforma': platform.platform(),
+            'commit': versao_codigo(),
+        },
+        'parametros': {
+            'semente': args.semente,
+            'repeticoes': args.repeticoes,
+            'aquecimento': args.aquecimento,
+            'motor': args.motor,
+            'sugestoes': args.sugestoes,
+        },
+        'corpora': [],
+    }
+
+    for perfil in args.perfis:
+        for tamanho in args.tamanhos:
+            codigo = gerar_perfil(perfil, int(tamanho * 1024), args.semente)
+            medicao = medir_corpus(analisador, codigo, args.etapas, args.repeticoes, args.aquecimento)
+            relatorio['corpora'].append(dict(perfil=perfil, tamanho_kb=tamanho, **medicao))
+            print(f"{perfil} {tamanho:g} KB: {medicao['tokens']} tokens medidos", file=sys.stderr, flush=True)
+
+    regressoes = []
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as arquivo:
+            regressoes = comparar(relatorio, json.load(arquivo), args.tolerancia)
+        relatorio['regressoes'] = regressoes
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    else:
+        print(texto)
+
+    for regressao in regressoes:
+        print(f"Regressão: {regressao}", file=sys.stderr)
+    return 1 if regressoes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
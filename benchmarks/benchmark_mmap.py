@@ -0,0 +1,108 @@
+"""
+Benchmark: leitura completa do arquivo x leitura mapeada em memória (mmap).
+
+Gera arquivos .als sintéticos dos tamanhos pedidos (repetindo o programa de
+exemplo completo) e mede, para cada modo, o tempo de parede e o pico de memória
+residente (RSS). Cada medição roda em um subprocesso separado, para que o pico de
+memória de um modo não contamine o do outro.
+
+Modos:
+    leitura         analisar_arquivo(caminho)                   (caminho atual)
+    mmap            analisar_arquivo(caminho, usar_mmap=True)
+    streaming       iterar_tokens_arquivo(caminho)
+    mmap_streaming  iterar_tokens_arquivo(caminho, usar_mmap=True)
+
+Os modos 'leitura' e 'mmap' devolvem a lista completa de tokens, cujo tamanho
+domina o pico de memória em arquivos grandes; os modos de streaming mostram o
+custo apenas da leitura.
+
+Uso:
+    python benchmarks/benchmark_mmap.py
+    python benchmarks/benchmark_mmap.py --tamanhos 10 100 1000 --modos mmap_streaming streaming
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXEMPLO = os.path.join(RAIZ, 'exemplos', 'programa_completo.als')
+
+MODOS = {
+    'leitura': "len(analisador.analisar_arquivo(caminho))",
+    'mmap': "len(analisador.analisar_arquivo(caminho, usar_mmap=True))",
+    'streaming': "sum(1 for _ in analisador.iterar_tokens_arquivo(caminho))",
+    'mmap_streaming': "sum(1 for _ in analisador.iterar_tokens_arquivo(caminho, usar_mmap=True))",
+}
+
+# Executado no subprocesso: mede o próprio tempo e o próprio pico de RSS
+CODIGO_MEDICAO = """
+import json, sys, time
+sys.path.insert(0, {raiz!r})
+from analisador import AnalisadorLexico
+analisador = AnalisadorLexico()
+caminho = {caminho!r}
+inicio = time.perf_counter()
+total_tokens = {expressao}
+segundos = time.perf_counter() - inicio
+try:
+    import resource
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é dado em KB no Linux e em bytes no macOS
+    pico_mb = pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+except ImportError:
+    pico_mb = None
+print(json.dumps({{'tokens': total_tokens, 'segundos': segundos, 'pico_rss_mb': pico_mb}}))
+"""
+
+
+def gerar_arquivo(caminho: str, tamanho_mb: float) -> None:
+    with open(EXEMPLO, 'r', encoding='utf-8') as arquivo:
+        bloco = arquivo.read() + '\n'
+    alvo = int(tamanho_mb * 1024 * 1024)
+    bloco_bytes = len(bloco.encode('utf-8'))
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        escrito = 0
+        while escrito < alvo:
+            arquivo.write(bloco)
+            escrito += bloco_bytes
+
+
+def medir(caminho: str, modo: str) -> dict:
+    codigo = CODIGO_MEDICAO.format(raiz=RAIZ, caminho=caminho, expressao=MODOS[modo])
+    saida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a leitura completa com a leitura via mmap.")
+    parser.add_argument('--tamanhos', type=float, nargs='+', default=[10, 100, 1000],
+                        help="tamanhos dos arquivos gerados, em MB (padrão: 10 100 1000)")
+    parser.add_argument('--modos', nargs='+', choices=sorted(MODOS), default=list(MODOS),
+                        help="modos a medir (padrão: todos)")
+    parser.add_argument('--json', action='store_true', help="imprime os resultados em JSON")
+    args = parser.parse_args()
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as diretorio:
+        for tamanho in args.tamanhos:
+            caminho = os.path.join(diretorio, f'corpus_{tamanho:g}mb.als')
+            gerar_arquivo(caminho, tamanho)
+            for modo in args.modos:
+                medicao = medir(caminho, modo)
+                medicao.update({'tamanho_mb': tamanho, 'modo': modo})
+                resultados.append(medicao)
+                if not args.json:
+                    pico = 'n/d' if medicao['pico_rss_mb'] is None else f"{medicao['pico_rss_mb']:.1f}"
+                    print(f"{tamanho:>8g} MB  {modo:<15} {medicao['segundos']:>9.2f} s  "
+                          f"{pico:>9} MB RSS  {medicao['tokens']} tokens", flush=True)
+            os.remove(caminho)
+
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""
+Gerador de programas ALAIAS sintéticos para os benchmarks.
+
+Os programas são gerados a partir de uma semente, então a mesma combinação de
+semente, tamanho, mistura e proporção de erros produz sempre o mesmo texto (em
+qualquer máquina e versão do Python 3). Cada programa começa com 'als' e é uma
+sequência de comandos sorteados segundo a mistura:
+
+    declaracao   intn idade
+    atribuicao   idade <= 25 / nome <= "texto" / total <= total + 1
+    condicional  cdt [ x gt 10 and y le 3 ] ... !cdt+ [ ... ] ... !cdt
+    repeticao    during [ ... ] / repeat x in 5 / cycle ... brkln
+    escrita      wrt "texto" / wrt variavel
+    entrada      input(variavel)
+    funcao       func nome ( a , b )
+    comentario   -- texto
+
+Com proporcao_erros > 0, essa fração dos comandos é substituída por um comando
+com erro léxico (símbolo inválido, identificador ou número mal formado, string
+não fechada, identificador ou número longo demais) ou de validação (tipo
+incompatível, operador relacional ausente, input sem parênteses, sem variável
+ou com variável não declarada).
+
+Uso:
+    python benchmarks/gerador_corpus.py 1000 -o corpus.als
+    python benchmarks/gerador_corpus.py 500 --perfil erros --semente 7
+    python benchmarks/gerador_corpus.py 200 --mistura condicional=4,entrada=2 --erros 0.1
+"""
+import argparse
+import random
+import sys
+
+MISTURA_PADRAO = {
+    'declaracao': 3,
+    'atribuicao': 5,
+    'condicional': 2,
+    'repeticao': 1,
+    'escrita': 3,
+    'entrada': 1,
+    'funcao': 0.5,
+    'comentario': 1,
+}
+
+# Perfis prontos: mistura de comandos e fração de comandos com erro
+PERFIS = {
+    'valido': (MISTURA_PADRAO, 0.0),
+    'misto': (MISTURA_PADRAO, 0.05),
+    'erros': (MISTURA_PADRAO, 0.3),
+    'condicionais': (dict(MISTURA_PADRAO, condicional=8, repeticao=4), 0.05),
+}
+
+TIPOS = ('intn', 'den', 'txt', 'bln', 'crt')
+RELACIONAIS = ('gt', 'eq', 'ne', 'lt', 'ge', 'le')
+PALAVRAS = ('valor', 'total', 'idade', 'nome', 'saldo', 'conta', 'item', 'media', 'limite', 'dado')
+TEXTOS = ('Resultado', 'Processando dados', 'Valor inválido', 'Fim do laço', 'Olá, mundo', 'Média: ')
+
+
+def ler_mistura(texto: str, base: dict = MISTURA_PADRAO) -> dict:
+    """Aplica pesos como 'condicional=4,entrada=2' sobre a mistura base."""
+    mistura = dict(base)
+    for item in texto.split(','):
+        if not item.strip():
+            continue
+        nome, _, peso = item.partition('=')
+        nome = nome.strip()
+        if nome not in MISTURA_PADRAO:
+            raise ValueError(f"comando desconhecido na mistura: {nome!r}")
+        mistura[nome] = float(peso)
+    return mistura
+
+
+class GeradorPrograma:
+    """Gera comandos ALAIAS aleatórios, mantendo as variáveis declaradas e seus tipos."""
+
+    def __init__(self, semente: int, mistura: dict, proporcao_erros: float):
+        self.aleatorio = random.Random(semente)
+        self.comandos = [nome for nome, peso in mistura.items() if peso > 0]
+        self.pesos = [mistura[nome] for nome in self.comandos]
+        if not self.comandos:
+            raise ValueError("a mistura precisa de ao menos um comando com peso positivo")
+        self.proporcao_erros = proporcao_erros
+        self.variaveis = {}     # nome -> tipo
+        self.declaradas = []    # nomes, na ordem de declaração
+        self.contador = 0
+
+    def gerar(self, tamanho_bytes: int) -> str:
+        partes = ['als\n', '\n']
+        escrito = 4
+        while escrito < tamanho_bytes:
+            if self.aleatorio.random() < self.proporcao_erros:
+                comando = self.comando_com_erro()
+            else:
+                nome = self.aleatorio.choices(self.comandos, self.pesos)[0]
+                comando = getattr(self, 'comando_' + nome)()
+            partes.append(comando)
+            escrito += len(comando.encode('utf-8'))
+        return ''.join(partes)
+
+    # Elementos
+
+    def nova_variavel(self) -> str:
+        self.contador += 1
+        return f"{self.aleatorio.choice(PALAVRAS)}_{self.contador}"
+
+    def declarar(self, nome: str, tipo: str) -> None:
+        self.variaveis[nome] = tipo
+        self.declaradas.append(nome)
+
+    def variavel(self, tipos=None) -> str:
+        if self.variaveis and self.aleatorio.random() < 0.9:
+            nome = self.aleatorio.choice(self.declaradas[-50:])
+            if tipos is None or self.variaveis[nome] in tipos:
+                return nome
+        # Sem variável adequada: usa um nome livre (um identificador válido)
+        return self.nova_variavel()
+
+    def valor(self, tipo: str) -> str:
+        aleatorio = self.aleatorio
+        if tipo == 'intn':
+            return str(aleatorio.randint(0, 100000))
+        if tipo == 'den':
+            return f"{aleatorio.randint(0, 9999)}.{aleatorio.randint(0, 99):02d}"
+        if tipo == 'txt':
+            return f'"{aleatorio.choice(TEXTOS)}"'
+        if tipo == 'bln':
+            return aleatorio.choice(('valid', 'invalid'))
+        return f'"{aleatorio.choice("abcxyz")}"'
+
+    def expressao_relacional(self) -> str:
+        partes = []
+        for indice in range(self.aleatorio.choice((1, 1, 2))):
+            if indice:
+                partes.append(self.aleatorio.choice(('and', 'or')))
+            partes.append(f"{self.variavel(('intn', 'den'))} {self.aleatorio.choice(RELACIONAIS)} "
+                          f"{self.aleatorio.randint(0, 500)}")
+        return ' '.join(partes)
+
+    def bloco(self, recuo: str) -> str:
+        linhas = []
+        for _ in range(self.aleatorio.randint(1, 3)):
+            if self.aleatorio.random() < 0.5:
+                linhas.append(recuo + self.comando_escrita())
+            else:
+                linhas.append(recuo + self.comando_atribuicao())
+        return ''.join(linhas)
+
+    # Comandos válidos
+
+    def comando_declaracao(self) -> str:
+        nome = self.nova_variavel()
+        tipo = self.aleatorio.choice(TIPOS)
+        self.declarar(nome, tipo)
+        if self.aleatorio.random() < 0.3:
+            return f"{tipo} {nome} <= {self.valor(tipo)}\n"
+        return f"{tipo} {nome}\n"
+
+    def comando_atribuicao(self) -> str:
+        if not self.variaveis:
+            return self.comando_declaracao()
+        nome = self.aleatorio.choice(self.declaradas[-50:])
+        tipo = self.variaveis[nome]
+        if tipo in ('intn', 'den') and self.aleatorio.random() < 0.4:
+            operador = self.aleatorio.choice('+-*/')
+            return f"{nome} <= {nome} {operador} {self.valor('intn')}\n"
+        return f"{nome} <= {self.valor(tipo)}\n"
+
+    def comando_condicional(self) -> str:
+        texto = f"cdt [ {self.expressao_relacional()} ]\n" + self.bloco('    ')
+        for _ in range(self.aleatorio.randint(0, 2)):
+            texto += f"!cdt+ [ {self.expressao_relacional()} ]\n" + self.bloco('    ')
+        if self.aleatorio.random() < 0.6:
+            texto += "!cdt\n" + self.bloco('    ')
+        return texto
+
+    def comando_repeticao(self) -> str:
+        forma = self.aleatorio.randrange(3)
+        if forma == 0:
+            cabecalho = f"during [ {self.expressao_relacional()} ]\n"
+        elif forma == 1:
+            cabecalho = f"repeat {self.variavel(('intn',))} in {self.aleatorio.randint(1, 20)}\n"
+        else:
+            cabecalho = f"cycle {self.variavel(('intn',))}\n"
+        return cabecalho + self.bloco('    ') + "    brkln\n"
+
+    def comando_escrita(self) -> str:
+        if self.variaveis and self.aleatorio.random() < 0.5:
+            return f"wrt {self.variavel()}\n"
+        return f'wrt "{self.aleatorio.choice(TEXTOS)}"\n'
+
+    def comando_entrada(self) -> str:
+        if not self.variaveis:
+            return self.comando_declaracao()
+        return f"input({self.aleatorio.choice(self.declaradas[-50:])})\n"
+
+    def comando_funcao(self) -> str:
+        parametros = ' , '.join(self.nova_variavel() for _ in range(self.aleatorio.randint(0, 3)))
+        return f"func {self.nova_variavel()} ( {parametros} )\n"
+
+    def comando_comentario(self) -> str:
+        return f"-- {self.aleatorio.choice(TEXTOS)} {self.aleatorio.randint(0, 999)}\n"
+
+    # Comandos com erro
+
+    def comando_com_erro(self) -> str:
+        aleatorio = self.aleatorio
+        erro = aleatorio.randrange(11)
+        if erro == 0:
+            return f"{self.variavel()} <= {aleatorio.randint(0, 99)} {aleatorio.choice('@$%#&')}\n"
+        if erro == 1:
+            return f"intn {aleatorio.randint(1, 999)}{self.nova_variavel()}\n"
+        if erro == 2:
+            return f"txt {self.nova_variavel()}{aleatorio.choice('@$%')}\n"
+        if erro == 3:
+            return f"den {self.nova_variavel()} <= {aleatorio.randint(0, 99)}.a{aleatorio.randint(0, 9)}\n"
+        if erro == 4:
+            return f'wrt "{aleatorio.choice(TEXTOS)}\n'
+        if erro == 5:
+            return f"intn {'variavel_com_nome_longo_demais_' * 2}{self.contador}\n"
+        if erro == 6:
+            return f"intn {self.nova_variavel()} <= {'9' * aleatorio.randint(16, 30)}\n"
+        if erro == 7:
+            # Tipo incompatível: valor decimal, texto ou número em variável de outro tipo
+            nome = self.nova_variavel()
+            tipo, valor = aleatorio.choice((('intn', '3.14'), ('bln', '1'), ('txt', '42')))
+            self.declarar(nome, tipo)
+            return f"{tipo} {nome} <= {valor}\n"
+        if erro == 8:
+            return f"cdt [ {self.variavel()} ]\n" + self.bloco('    ')
+        if erro == 9:
+            return aleatorio.choice(("input()\n", f"input {self.variavel()}\n"))
+        return f"input({self.nova_variavel()})\n"
+
+
+def gerar_programa(tamanho_bytes: int, semente: int = 0, mistura: dict = None,
+                   proporcao_erros: float = 0.0) -> str:
+    """Gera um programa ALAIAS com aproximadamente tamanho_bytes bytes (em UTF-8)."""
+    gerador = GeradorPrograma(semente, MISTURA_PADRAO if mistura is None else mistura, proporcao_erros)
+    return gerador.gerar(tamanho_bytes)
+
+
+def gerar_perfil(perfil: str, tamanho_bytes: int, semente: int = 0) -> str:
+    """Gera um programa com a mistura e a proporção de erros de um dos PERFIS."""
+    mistura, proporcao_erros = PERFIS[perfil]
+    return gerar_programa(tamanho_bytes, semente, mistura, proporcao_erros)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera programas ALAIAS sintéticos e reproduzíveis.")
+    parser.add_argument('tamanho', type=float, help="tamanho aproximado do programa, em KB")
+    parser.add_argument('--semente', type=int, default=0, help="semente do gerador (padrão: 0)")
+    parser.add_argument('--perfil', choices=sorted(PERFIS), default='valido',
+                        help="mistura de comandos e proporção de erros (padrão: valido)")
+    parser.add_argument('--mistura', help="pesos dos comandos, ex.: condicional=4,entrada=2 "
+                                          "(sobre a mistura do perfil)")
+    parser.add_argument('--erros', type=float, help="fração dos comandos com erro (sobre a do perfil)")
+    parser.add_argument('-o', '--saida', help="arquivo de saída (padrão: saída padrão)")
+    args = parser.parse_args()
+
+    mistura, proporcao_erros = PERFIS[args.perfil]
+    if args.mistura:
+        mistura = ler_mistura(args.mistura, mistura)
+    if args.erros is not None:
+        proporcao_erros = args.erros
+
+    programa = gerar_programa(int(args.tamanho * 1024), args.semente, mistura, proporcao_erros)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8', newline='\n') as arquivo:
+            arquivo.write(programa)
+    else:
+        sys.stdout.write(programa)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Testes do formato binário de tokens (EscritorArquivoTokens e ArquivoTokens).
+
+Execução:
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from analisador import AnalisadorLexico, ArquivoTokens, EscritorArquivoTokens  # noqa: E402
+
+# Erros léxicos e de validação, textos repetidos e caracteres fora do ASCII
+CODIGO = 'als\ntxt nome\nnome <= "João 😀"\nintn x $\nx <= 2.5\ninput(y)\nwrt nome\n'
+
+
+@pytest.fixture
+def tokens():
+    return AnalisadorLexico().analisar(CODIGO)
+
+
+@pytest.fixture
+def caminho(tmp_path, tokens):
+    caminho = str(tmp_path / 'programa.alstok')
+    assert ArquivoTokens.gravar(caminho, tokens) == len(tokens)
+    return caminho
+
+
+def test_ida_e_volta(caminho, tokens):
+    with ArquivoTokens(caminho) as arquivo:
+        assert len(arquivo) == len(tokens)
+        assert list(arquivo) == tokens
+        assert arquivo[-1] == tokens[-1]
+        assert arquivo[2:5] == tokens[2:5]
+        assert [arquivo.tipo(i) for i in range(len(arquivo))] == [token.tipo for token in tokens]
+        assert [(arquivo.linha(i), arquivo.coluna(i), arquivo.lexema(i)) for i in range(len(arquivo))] == \
+            [(token.linha, token.coluna, token.lexema) for token in tokens]
+        assert AnalisadorLexico().obter_estatisticas(arquivo) == AnalisadorLexico().obter_estatisticas(tokens)
+        with pytest.raises(IndexError):
+            arquivo[len(tokens)]
+
+
+def test_escrever_tokens_binario_igual_a_gravar(tmp_path, caminho, tokens):
+    # O formato 'binario' do modo console grava o mesmo arquivo, em uma passada
+    destino = tmp_path / 'saida.alstok'
+    with open(destino, 'wb') as saida:
+        AnalisadorLexico().escrever_tokens(iter(tokens), saida, 'binario')
+    with open(caminho, 'rb') as arquivo:
+        assert destino.read_bytes() == arquivo.read()
+
+
+def test_sem_tokens(tmp_path):
+    caminho = str(tmp_path / 'vazio.alstok')
+    assert ArquivoTokens.gravar(caminho, []) == 0
+    with ArquivoTokens(caminho) as arquivo:
+        assert len(arquivo) == 0 and list(arquivo) == []
+
+
+def test_arquivo_truncado(tmp_path, caminho):
+    with open(caminho, 'rb') as arquivo:
+        dados = arquivo.read()
+    truncado = tmp_path / 'truncado.alstok'
+    for tamanho in (0, 5, EscritorArquivoTokens.CABECALHO.size, len(dados) // 2, len(dados) - 1):
+        truncado.write_bytes(dados[:tamanho])
+        with pytest.raises(ValueError):
+            ArquivoTokens(str(truncado))
+
+
+@pytest.mark.parametrize('cabecalho, mensagem', [
+    (EscritorArquivoTokens.CABECALHO.pack(b'OUTRACOI', EscritorArquivoTokens.VERSAO,
+                                          EscritorArquivoTokens.REGISTRO.size), 'Não é um arquivo'),
+    (EscritorArquivoTokens.CABECALHO.pack(EscritorArquivoTokens.MAGICO, EscritorArquivoTokens.VERSAO + 1,
+                                          EscritorArquivoTokens.REGISTRO.size), 'incompatível'),
+    (EscritorArquivoTokens.CABECALHO.pack(EscritorArquivoTokens.MAGICO, EscritorArquivoTokens.VERSAO,
+                                          EscritorArquivoTokens.REGISTRO.size + 4), 'incompatível'),
+], ids=['magico', 'versao', 'tamanho_registro'])
+def test_cabecalho_invalido(tmp_path, caminho, cabecalho, mensagem):
+    with open(caminho, 'rb') as arquivo:
+        dados = arquivo.read()
+    alterado = tmp_path / 'alterado.alstok'
+    alterado.write_bytes(cabecalho + dados[len(cabecalho):])
+    with pytest.raises(ValueError, match=mensagem):
+        ArquivoTokens(str(alterado))
+
+
+@pytest.mark.parametrize('campo', [0, 2, 3, 4, 5],
+                         ids=['total_tokens', 'total_textos', 'posicao_tipos', 'tamanho_tipos', 'posicao_textos'])
+def test_rodape_corrompido(tmp_path, caminho, campo):
+    # Um campo do rodapé apontando para fora do arquivo
+    with open(caminho, 'rb') as arquivo:
+        dados = arquivo.read()
+    rodape = EscritorArquivoTokens.RODAPE
+    valores = list(rodape.unpack_from(dados, len(dados) - rodape.size))
+    valores[campo] += len(dados)
+    corrompido = tmp_path / 'corrompido.alstok'
+    corrompido.write_bytes(dados[:-rodape.size] + rodape.pack(*valores))
+    with pytest.raises(ValueError, match='truncado ou corrompido'):
+        ArquivoTokens(str(corrompido))
@@ -0,0 +1,31 @@
+"""
+Testes do cache em disco dos resultados (CacheResultados).
+
+Execução:
+    python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisador import AnalisadorLexico, CacheResultados  # noqa: E402
+
+
+def tamanho_diretorio(diretorio):
+    return sum(os.path.getsize(os.path.join(raiz, nome))
+               for raiz, _, nomes in os.walk(diretorio) for nome in nomes)
+
+
+def test_limite_compartilhado_entre_processos(tmp_path):
+    # Cada instância faz o papel de um processo de --lote -p 4 no mesmo diretório
+    limite = 64 * 1024
+    caches = [CacheResultados(str(tmp_path), limite) for _ in range(4)]
+    analisador = AnalisadorLexico()
+    
+    for indice in range(400):
+        codigo = f'als\nintn x{indice} <= {indice}\nwrt x{indice}\n' * 20
+        cache = caches[indice % len(caches)]
+        cache.guardar(cache.chave(analisador, codigo.encode()), analisador.analisar(codigo))
+        tamanho = tamanho_diretorio(str(tmp_path))
+        assert tamanho <= limite * (1 + len(caches) * CacheResultados.FRACAO_REMEDICAO) + 4096
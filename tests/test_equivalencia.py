@@ -0,0 +1,97 @@
+"""
+Testes de equivalência: todo motor de varredura e toda forma de análise (texto,
+streaming, mmap, compacta, paralela, com cache, com limites e incremental)
+produzem os mesmos tokens de AnalisadorLexico('sequencial').analisar().
+
+Execução:
+    python -m pytest tests
+"""
+import glob
+import io
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from analisador import (AnalisadorIncremental, AnalisadorLexico, CacheResultados,  # noqa: E402
+                        LimitesAnalise)
+
+EXEMPLOS = sorted(glob.glob(os.path.join(RAIZ, 'exemplos', '*.als')))
+
+# Forma de análise: função(analisador, caminho, código, diretório temporário) -> tokens
+FORMAS = {
+    'analisar': lambda analisador, caminho, codigo, tmp: analisador.analisar(codigo),
+    'analisar_com_limites': lambda analisador, caminho, codigo, tmp: analisador.analisar(
+        codigo, limites=LimitesAnalise(max_erros=10 ** 6, max_caracteres=10 ** 7)),
+    'analisar_compacto': lambda analisador, caminho, codigo, tmp: analisador.analisar_compacto(codigo),
+    'analisar_paralelo': lambda analisador, caminho, codigo, tmp: analisador.analisar_paralelo(
+        codigo, processos=2, linhas_por_fatia=7),
+    'iterar_tokens': lambda analisador, caminho, codigo, tmp: analisador.iterar_tokens(io.StringIO(codigo)),
+    'iterar_tokens_arquivo': lambda analisador, caminho, codigo, tmp: analisador.iterar_tokens_arquivo(caminho),
+    'iterar_tokens_arquivo_mmap': lambda analisador, caminho, codigo, tmp: analisador.iterar_tokens_arquivo(
+        caminho, usar_mmap=True),
+    'analisar_arquivo': lambda analisador, caminho, codigo, tmp: analisador.analisar_arquivo(caminho),
+    'analisar_arquivo_mmap': lambda analisador, caminho, codigo, tmp: analisador.analisar_arquivo(
+        caminho, usar_mmap=True),
+    'analisar_arquivo_mmap_com_limites': lambda analisador, caminho, codigo, tmp: analisador.analisar_arquivo(
+        caminho, usar_mmap=True, limites=LimitesAnalise(max_erros=10 ** 6)),
+    # A segunda leitura vem do cache
+    'analisar_arquivo_cache': lambda analisador, caminho, codigo, tmp: [
+        analisador.analisar_arquivo(caminho, cache=CacheResultados(str(tmp)))
+        for _ in range(2)][-1],
+    'incremental': lambda analisador, caminho, codigo, tmp: AnalisadorIncremental(codigo, analisador).tokens(),
+}
+
+
+def chaves(tokens):
+    return [(token.tipo, token.lexema, token.linha, token.coluna, token.descricao, token.eh_erro)
+            for token in tokens]
+
+
+def ler(caminho):
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        return arquivo.read()
+
+
+@pytest.mark.parametrize('caminho', EXEMPLOS, ids=[os.path.basename(caminho) for caminho in EXEMPLOS])
+@pytest.mark.parametrize('forma', sorted(FORMAS))
+@pytest.mark.parametrize('motor', ['sequencial', 'combinado', 'perfilado'])
+def test_mesmos_tokens(motor, forma, caminho, tmp_path):
+    codigo = ler(caminho)
+    esperado = chaves(AnalisadorLexico('sequencial').analisar(codigo))
+
+    if motor == 'perfilado':
+        # O perfil troca o casamento de padrões pela versão instrumentada
+        analisador = AnalisadorLexico()
+        analisador.ativar_perfil()
+    else:
+        analisador = AnalisadorLexico(motor)
+    assert chaves(FORMAS[forma](analisador, caminho, codigo, tmp_path)) == esperado
+
+
+@pytest.mark.parametrize('motor', AnalisadorLexico.MOTORES)
+def test_erros_das_verificacoes_de_inicio(motor):
+    # Cada verificação de início de número e de palavra, feita durante a varredura
+    codigo = '\n'.join([
+        'als', 'intn 498saida', '2.a3', '1a 2_b', 'txt nome$%', 'wrt "sem fim',
+        'inp(x) in(y)', 'x' * 40, '9' * 40, '1.' + '9' * 40,
+    ])
+    erros = [(token.tipo.name, token.lexema, token.linha, token.coluna)
+             for token in AnalisadorLexico(motor).analisar(codigo) if token.eh_erro]
+    assert erros == [
+        ('ERRO_NUMERO_MALFORMADO', '498saida', 2, 6),
+        ('ERRO_NUMERO_MALFORMADO', '2.a3', 3, 1),
+        ('ERRO_NUMERO_MALFORMADO', '1a', 4, 1),
+        ('ERRO_IDENTIFICADOR_MALFORMADO', '2_b', 4, 4),
+        ('ERRO_SIMBOLO_INVALIDO', '$', 5, 9),
+        ('ERRO_SIMBOLO_INVALIDO', '%', 5, 10),
+        ('ERRO_STRING_NAO_FECHADA', '"sem fim', 6, 5),
+        ('ERRO_PALAVRA_RESERVADA_MALFORMADA', 'inp', 7, 1),
+        ('ERRO_PALAVRA_RESERVADA_MALFORMADA', 'in', 7, 8),
+        ('ERRO_IDENTIFICADOR_MUITO_LONGO', 'x' * 40, 8, 1),
+        ('ERRO_NUMERO_MUITO_LONGO', '9' * 40, 9, 1),
+        ('ERRO_NUMERO_MUITO_LONGO', '1.' + '9' * 40, 10, 1),
+    ]
@@ -0,0 +1,110 @@
+"""
+Testes do AnalisadorIncremental: depois de qualquer sequência de edições, o
+resultado é o mesmo de uma análise completa do texto.
+
+Execução:
+    python -m pytest tests
+"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisador import AnalisadorIncremental, AnalisadorLexico  # noqa: E402
+
+# Trechos que acionam todas as regras: declarações (inclusive redeclarações com
+# outro tipo), atribuições de tipo incompatível, colchetes abertos em uma linha e
+# fechados em outra, input de variáveis declaradas antes ou depois e erros léxicos
+TRECHOS = [
+    'als', 'intn x', 'den x', 'txt y', 'bln z', 'intn y', 'x <= 1', 'x <= 2.5', 'y <= "a"',
+    'z <= valid', 'y <= x', 'input(x)', 'input(w)', 'input w', 'input()', 'txt w',
+    'cdt [ x ge 1 ]', 'cdt [ x y ]', 'cdt [ x', 'ge 1 ]', ']', '[', '!cdt', 'wrt x',
+    'during [ x lt 3 ]', 'repeat x in 3', '-- comentário', '', '    ', '@ $', '12ab', '"aberta',
+    'inp(x)', 'intn', 'x', 'func f (intn p)', 'p <= 1',
+]
+
+
+def gerar_texto(aleatorio, linhas):
+    return '\n'.join(aleatorio.choice(TRECHOS) for _ in range(linhas))
+
+
+def conferir(incremental, analisador):
+    texto = incremental.texto
+    completo = analisador.analisar(texto)
+    assert incremental.erros() == [token for token in completo if token.eh_erro]
+    assert incremental.tokens() == completo
+
+    # Toda tabela de símbolos guardada é a tabela ao fim da sua linha
+    for indice, registro in enumerate(incremental.linhas):
+        if registro.simbolos is not None:
+            esperada = {}
+            for anterior in incremental.linhas[:indice + 1]:
+                AnalisadorIncremental._acumular_simbolos(anterior, esperada)
+            assert registro.simbolos == esperada
+
+
+@pytest.mark.parametrize('semente', range(40))
+def test_edicoes_aleatorias_equivalem_a_analise_completa(semente, monkeypatch):
+    # Tabelas guardadas a cada poucas linhas, para que as edições as atravessem
+    monkeypatch.setattr(AnalisadorIncremental, 'LINHAS_POR_TABELA', 3)
+    aleatorio = random.Random(semente)
+    analisador = AnalisadorLexico()
+    incremental = AnalisadorIncremental(gerar_texto(aleatorio, aleatorio.randint(1, 30)), analisador)
+    conferir(incremental, analisador)
+
+    for _ in range(25):
+        linhas = incremental.texto.split('\n')
+        operacao = aleatorio.random()
+        if operacao < 0.5:
+            linha_inicio = aleatorio.randint(1, len(linhas))
+            linha_fim = aleatorio.randint(linha_inicio, min(len(linhas), linha_inicio + 3))
+            coluna_inicio = aleatorio.randint(1, len(linhas[linha_inicio - 1]) + 1)
+            coluna_fim = aleatorio.randint(1, len(linhas[linha_fim - 1]) + 1)
+            if linha_inicio == linha_fim and coluna_fim < coluna_inicio:
+                coluna_inicio, coluna_fim = coluna_fim, coluna_inicio
+            texto = aleatorio.choice(['\n', '', ' x', gerar_texto(aleatorio, aleatorio.randint(1, 3))])
+            incremental.editar(linha_inicio, coluna_inicio, linha_fim, coluna_fim, texto)
+        elif operacao < 0.8:
+            linha_inicio = aleatorio.randint(1, len(linhas) + 1)
+            linha_fim = aleatorio.randint(linha_inicio - 1, min(len(linhas), linha_inicio + 2))
+            novas = gerar_texto(aleatorio, aleatorio.randint(1, 4)).split('\n')[:aleatorio.randint(0, 4)]
+            incremental.substituir_linhas(linha_inicio, linha_fim, novas)
+        else:
+            inicio = aleatorio.randint(0, len(linhas))
+            fim = aleatorio.randint(inicio, len(linhas))
+            novas = linhas[:inicio] + gerar_texto(aleatorio, aleatorio.randint(0, 5)).split('\n') + linhas[fim:]
+            incremental.sincronizar('\n'.join(novas))
+        conferir(incremental, analisador)
+
+
+def test_sincronizacao_cancelada_nao_altera_o_estado(monkeypatch):
+    monkeypatch.setattr(AnalisadorIncremental, 'LINHAS_POR_CANCELAMENTO', 10)
+    analisador = AnalisadorLexico()
+    codigo = gerar_texto(random.Random(1), 50)
+    incremental = AnalisadorIncremental(codigo, analisador)
+    antes = incremental.tokens()
+
+    assert incremental.sincronizar(gerar_texto(random.Random(2), 50), cancelar=lambda: True) is None
+    assert incremental.texto == codigo
+    assert incremental.tokens() == antes
+    assert incremental.sincronizar(codigo + '\nwrt x') is not None
+    conferir(incremental, analisador)
+
+
+def test_custo_da_edicao_nao_depende_da_posicao(monkeypatch):
+    # Uma edição no fim de um texto longo não percorre as linhas anteriores
+    linhas = ['als'] + [f'intn v{indice}' for indice in range(20000)]
+    incremental = AnalisadorIncremental('\n'.join(linhas))
+    incremental.erros()
+
+    visitadas = []
+    acumular = AnalisadorIncremental._acumular_simbolos
+    monkeypatch.setattr(AnalisadorIncremental, '_acumular_simbolos',
+                        staticmethod(lambda registro, simbolos: (visitadas.append(registro),
+                                                                 acumular(registro, simbolos))))
+    incremental.editar(19990, 1, 19990, 1, 'x')
+    incremental.erros()
+    assert len(visitadas) <= 3 * AnalisadorIncremental.LINHAS_POR_TABELA
@@ -0,0 +1,61 @@
+"""
+Testes das falhas de leitura na análise linha a linha e no modo console.
+
+Execução:
+    python -m pytest tests
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from analisador import AnalisadorLexico, TokenType  # noqa: E402
+
+# Um byte inválido em UTF-8 no meio do arquivo
+CONTEUDO_INVALIDO = b'als\n' + b'intn x\n' * 5000 + b'\xff\n' + b'wrt x\n'
+
+
+@pytest.mark.parametrize('usar_mmap', [False, True], ids=['texto', 'mmap'])
+def test_falha_de_leitura_vai_para_a_saida_de_erros(tmp_path, capsys, usar_mmap):
+    caminho = tmp_path / 'invalido.als'
+    caminho.write_bytes(CONTEUDO_INVALIDO)
+
+    tokens = list(AnalisadorLexico().iterar_tokens_arquivo(str(caminho), usar_mmap=usar_mmap))
+    saida = capsys.readouterr()
+    assert tokens and tokens[-1].tipo != TokenType.EOF
+    assert saida.out == ''
+    assert 'Erro ao ler arquivo' in saida.err
+
+
+def test_arquivo_inexistente(tmp_path, capsys):
+    assert list(AnalisadorLexico().iterar_tokens_arquivo(str(tmp_path / 'nao_existe.als'))) == []
+    assert 'não encontrado' in capsys.readouterr().err
+
+
+def test_outras_excecoes_sao_propagadas(tmp_path, monkeypatch):
+    caminho = tmp_path / 'programa.als'
+    caminho.write_text('als\nintn x\n', encoding='utf-8')
+
+    def falhar(self, linha, coluna):
+        raise RuntimeError('falha interna')
+
+    analisador = AnalisadorLexico()
+    monkeypatch.setattr(analisador, '_casar_padrao', falhar.__get__(analisador))
+    with pytest.raises(RuntimeError, match='falha interna'):
+        list(analisador.iterar_tokens_arquivo(str(caminho)))
+
+
+@pytest.mark.parametrize('formato', ['tabela', 'jsonl', 'csv'])
+def test_console_termina_com_erro_se_a_leitura_falhar(tmp_path, formato):
+    caminho = tmp_path / 'invalido.als'
+    caminho.write_bytes(CONTEUDO_INVALIDO)
+    processo = subprocess.run([sys.executable, os.path.join(RAIZ, 'analisador.py'), '--console', str(caminho),
+                               '--formato', formato], capture_output=True, text=True, encoding='utf-8')
+    assert processo.returncode == 1
+    assert 'Erro ao ler arquivo' in processo.stderr
+    assert 'Erro ao ler arquivo' not in processo.stdout
+    assert 'ESTATÍSTICAS' not in processo.stdout + processo.stderr
@@ -0,0 +1,60 @@
+"""
+Testes dos limites de custo da análise (LimitesAnalise).
+
+Execução:
+    python -m pytest tests
+"""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisador import AnalisadorLexico, LimitesAnalise  # noqa: E402
+
+# 2000 linhas com 200 símbolos inválidos cada: 400 mil erros sem limite
+LIXO = '\n'.join(['@ ' * 200] * 2000)
+
+
+@pytest.mark.parametrize('prefixo', ['', 'als\ninput(x)\n', 'als\ncdt [ and x\n'],
+                         ids=['sem_estado_pendente', 'input_nao_declarado', 'colchete_aberto'])
+def test_max_erros_limita_o_custo(prefixo):
+    # Um estado pendente no validador retém os tokens seguintes, mas não pode
+    # fazer a varredura seguir até o fim do arquivo
+    inicio = time.perf_counter()
+    tokens = AnalisadorLexico().analisar(prefixo + LIXO, limites=LimitesAnalise(max_erros=100))
+    duracao = time.perf_counter() - inicio
+
+    assert tokens.truncado and tokens.motivo == 'max_erros'
+    assert sum(token.eh_erro for token in tokens) == 100
+    assert tokens[-1].eh_erro
+    assert max(token.linha for token in tokens) < 10
+    assert duracao < 0.5
+
+
+def test_max_erros_e_prefixo_da_analise_completa():
+    codigo = 'als\nintn x <= 1\nx <= 2 $\nwrt "a\ncdt [ x ]\nintn y <= 3.5\n@ @ @\n'
+    analisador = AnalisadorLexico()
+    completo = analisador.analisar(codigo)
+    posicoes_erros = [indice for indice, token in enumerate(completo) if token.eh_erro]
+
+    for maximo in range(1, len(posicoes_erros) + 1):
+        tokens = analisador.analisar(codigo, limites=LimitesAnalise(max_erros=maximo))
+        assert list(tokens) == completo[:posicoes_erros[maximo - 1] + 1]
+
+
+def test_sem_limite_atingido_resultado_completo():
+    codigo = 'als\nintn x <= 1\nwrt x\n'
+    analisador = AnalisadorLexico()
+    tokens = analisador.analisar(codigo, limites=LimitesAnalise(max_erros=10, max_caracteres=1000))
+    assert not tokens.truncado
+    assert list(tokens) == analisador.analisar(codigo)
+
+
+@pytest.mark.parametrize('argumentos', [{'max_erros': 0}, {'max_erros': -3},
+                                        {'max_caracteres': -1}, {'tempo_maximo': -0.5}])
+def test_limites_invalidos(argumentos):
+    with pytest.raises(ValueError):
+        LimitesAnalise(**argumentos)
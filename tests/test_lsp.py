@@ -0,0 +1,179 @@
+"""
+Testes do servidor de linguagem (ServidorLSP), com entrada e saída em memória.
+
+Execução:
+    python -m pytest tests
+"""
+import io
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisador import ServidorLSP  # noqa: E402
+
+
+def quadro(corpo):
+    """Mensagem com o cabeçalho Content-Length; corpo é um dict ou bytes já codificados."""
+    if isinstance(corpo, dict):
+        corpo = json.dumps(corpo).encode('utf-8')
+    return b'Content-Length: %d\r\n\r\n' % len(corpo) + corpo
+
+
+def executar(*mensagens):
+    """Executa o servidor sobre as mensagens; retorna (código de saída, mensagens enviadas)."""
+    saida = io.BytesIO()
+    codigo = ServidorLSP(entrada=io.BytesIO(b''.join(mensagens)), saida=saida).executar()
+
+    enviadas = []
+    dados = io.BytesIO(saida.getvalue())
+    while True:
+        cabecalho = dados.readline()
+        if not cabecalho:
+            break
+        tamanho = int(cabecalho.split(b':')[1])
+        dados.readline()
+        enviadas.append(json.loads(dados.read(tamanho).decode('utf-8')))
+    return codigo, enviadas
+
+
+PEDIDO_SHUTDOWN = quadro({'jsonrpc': '2.0', 'id': 99, 'method': 'shutdown'})
+NOTIFICACAO_EXIT = quadro({'jsonrpc': '2.0', 'method': 'exit'})
+
+
+def test_ciclo_de_vida():
+    codigo, enviadas = executar(
+        quadro({'jsonrpc': '2.0', 'id': 1, 'method': 'initialize', 'params': {}}),
+        PEDIDO_SHUTDOWN, NOTIFICACAO_EXIT)
+    assert codigo == 0
+    assert enviadas[0]['id'] == 1
+    assert enviadas[0]['result']['capabilities']['positionEncoding'] == 'utf-16'
+    assert enviadas[1] == {'jsonrpc': '2.0', 'id': 99, 'result': None}
+
+
+def test_exit_sem_shutdown():
+    assert executar(NOTIFICACAO_EXIT)[0] == 1
+
+
+def test_metodo_desconhecido():
+    _, enviadas = executar(quadro({'jsonrpc': '2.0', 'id': 7, 'method': 'nao/existe'}))
+    assert enviadas == [{'jsonrpc': '2.0', 'id': 7, 'error': {
+        'code': ServidorLSP.ERRO_METODO_DESCONHECIDO, 'message': 'Método desconhecido: nao/existe'}}]
+
+
+@pytest.mark.parametrize('mensagem, erro', [
+    (b'Content-Length: abc\r\n\r\n', ServidorLSP.ERRO_JSON_INVALIDO),
+    (b'Content-Length: -1\r\n\r\n', ServidorLSP.ERRO_JSON_INVALIDO),
+    (quadro(b'{"jsonrpc": '), ServidorLSP.ERRO_JSON_INVALIDO),
+    (quadro(b'\xff\xfe{}'), ServidorLSP.ERRO_JSON_INVALIDO),
+    (quadro(b'[1, 2]'), ServidorLSP.ERRO_PEDIDO_INVALIDO),
+], ids=['tamanho_nao_numerico', 'tamanho_negativo', 'json_incompleto', 'utf8_invalido', 'nao_e_objeto'])
+def test_mensagem_malformada_nao_encerra_o_servidor(mensagem, erro):
+    # O servidor responde com o erro e continua atendendo as mensagens seguintes
+    codigo, enviadas = executar(mensagem, PEDIDO_SHUTDOWN, NOTIFICACAO_EXIT)
+    assert codigo == 0
+    assert enviadas[0]['id'] is None and enviadas[0]['error']['code'] == erro
+    assert enviadas[1] == {'jsonrpc': '2.0', 'id': 99, 'result': None}
+
+
+URI = 'file:///programa.als'
+# A linha 4 tem um caractere fora do BMP, que ocupa duas unidades UTF-16
+TEXTO = 'als\nintn x\nx <= 1\nwrt "😀" x $\nwrt x'
+
+
+def abrir(texto=TEXTO):
+    return quadro({'jsonrpc': '2.0', 'method': 'textDocument/didOpen',
+                   'params': {'textDocument': {'uri': URI, 'version': 1, 'text': texto}}})
+
+
+def pedido(identificador, metodo, **parametros):
+    return quadro({'jsonrpc': '2.0', 'id': identificador, 'method': metodo,
+                   'params': {'textDocument': {'uri': URI}, **parametros}})
+
+
+def intervalo(linha, inicio, fim):
+    return {'start': {'line': linha, 'character': inicio}, 'end': {'line': linha, 'character': fim}}
+
+
+def test_diagnosticos_em_unidades_utf16():
+    _, enviadas = executar(abrir())
+    parametros = enviadas[0]['params']
+    assert enviadas[0]['method'] == 'textDocument/publishDiagnostics'
+    assert parametros['uri'] == URI and parametros['version'] == 1
+    [diagnostico] = parametros['diagnostics']
+    assert diagnostico['code'] == 'erro_simbolo_invalido'
+    assert diagnostico['range'] == intervalo(3, 11, 12)
+
+
+def test_mudanca_incremental_com_posicoes_utf16():
+    mudanca = quadro({'jsonrpc': '2.0', 'method': 'textDocument/didChange', 'params': {
+        'textDocument': {'uri': URI, 'version': 2},
+        'contentChanges': [{'range': intervalo(3, 10, 12), 'text': ''},
+                           {'range': intervalo(4, 4, 5), 'text': 'y'}],
+    }})
+    _, enviadas = executar(abrir(), mudanca)
+    depois = enviadas[1]['params']
+    assert depois['version'] == 2
+    assert depois['diagnostics'] == []
+
+
+def test_mudanca_com_texto_completo():
+    mudanca = quadro({'jsonrpc': '2.0', 'method': 'textDocument/didChange', 'params': {
+        'textDocument': {'uri': URI, 'version': 2},
+        'contentChanges': [{'text': 'als\r\n@\r\nwrt "😀" @'}],
+    }})
+    _, enviadas = executar(abrir(), mudanca)
+    assert [d['range'] for d in enviadas[1]['params']['diagnostics']] == [intervalo(1, 0, 1), intervalo(2, 9, 10)]
+
+
+def test_tokens_semanticos():
+    _, enviadas = executar(abrir(), pedido(2, 'textDocument/semanticTokens/full'))
+    dados = enviadas[1]['result']['data']
+    legenda = ServidorLSP.TIPOS_SEMANTICOS
+
+    # Converte as posições relativas de volta em (linha, início, tamanho, classe)
+    tokens = []
+    linha = inicio = 0
+    for indice in range(0, len(dados), 5):
+        delta_linha, delta_inicio, tamanho, classe, modificadores = dados[indice:indice + 5]
+        inicio = delta_inicio if delta_linha else inicio + delta_inicio
+        linha += delta_linha
+        tokens.append((linha, inicio, tamanho, legenda[classe]))
+        assert modificadores == 0
+    assert tokens == [
+        (0, 0, 3, 'keyword'),
+        (1, 0, 4, 'type'), (1, 5, 1, 'variable'),
+        (2, 0, 1, 'variable'), (2, 2, 2, 'operator'), (2, 5, 1, 'number'),
+        (3, 0, 3, 'keyword'), (3, 4, 4, 'string'), (3, 9, 1, 'variable'),
+        (4, 0, 3, 'keyword'), (4, 4, 1, 'variable'),
+    ]
+
+
+def test_definicao_e_referencias():
+    _, enviadas = executar(
+        abrir(),
+        pedido(2, 'textDocument/definition', position={'line': 3, 'character': 10}),
+        pedido(3, 'textDocument/references', position={'line': 3, 'character': 9},
+               context={'includeDeclaration': True}),
+        pedido(4, 'textDocument/references', position={'line': 4, 'character': 4},
+               context={'includeDeclaration': False}),
+        pedido(5, 'textDocument/definition', position={'line': 3, 'character': 5}))
+    respostas = {mensagem['id']: mensagem['result'] for mensagem in enviadas if 'id' in mensagem}
+
+    assert respostas[2] == {'uri': URI, 'range': intervalo(1, 5, 6)}
+    usos = [intervalo(2, 0, 1), intervalo(3, 9, 10), intervalo(4, 4, 5)]
+    assert [local['range'] for local in respostas[3]] == [intervalo(1, 5, 6)] + usos
+    assert [local['range'] for local in respostas[4]] == usos
+    # Dentro do texto não há identificador
+    assert respostas[5] is None
+
+
+def test_documento_fechado_limpa_os_diagnosticos():
+    fechar = quadro({'jsonrpc': '2.0', 'method': 'textDocument/didClose', 'params': {'textDocument': {'uri': URI}}})
+    _, enviadas = executar(abrir(), fechar, pedido(2, 'textDocument/definition', position={'line': 0, 'character': 0}))
+    assert enviadas[1]['params'] == {'uri': URI, 'diagnostics': []}
+    # O documento não existe mais: o pedido é respondido com erro, sem encerrar o servidor
+    assert enviadas[2]['error']['code'] == ServidorLSP.ERRO_INTERNO
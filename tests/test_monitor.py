@@ -0,0 +1,190 @@
+"""
+Testes do modo de observação (MonitorDiretorio), pela consulta periódica e,
+onde houver, pelo inotify.
+
+Execução:
+    python -m pytest tests
+"""
+import hashlib
+import io
+import os
+import shutil
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analisador  # noqa: E402
+from analisador import AnalisadorLexico, MonitorDiretorio  # noqa: E402
+
+VALIDO = 'als\nintn x <= 1\n'           # 5 tokens
+COM_ERRO = 'als\nintn y <= @\n'         # 5 tokens, 1 erro
+
+
+class Relogio:
+    """
+    Datas de modificação sempre crescentes: a resolução do relógio do sistema de
+    arquivos pode dar a mesma data a duas escritas seguidas.
+    """
+
+    def __init__(self):
+        self.agora = time.time_ns()
+
+    def avancar(self, *caminhos):
+        for caminho in caminhos:
+            self.agora += 10 ** 9
+            os.utime(caminho, ns=(self.agora, self.agora))
+
+
+@pytest.fixture
+def relogio():
+    return Relogio()
+
+
+def escrever(caminho, texto, relogio):
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        arquivo.write(texto)
+    relogio.avancar(caminho, os.path.dirname(caminho))
+
+
+def resumo(monitor):
+    return (monitor.resumo['total_arquivos'], monitor.resumo['arquivos_com_erro'],
+            monitor.resumo['total_tokens'], monitor.resumo['total_erros'])
+
+
+def test_consulta_periodica(tmp_path, relogio):
+    raiz = str(tmp_path)
+    escrever(os.path.join(raiz, 'a.als'), VALIDO, relogio)
+    os.mkdir(os.path.join(raiz, 'sub'))
+    escrever(os.path.join(raiz, 'sub', 'b.als'), COM_ERRO, relogio)
+    escrever(os.path.join(raiz, 'ignorado.txt'), COM_ERRO, relogio)
+
+    saida = io.StringIO()
+    monitor = MonitorDiretorio(raiz, saida=saida)
+    monitor.iniciar()
+    assert resumo(monitor) == (2, 1, 10, 1)
+    assert monitor.analises == 2
+    assert 'sub/b.als:2:11' in saida.getvalue()
+
+    # Nada mudou
+    assert not monitor.consultar()
+    assert monitor.analises == 2
+
+    # Arquivo criado
+    escrever(os.path.join(raiz, 'c.als'), COM_ERRO, relogio)
+    assert monitor.consultar()
+    assert resumo(monitor) == (3, 2, 15, 2)
+
+    # Arquivo alterado
+    escrever(os.path.join(raiz, 'a.als'), COM_ERRO, relogio)
+    assert monitor.consultar()
+    assert resumo(monitor) == (3, 3, 15, 3)
+    assert monitor.analises == 4
+
+    # Só a data mudou: sem nova análise
+    relogio.avancar(os.path.join(raiz, 'a.als'))
+    assert not monitor.consultar()
+    assert monitor.analises == 4
+
+    # Arquivo removido
+    os.remove(os.path.join(raiz, 'c.als'))
+    relogio.avancar(raiz)
+    assert monitor.consultar()
+    assert resumo(monitor) == (2, 2, 10, 2)
+
+    # Arquivo que não é UTF-8: contado como não lido
+    with open(os.path.join(raiz, 'sub', 'b.als'), 'wb') as arquivo:
+        arquivo.write(b'als\n\xff\n')
+    relogio.avancar(os.path.join(raiz, 'sub', 'b.als'))
+    assert monitor.consultar()
+    assert resumo(monitor) == (2, 1, 5, 1) and monitor.resumo['arquivos_nao_lidos'] == 1
+
+    # Subdiretório removido
+    shutil.rmtree(os.path.join(raiz, 'sub'))
+    relogio.avancar(raiz)
+    assert monitor.consultar()
+    assert resumo(monitor) == (1, 1, 5, 1) and monitor.resumo['arquivos_nao_lidos'] == 0
+    assert monitor.resumo['tipos_tokens'] == AnalisadorLexico().obter_estatisticas(
+        AnalisadorLexico().analisar(COM_ERRO))['tipos_tokens']
+
+
+def test_hash_e_estatisticas_do_mesmo_conteudo(tmp_path, relogio, monkeypatch):
+    caminho = os.path.join(str(tmp_path), 'a.als')
+    escrever(caminho, VALIDO, relogio)
+    monitor = MonitorDiretorio(str(tmp_path), saida=io.StringIO())
+    monitor.iniciar()
+
+    # Uma escrita logo depois da leitura do arquivo pelo monitor
+    sha256 = hashlib.sha256
+
+    def sha256_e_escrita(dados):
+        resultado = sha256(dados)
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(VALIDO + 'wrt @\n')
+        return resultado
+
+    escrever(caminho, COM_ERRO, relogio)
+    monkeypatch.setattr(analisador.hashlib, 'sha256', sha256_e_escrita)
+    monitor.verificar(caminho)
+    monkeypatch.undo()
+
+    # O índice tem o hash e as estatísticas do conteúdo lido, não do escrito depois
+    _, _, digest, estatisticas = monitor.indice[caminho]
+    assert digest == hashlib.sha256(COM_ERRO.encode('utf-8')).digest()
+    assert estatisticas == AnalisadorLexico().obter_estatisticas(AnalisadorLexico().analisar(COM_ERRO))
+
+
+class LibcSemObservacao:
+    """Encaminha as chamadas à libc, mas falha ao observar os diretórios chamados 'sem'."""
+
+    def __init__(self, libc):
+        self.libc = libc
+
+    def inotify_add_watch(self, descritor, caminho, mascara):
+        if os.path.basename(caminho) == b'sem':
+            return -1
+        return self.libc.inotify_add_watch(descritor, caminho, mascara)
+
+
+def test_inotify_com_diretorio_sem_observacao(tmp_path, relogio, monkeypatch):
+    raiz = str(tmp_path)
+    os.mkdir(os.path.join(raiz, 'sem'))
+    escrever(os.path.join(raiz, 'a.als'), VALIDO, relogio)
+    escrever(os.path.join(raiz, 'sem', 'b.als'), VALIDO, relogio)
+
+    monitor = MonitorDiretorio(raiz, saida=io.StringIO())
+    if not monitor._iniciar_inotify():
+        pytest.skip("inotify indisponível")
+    try:
+        monitor._libc = LibcSemObservacao(monitor._libc)
+        monitor.iniciar()
+        assert monitor._sem_observacao == {os.path.join(raiz, 'sem')}
+        assert resumo(monitor) == (2, 0, 10, 0)
+
+        # Diretório observado: pelo evento do inotify
+        escrever(os.path.join(raiz, 'a.als'), COM_ERRO, relogio)
+        time.sleep(0.05)
+        assert monitor._processar_eventos()
+        assert resumo(monitor) == (2, 1, 10, 1)
+
+        # Diretório sem observação: pela consulta periódica restrita a ele
+        escrever(os.path.join(raiz, 'sem', 'b.als'), COM_ERRO, relogio)
+        assert not monitor._processar_eventos()
+        assert monitor.consultar(monitor._sem_observacao)
+        assert resumo(monitor) == (2, 2, 10, 2)
+
+        # Estouro da fila de eventos: todos os arquivos são conferidos
+        escrever(os.path.join(raiz, 'a.als'), VALIDO, relogio)
+        monkeypatch.setattr(monitor, '_ler_eventos', lambda: (set(), set(), True))
+        assert monitor._processar_eventos()
+        assert resumo(monitor) == (2, 1, 10, 1)
+
+        # Diretório sem observação removido
+        shutil.rmtree(os.path.join(raiz, 'sem'))
+        assert monitor.consultar(monitor._sem_observacao)
+        assert resumo(monitor) == (1, 0, 5, 0)
+        assert not monitor._sem_observacao
+    finally:
+        os.close(monitor._inotify)
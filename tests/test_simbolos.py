@@ -0,0 +1,77 @@
+"""
+Testes do índice de símbolos (IndiceSimbolos): declarações e usos de cada nome.
+
+Execução:
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from analisador import AnalisadorIncremental, AnalisadorLexico, IndiceSimbolos  # noqa: E402
+
+with open(os.path.join(RAIZ, 'exemplos', 'programa_completo.als'), encoding='utf-8') as arquivo:
+    PROGRAMA_COMPLETO = arquivo.read()
+
+# nome -> (categoria, tipo, declarações, usos), com posições (linha, coluna)
+ESPERADO = {
+    'idade': ('variavel', 'intn', [(6, 6)], [(13, 1), (17, 7)]),
+    'nome': ('variavel', 'txt', [(7, 5)], [(12, 1)]),
+    'adulto': ('variavel', 'bln', [(8, 5)], [(18, 5), (28, 5)]),
+    'salario': ('variavel', 'den', [(9, 5)], [(14, 1), (21, 11), (23, 13)]),
+    'contador': ('variavel', 'intn', [(32, 6)],
+                 [(33, 1), (35, 10), (37, 9), (38, 5), (38, 17), (42, 8), (44, 9)]),
+}
+
+
+def indices():
+    """O mesmo índice montado durante a análise, a partir dos tokens e pelo AnalisadorIncremental."""
+    durante = IndiceSimbolos()
+    tokens = AnalisadorLexico().analisar(PROGRAMA_COMPLETO, durante)
+    return {
+        'analisar': durante,
+        'de_tokens': IndiceSimbolos.de_tokens(tokens),
+        'incremental': AnalisadorIncremental(PROGRAMA_COMPLETO).indice_simbolos(),
+    }
+
+
+@pytest.mark.parametrize('origem', ['analisar', 'de_tokens', 'incremental'])
+def test_programa_completo(origem):
+    indice = indices()[origem]
+    assert sorted(simbolo.nome for simbolo in indice) == sorted(ESPERADO)
+    for nome, (categoria, tipo, declaracoes, usos) in ESPERADO.items():
+        simbolo = indice[nome]
+        assert (simbolo.categoria, simbolo.tipo) == (categoria, tipo)
+        assert simbolo.declaracao == declaracoes[0]
+        assert simbolo.declaracoes == declaracoes
+        assert indice.referencias(nome) == usos
+        assert indice.referencias(nome, incluir_declaracoes=True) == sorted(declaracoes + usos)
+    assert indice.usos_nao_declarados() == []
+    assert indice.declaracoes_nao_usadas() == []
+    assert indice.referencias('inexistente') == []
+    assert 'inexistente' not in indice and indice.obter('inexistente') is None
+
+
+def test_funcoes_parametros_e_nomes_sem_declaracao():
+    codigo = '\n'.join([
+        'als',
+        'func dobro (valor)',
+        '    wrt valor',
+        'intn sobra',
+        'total <= dobro',
+        'input(total)',
+    ])
+    indice = IndiceSimbolos()
+    AnalisadorLexico().analisar(codigo, indice)
+
+    assert (indice['dobro'].categoria, indice['dobro'].declaracoes) == ('funcao', [(2, 6)])
+    assert indice.referencias('dobro') == [(5, 10)]
+    assert (indice['valor'].categoria, indice['valor'].declaracoes) == ('parametro', [(2, 13)])
+    assert indice.referencias('valor') == [(3, 9)]
+    assert [simbolo.nome for simbolo in indice.usos_nao_declarados()] == ['total']
+    assert indice.referencias('total') == [(5, 1), (6, 7)]
+    assert [simbolo.nome for simbolo in indice.declaracoes_nao_usadas()] == ['sobra']
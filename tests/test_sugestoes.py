@@ -0,0 +1,103 @@
+"""
+Testes do índice de sugestões (IndiceSugestoes) contra uma busca por força bruta.
+
+Execução:
+    python -m pytest tests
+"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisador import AnalisadorLexico, IndiceSugestoes  # noqa: E402
+
+# Palavras reservadas e tipos que recebem sugestões, na ordem do analisador
+VOCABULARIO = AnalisadorLexico(distancia_sugestoes=1).sugestoes_palavras.vocabulario
+LETRAS = 'abcdefghijklmnopqrstuvwxyz_'
+
+
+def distancia_forca_bruta(origem, destino):
+    """Distância de edição com transposições de vizinhos, pela tabela completa."""
+    tabela = [[0] * (len(destino) + 1) for _ in range(len(origem) + 1)]
+    for i in range(len(origem) + 1):
+        tabela[i][0] = i
+    for j in range(len(destino) + 1):
+        tabela[0][j] = j
+    for i in range(1, len(origem) + 1):
+        for j in range(1, len(destino) + 1):
+            custo = origem[i - 1] != destino[j - 1]
+            tabela[i][j] = min(tabela[i - 1][j] + 1, tabela[i][j - 1] + 1, tabela[i - 1][j - 1] + custo)
+            if i > 1 and j > 1 and origem[i - 1] == destino[j - 2] and origem[i - 2] == destino[j - 1]:
+                tabela[i][j] = min(tabela[i][j], tabela[i - 2][j - 2] + 1)
+    return tabela[-1][-1]
+
+
+def sugerir_forca_bruta(palavra, vocabulario, distancia_maxima):
+    if len(palavra) < IndiceSugestoes.TAMANHO_MINIMO or palavra in vocabulario:
+        return None
+    limite = min(distancia_maxima, max(1, len(palavra) // 3))
+    melhor, melhor_distancia = None, limite + 1
+    for candidato in vocabulario:
+        distancia = distancia_forca_bruta(palavra, candidato)
+        if distancia < melhor_distancia:
+            melhor, melhor_distancia = candidato, distancia
+    return melhor
+
+
+def editar(aleatorio, palavra):
+    """Aplica à palavra uma remoção, inserção, troca ou transposição aleatória."""
+    posicao = aleatorio.randrange(len(palavra) + 1)
+    operacao = aleatorio.choice(['remocao', 'insercao', 'troca', 'transposicao'])
+    if operacao == 'remocao' and posicao < len(palavra):
+        return palavra[:posicao] + palavra[posicao + 1:]
+    if operacao == 'troca' and posicao < len(palavra):
+        return palavra[:posicao] + aleatorio.choice(LETRAS) + palavra[posicao + 1:]
+    if operacao == 'transposicao' and posicao + 1 < len(palavra):
+        return palavra[:posicao] + palavra[posicao + 1] + palavra[posicao] + palavra[posicao + 2:]
+    return palavra[:posicao] + aleatorio.choice(LETRAS) + palavra[posicao:]
+
+
+def palavras_de_teste(semente, quantidade):
+    aleatorio = random.Random(semente)
+    palavras = []
+    for _ in range(quantidade):
+        if aleatorio.random() < 0.8:
+            palavra = aleatorio.choice(VOCABULARIO)
+            for _ in range(aleatorio.randint(1, 3)):
+                palavra = editar(aleatorio, palavra)
+        else:
+            palavra = ''.join(aleatorio.choice(LETRAS) for _ in range(aleatorio.randint(1, 9)))
+        palavras.append(palavra)
+    return palavras
+
+
+@pytest.mark.parametrize('distancia_maxima', [1, 2, 3])
+def test_igual_a_forca_bruta(distancia_maxima):
+    indice = IndiceSugestoes(VOCABULARIO, distancia_maxima)
+    for palavra in palavras_de_teste(distancia_maxima, 3000):
+        assert indice.sugerir(palavra) == sugerir_forca_bruta(palavra, VOCABULARIO, distancia_maxima), palavra
+
+
+def test_distancia_com_limite():
+    aleatorio = random.Random(7)
+    for _ in range(3000):
+        origem, destino = palavras_de_teste(aleatorio.random(), 2)
+        esperada = distancia_forca_bruta(origem, destino)
+        for limite in range(4):
+            obtida = IndiceSugestoes.distancia(origem, destino, limite)
+            # Acima do limite, só importa que o resultado passe dele
+            assert obtida == esperada if esperada <= limite else obtida > limite
+
+
+def test_exemplos():
+    indice = IndiceSugestoes(['wrt', 'input', 'cycle'], distancia_maxima=1, ignorar=['inpt'])
+    assert indice.sugerir('inptu') == 'input'
+    assert indice.sugerir('valor') is None
+    assert indice.sugerir('wr') is None         # curta demais
+    assert indice.sugerir('input') is None      # já é do vocabulário
+    assert indice.sugerir('inpt') is None       # ignorada
+    with pytest.raises(ValueError):
+        IndiceSugestoes(['wrt'], distancia_maxima=0)